@@ -0,0 +1,79 @@
+"""
+Description:
+    Throughput of the OrderBooksNamespace update handler as the order book depth grows.
+    Synthetic books of 100 to 10,000 levels per side and their delta streams, with valid digests and changes clustered
+    at the top of the book, are generated up front and then driven through the namespace handlers without a socket.
+    The harness reports messages per second, handler latency percentiles and the memory held by the namespace.
+Usage:
+    python benchmarks/book_throughput.py
+    python benchmarks/book_throughput.py --depths 100,1000 --messages 2000 --compact
+"""
+
+import argparse
+import copy
+import time
+from switcheo.instrumentation import percentile
+from switcheo.mock_server import MockMarket
+from switcheo.streaming_client import OrderBooksNamespace
+
+
+def book_stream(depth, messages, seed=1):
+    """
+    A snapshot and a list of delta updates of a synthetic order book.
+
+    :param depth: The number of price levels per side.
+    :type depth: int
+    :param messages: The number of updates.
+    :type messages: int
+    :return: Tuple of the snapshot and the updates of the /v2/books namespace.
+    """
+    market = MockMarket(pairs={'SWTH_NEO': 0.0004}, levels=depth, tick=0.0001, seed=seed)
+    snapshot = market.book_snapshot('SWTH_NEO')
+    return snapshot, [market.book_update('SWTH_NEO') for message in range(messages)]
+
+
+def run_stream(snapshot, updates, compact=False):
+    """
+    Feed a snapshot and its updates to a new OrderBooksNamespace.
+
+    :return: Dictionary with the messages per second, p50 and p99 handler latency (in seconds), the resyncs and the
+             memory (in bytes) held for the book after the snapshot and after the updates.
+    """
+    order_books = OrderBooksNamespace(compact=compact)
+    order_books.on_all(copy.deepcopy(snapshot))
+    memory_start = order_books.memory_report()['SWTH_NEO']['total']
+    latencies = []
+    start = time.perf_counter()
+    for update in updates:
+        update_start = time.perf_counter()
+        order_books.on_updates(update)
+        latencies.append(time.perf_counter() - update_start)
+    elapsed = time.perf_counter() - start
+    return {
+        'messages_per_second': len(updates) / elapsed,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p99': percentile(latencies, 99),
+        'resyncs': sum(stats['resyncs'] for stats in order_books.resync.stats().values()),
+        'memory_start': memory_start,
+        'memory_end': order_books.memory_report()['SWTH_NEO']['total']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order book update throughput by book depth.')
+    parser.add_argument('--depths', default='100,1000,10000', help='Comma separated levels per side.')
+    parser.add_argument('--messages', type=int, default=500, help='Updates per depth.')
+    parser.add_argument('--compact', action='store_true', help='Keep the books as CompactBook records.')
+    args = parser.parse_args()
+    print('{:>8} {:>14} {:>12} {:>12} {:>8} {:>14} {:>14}'.format(
+        'depth', 'messages/sec', 'p50 (ms)', 'p99 (ms)', 'resyncs', 'memory start', 'memory end'))
+    for depth in [int(depth) for depth in args.depths.split(',')]:
+        snapshot, updates = book_stream(depth=depth, messages=args.messages)
+        result = run_stream(snapshot, updates, compact=args.compact)
+        print('{:>8} {:>14.1f} {:>12.3f} {:>12.3f} {:>8} {:>14} {:>14}'.format(
+            depth, result['messages_per_second'], result['latency_p50'] * 1000, result['latency_p99'] * 1000,
+            result['resyncs'], result['memory_start'], result['memory_end']))
+
+
+if __name__ == '__main__':
+    main()
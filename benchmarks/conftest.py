@@ -0,0 +1,62 @@
+"""
+Description:
+    Benchmarks of the serialization, hashing and signing hot paths, run with pytest-benchmark.
+Usage:
+    python -m pytest benchmarks --benchmark-autosave
+        Run the benchmarks and store the results as a baseline in .benchmarks.
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+        Compare against the latest stored baseline and fail when a mean is more than 10% slower.
+"""
+
+import copy
+import uuid
+import pytest
+from switcheo.neo.test_neo_utils import testnet_privatekey_hexstring
+from switcheo.neo.test_transactions import transaction_dict
+
+
+def order_transaction(outputs):
+    """
+    A deposit style NEO transaction with several outputs, as signed when creating orders with many fills.
+    """
+    transaction = copy.deepcopy(transaction_dict)
+    transaction['outputs'] = transaction['outputs'] * outputs
+    return transaction
+
+
+@pytest.fixture
+def neo_transaction():
+    return order_transaction(outputs=1)
+
+
+@pytest.fixture
+def neo_transaction_many_outputs():
+    return order_transaction(outputs=20)
+
+
+@pytest.fixture
+def neo_private_key():
+    return testnet_privatekey_hexstring
+
+
+@pytest.fixture
+def txn_array():
+    """
+    The fills and makes of an order, every message carries its own transaction to sign.
+    """
+    return [{'id': str(uuid.UUID(int=index)), 'txn': copy.deepcopy(transaction_dict)} for index in range(10)]
+
+
+@pytest.fixture
+def order_message():
+    return {
+        'blockchain': 'neo',
+        'contract_hash': 'a195c1549e7da61b8da315765a790ac7e7633b82',
+        'order_type': 'limit',
+        'pair': 'SWTH_NEO',
+        'price': '0.00100000',
+        'quantity': '100000000000',
+        'side': 'buy',
+        'timestamp': 1533168000000,
+        'use_native_tokens': True
+    }
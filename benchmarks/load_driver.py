@@ -0,0 +1,153 @@
+"""
+Description:
+    Load driver for the Switcheo clients against the in-process mock server or any other Switcheo API URL.
+    Worker threads call a mix of PublicClient endpoints while a socket.io client streams the order books and trades
+    of the pairs, the driver then reports the REST throughput, latency percentiles and errors and the stream message
+    rate and resyncs.
+Usage:
+    python benchmarks/load_driver.py --duration 10 --concurrency 8 --latency 0.005 --error-rate 0.01
+    python benchmarks/load_driver.py --url http://127.0.0.1:5000 --duration 30
+"""
+
+import argparse
+import threading
+import time
+import socketio
+from switcheo.instrumentation import percentile
+from switcheo.mock_server import MockSwitcheoServer
+from switcheo.public_client import PublicClient
+from switcheo.streaming_client import OrderBooksNamespace, TradeEventsNamespace
+
+
+def rest_calls(public_client, pairs):
+    calls = []
+    for pair in pairs:
+        calls.append(('get_offer_book', lambda pair=pair: public_client.get_offer_book(pair=pair)))
+        calls.append(('get_trades', lambda pair=pair: public_client.get_trades(pair=pair, limit=100)))
+    calls.append(('get_last_price', public_client.get_last_price))
+    calls.append(('get_exchange_status', public_client.get_exchange_status))
+    return calls
+
+
+class LoadDriver(object):
+    """
+    Drives REST and streaming load against a Switcheo API URL::
+
+        report = LoadDriver(url=server.url, pairs=['SWTH_NEO'], concurrency=4).run(duration=5)
+    """
+
+    def __init__(self, url, pairs, concurrency=4, stream=True):
+        self.url = url
+        self.pairs = pairs
+        self.concurrency = concurrency
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.stream_messages = 0
+
+    def worker(self, deadline):
+        public_client = None
+        while public_client is None:
+            if time.time() >= deadline:
+                return
+            try:
+                public_client = PublicClient(api_url=self.url)
+            except Exception:
+                with self.lock:
+                    self.errors += 1
+        calls = rest_calls(public_client, self.pairs)
+        index = 0
+        while time.time() < deadline:
+            name, call = calls[index % len(calls)]
+            index += 1
+            start = time.time()
+            try:
+                call()
+            except Exception:
+                with self.lock:
+                    self.errors += 1
+                continue
+            with self.lock:
+                self.latencies.append(time.time() - start)
+
+    def count_messages(self, namespace):
+        trigger_event = namespace.trigger_event
+
+        def counted_trigger_event(event, *args):
+            if event in ['all', 'updates']:
+                with self.lock:
+                    self.stream_messages += 1
+            return trigger_event(event, *args)
+        namespace.trigger_event = counted_trigger_event
+        return namespace
+
+    def run(self, duration=10.0):
+        """
+        Apply the load for duration seconds.
+
+        :return: Dictionary with the REST requests, throughput, latency percentiles (in seconds) and errors and the
+                 stream messages, message rate and resyncs.
+        """
+        socket_io = None
+        order_books = self.count_messages(OrderBooksNamespace())
+        trade_events = self.count_messages(TradeEventsNamespace())
+        if self.stream:
+            socket_io = socketio.Client()
+            socket_io.register_namespace(order_books)
+            socket_io.register_namespace(trade_events)
+            socket_io.connect(self.url, transports=['polling'], namespaces=['/v2/books', '/v2/trades'])
+            for pair in self.pairs:
+                order_books.emit('join', {'pair': pair, 'contractHash': ''})
+                trade_events.emit('join', {'pair': pair, 'contractHash': ''})
+        start = time.time()
+        deadline = start + duration
+        workers = [threading.Thread(target=self.worker, args=(deadline,)) for worker in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.time() - start
+        if socket_io is not None:
+            socket_io.disconnect()
+        resync_stats = list(order_books.resync.stats().values()) + list(trade_events.resync.stats().values())
+        return {
+            'requests': len(self.latencies),
+            'requests_per_second': len(self.latencies) / elapsed,
+            'errors': self.errors,
+            'latency_p50': percentile(self.latencies, 50),
+            'latency_p90': percentile(self.latencies, 90),
+            'latency_p99': percentile(self.latencies, 99),
+            'stream_messages': self.stream_messages,
+            'stream_messages_per_second': self.stream_messages / elapsed,
+            'resyncs': sum(stats['resyncs'] for stats in resync_stats)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Switcheo clients.')
+    parser.add_argument('--url', help='Switcheo API URL, an in-process mock server by default.')
+    parser.add_argument('--pairs', default='SWTH_NEO,GAS_NEO', help='Comma separated trading pairs.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load.')
+    parser.add_argument('--concurrency', type=int, default=4, help='REST worker threads.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock server latency in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Mock server fraction of failed requests.')
+    parser.add_argument('--message-rate', type=float, default=10.0, help='Mock server updates per second per room.')
+    parser.add_argument('--no-stream', action='store_true', help='Only drive the REST API.')
+    args = parser.parse_args()
+    server = None
+    url = args.url
+    if url is None:
+        server = MockSwitcheoServer(latency=args.latency, error_rate=args.error_rate,
+                                    message_rate=args.message_rate).start()
+        url = server.url
+    report = LoadDriver(url=url, pairs=args.pairs.split(','), concurrency=args.concurrency,
+                        stream=not args.no_stream).run(duration=args.duration)
+    if server is not None:
+        server.stop()
+    for key, value in report.items():
+        print('{:<28}{}'.format(key, round(value, 6) if isinstance(value, float) else value))
+
+
+if __name__ == '__main__':
+    main()
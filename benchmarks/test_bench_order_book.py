@@ -0,0 +1,23 @@
+import copy
+import pytest
+from switcheo.streaming_client import OrderBooksNamespace
+from book_throughput import book_stream
+
+
+@pytest.mark.parametrize('depth', [100, 1000])
+@pytest.mark.parametrize('compact', [False, True])
+def test_order_book_updates(benchmark, depth, compact):
+    snapshot, updates = book_stream(depth=depth, messages=100)
+
+    def setup():
+        order_books = OrderBooksNamespace(compact=compact)
+        order_books.on_all(copy.deepcopy(snapshot))
+        return (order_books,), {}
+
+    def run(order_books):
+        for update in updates:
+            order_books.on_updates(update)
+        return order_books
+
+    order_books = benchmark.pedantic(run, setup=setup, rounds=5)
+    assert order_books.resync.stats() == {}
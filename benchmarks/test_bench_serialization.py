@@ -0,0 +1,62 @@
+import pytest
+from switcheo.neo.transactions import serialize_transaction
+from switcheo.neo.utils import encode_message, create_offer_hash
+from switcheo.utils import num2hexstring, num2varint, reverse_hex, stringify_message, sha1_hash_digest, json_encoders
+
+
+def test_serialize_transaction(benchmark, neo_transaction):
+    benchmark(serialize_transaction, transaction=neo_transaction, signed=False)
+
+
+def test_serialize_transaction_many_outputs(benchmark, neo_transaction_many_outputs):
+    benchmark(serialize_transaction, transaction=neo_transaction_many_outputs, signed=False)
+
+
+def test_num2hexstring(benchmark):
+    benchmark(num2hexstring, number=30000000000, size=8, little_endian=True)
+
+
+def test_num2varint(benchmark):
+    benchmark(lambda: [num2varint(num) for num in (0xfc, 0xfffe, 0xfffffffe, 0xffffffffff)])
+
+
+def test_reverse_hex(benchmark):
+    benchmark(reverse_hex, message='ab38352559b8b203bde5fddfa0b07d8b2525e132')
+
+
+def test_stringify_message(benchmark, order_message):
+    benchmark(stringify_message, message=order_message)
+
+
+def book_message():
+    return {'buys': [{'amount': str(100000000 + level), 'price': '0.000{}'.format(400 - level)} for level in range(100)],
+            'sells': [{'amount': str(200000000 + level), 'price': '0.000{}'.format(500 - level)} for level in range(100)]}
+
+
+def test_stringify_and_digest_book(benchmark):
+    book = book_message()
+    benchmark(lambda: sha1_hash_digest(stringify_message(book)))
+
+
+@pytest.mark.parametrize('encoder', sorted(json_encoders))
+def test_json_encoder_book(benchmark, encoder):
+    benchmark(json_encoders[encoder], book_message())
+
+
+@pytest.mark.parametrize('encoder', sorted(json_encoders))
+def test_json_encoder_order(benchmark, encoder, order_message):
+    benchmark(json_encoders[encoder], order_message)
+
+
+def test_encode_message(benchmark, order_message):
+    benchmark(encode_message, message=order_message)
+
+
+def test_create_offer_hash(benchmark):
+    benchmark(create_offer_hash,
+              neo_address='APuP9GsSCPJKrexPe49afDV8CQYubZGWd8',
+              offer_asset_amt=6000000,
+              offer_asset_hash='c56f33fc6ecfcd0c225c4ab356fee59390af8560be0e930faebe74a6daff7c9b',
+              want_asset_amt=30000000000,
+              want_asset_hash='ab38352559b8b203bde5fddfa0b07d8b2525e132',
+              txn_uuid='ecb6ee9e-de8d-46d6-953b-afcc976be1ae')
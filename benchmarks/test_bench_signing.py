@@ -0,0 +1,20 @@
+import pytest
+from switcheo.neo.utils import sign_transaction, sign_txn_array as neo_sign_txn_array
+
+
+def test_neo_sign_transaction(benchmark, neo_transaction, neo_private_key):
+    benchmark(sign_transaction, transaction=neo_transaction, private_key_hex=neo_private_key)
+
+
+def test_neo_sign_txn_array(benchmark, txn_array, neo_private_key):
+    signatures = benchmark(neo_sign_txn_array, messages=txn_array, private_key_hex=neo_private_key)
+    assert len(signatures) == len(txn_array)
+
+
+def test_eth_sign_txn_array(benchmark, txn_array):
+    pytest.importorskip('eth_account')
+    from switcheo.ethereum.utils import sign_txn_array as eth_sign_txn_array
+    eth_private_key = '0x' + '11' * 32
+    messages = [{'id': message['id'], 'txn': {'sha256': '0x' + message['txn']['sha256']}} for message in txn_array]
+    signatures = benchmark(eth_sign_txn_array, messages=messages, private_key=eth_private_key)
+    assert len(signatures) == len(messages)
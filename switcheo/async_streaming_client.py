@@ -0,0 +1,231 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Managed asyncio streaming client for the Switcheo socket.io API.
+    The client owns the socket.io connection together with the order book, trade and order namespaces, keeps track
+    of every room that has been joined and joins them again whenever the connection is re-established.
+Usage:
+    from switcheo.async_streaming_client import AsyncStreamingClient
+"""
+
+import asyncio
+import time
+import socketio
+from collections import deque
+from switcheo.shared_book import SharedBookPublisher
+from switcheo.streaming_client import OrderBooksNamespace, TradeEventsNamespace, OrderEventsNamespace
+
+
+streaming_url_dict = {
+    "main": 'https://ws.switcheo.io',
+    "test": 'https://test-ws.switcheo.io'
+}
+
+namespace_events = ['connect', 'disconnect', 'join', 'all', 'updates']
+
+
+class NamespaceEmitter(object):
+    """
+    Stands in for the socket.io client of a streaming namespace so its synchronous handlers can emit events on the
+    asyncio client, from the event loop or from any other thread.
+    """
+
+    def __init__(self, streaming_client):
+        self.streaming_client = streaming_client
+
+    def emit(self, event, data=None, namespace=None, callback=None):
+        streaming_client = self.streaming_client
+        if streaming_client.loop is None:
+            return None
+        return asyncio.run_coroutine_threadsafe(
+            streaming_client.socket_io.emit(event, data=data, namespace=namespace, callback=callback),
+            streaming_client.loop)
+
+
+class AsyncStreamingClient(object):
+    """
+    Owns an asyncio socket.io connection to Switcheo and the /v2/books, /v2/trades and /v2/orders namespaces.
+
+    Rooms can be subscribed before or after connecting, every subscribed room is joined again after a reconnect::
+
+        streaming_client = AsyncStreamingClient(switcheo_network="test")
+        streaming_client.subscribe_order_book(pair="SWTH_NEO", contract_hash=contract_hash)
+        await streaming_client.connect()
+        ....
+        streaming_client.order_books.order_book["SWTH_NEO"]
+        streaming_client.metrics()
+    """
+
+    def __init__(self, switcheo_network="test", url=None, order_books=None, trade_events=None, order_events=None,
+                 reconnection_delay=1, reconnection_delay_max=5, socket_io=None, max_reconnect_latencies=1000):
+        """
+
+        :param switcheo_network: The Switcheo network to stream from, main or test.
+        :type switcheo_network: str
+        :param url: The streaming URL, overrides the switcheo_network URL.
+        :type url: str
+        :param order_books: The namespace keeping the order books, a new OrderBooksNamespace by default.
+        :type order_books: OrderBooksNamespace
+        :param trade_events: The namespace keeping the trades, a new TradeEventsNamespace by default.
+        :type trade_events: TradeEventsNamespace
+        :param order_events: The namespace keeping the orders, a new OrderEventsNamespace by default.
+        :type order_events: OrderEventsNamespace
+        :param reconnection_delay: The initial delay (in seconds) before reconnecting.
+        :type reconnection_delay: float
+        :param reconnection_delay_max: The maximum delay (in seconds) between reconnection attempts.
+        :type reconnection_delay_max: float
+        :param socket_io: The asyncio socket.io client, a new socketio.AsyncClient by default.
+        :type socket_io: socketio.AsyncClient
+        :param max_reconnect_latencies: The number of reconnect latencies to keep, oldest are dropped first.
+        :type max_reconnect_latencies: int
+        """
+        self.url = url or streaming_url_dict[switcheo_network]
+        if socket_io is None:
+            socket_io = socketio.AsyncClient(reconnection=True,
+                                             reconnection_delay=reconnection_delay,
+                                             reconnection_delay_max=reconnection_delay_max)
+        self.socket_io = socket_io
+        self.loop = None
+        self.order_books = order_books or OrderBooksNamespace()
+        self.trade_events = trade_events or TradeEventsNamespace()
+        self.order_events = order_events or OrderEventsNamespace()
+        self.namespaces = {}
+        self.rooms = {}
+        self.connected = False
+        self.connect_latency = None
+        self.reconnects = 0
+        self.reconnect_latencies = deque(maxlen=max_reconnect_latencies)
+        self._disconnected_at = None
+        emitter = NamespaceEmitter(self)
+        for namespace in [self.order_books, self.trade_events, self.order_events]:
+            namespace._set_client(emitter)
+            self.namespaces[namespace.namespace] = namespace
+            self.rooms[namespace.namespace] = []
+            for event in namespace_events:
+                self.socket_io.on(event, self._event_handler(namespace, event), namespace=namespace.namespace)
+            if hasattr(namespace, 'add_eviction_listener'):
+                namespace.add_eviction_listener(self._eviction_handler(namespace))
+
+    def _event_handler(self, namespace, event):
+        async def handler(*args):
+            if event == 'connect':
+                await self._on_namespace_connect(namespace)
+            elif event == 'disconnect':
+                self._on_namespace_disconnect()
+            return namespace.trigger_event(event, *args)
+        return handler
+
+    def _eviction_handler(self, namespace):
+        def handler(room):
+            rooms = self.rooms[namespace.namespace]
+            rooms[:] = [subscribed for subscribed in rooms if subscribed.get('pair') != room['pair']]
+        return handler
+
+    async def _on_namespace_connect(self, namespace):
+        if self._disconnected_at is not None:
+            self.reconnects += 1
+            self.reconnect_latencies.append(time.time() - self._disconnected_at)
+            self._disconnected_at = None
+        self.connected = True
+        for room in list(self.rooms[namespace.namespace]):
+            await self.socket_io.emit('join', data=room, namespace=namespace.namespace)
+
+    def _on_namespace_disconnect(self):
+        if self.connected:
+            self.connected = False
+            self._disconnected_at = time.time()
+
+    async def connect(self, transports=None):
+        """
+        Connect to the streaming API and join every subscribed room.
+
+        :param transports: The list of allowed transports, websocket only by default.
+        :type transports: list
+        """
+        self.loop = asyncio.get_event_loop()
+        connect_start = time.time()
+        await self.socket_io.connect(self.url, transports=transports or ['websocket'],
+                                     namespaces=list(self.namespaces))
+        self.connect_latency = time.time() - connect_start
+
+    async def disconnect(self):
+        await self.socket_io.disconnect()
+        self.connected = False
+
+    async def wait(self):
+        """
+        Wait until the connection ends, reconnects are handled while waiting.
+        """
+        await self.socket_io.wait()
+
+    def subscribe(self, namespace, room):
+        """
+        Subscribe to a room of a namespace, the room is joined now if connected and after every reconnect.
+
+        :param namespace: The namespace of the room, /v2/books, /v2/trades or /v2/orders.
+        :type namespace: str
+        :param room: The room to join, for example {'contractHash': contract_hash, 'pair': 'SWTH_NEO'}.
+        :type room: dict
+        """
+        if room not in self.rooms[namespace]:
+            self.rooms[namespace].append(room)
+        if self.connected:
+            self.namespaces[namespace].emit(event='join', data=room)
+
+    def unsubscribe(self, namespace, room):
+        """
+        Leave a room of a namespace, drop the state kept for it and stop joining it after reconnects.
+
+        :param namespace: The namespace of the room, /v2/books, /v2/trades or /v2/orders.
+        :type namespace: str
+        :param room: The room to leave.
+        :type room: dict
+        """
+        if room in self.rooms[namespace]:
+            self.rooms[namespace].remove(room)
+        if self.connected:
+            self.namespaces[namespace].emit(event='leave', data=room)
+        if 'pair' in room and hasattr(self.namespaces[namespace], 'evict'):
+            self.namespaces[namespace].evict(room['pair'])
+
+    def subscribe_order_book(self, pair, contract_hash):
+        self.subscribe(namespace=self.order_books.namespace, room={'contractHash': contract_hash, 'pair': pair})
+
+    def subscribe_trades(self, pair, contract_hash):
+        self.subscribe(namespace=self.trade_events.namespace, room={'contractHash': contract_hash, 'pair': pair})
+
+    def subscribe_orders(self, address, contract_hash):
+        self.subscribe(namespace=self.order_events.namespace,
+                       room={'contractHash': contract_hash, 'address': address})
+
+    def publish_books(self, path, max_pairs=64, levels=20):
+        """
+        Publish the order books of the client into a shared file for SharedBookReader instances in other processes.
+
+        :param path: The path of the shared file, a tmpfs path such as /dev/shm keeps it in memory.
+        :type path: str
+        :param max_pairs: The number of order books the file can hold.
+        :type max_pairs: int
+        :param levels: The number of price levels published per side.
+        :type levels: int
+        :return: The SharedBookPublisher attached to the order books.
+        """
+        publisher = SharedBookPublisher(path=path, max_pairs=max_pairs, levels=levels)
+        publisher.attach(self.order_books)
+        return publisher
+
+    def metrics(self):
+        """
+        Connection metrics of the client.
+
+        :return: Dictionary with the connection state, initial connect latency and reconnect statistics (in seconds),
+                 the maximum reconnect latency is over the kept reconnect latencies.
+        """
+        return {
+            'connected': self.connected,
+            'connect_latency': self.connect_latency,
+            'reconnects': self.reconnects,
+            'last_reconnect_latency': self.reconnect_latencies[-1] if self.reconnect_latencies else None,
+            'max_reconnect_latency': max(self.reconnect_latencies) if self.reconnect_latencies else None,
+            'subscribed_rooms': sum(len(rooms) for rooms in self.rooms.values())
+        }
@@ -10,20 +10,14 @@ Usage:
 """
 
 from functools import partial
+from switcheo.order_template import OrderTemplate
 from switcheo.public_client import PublicClient
-from switcheo.utils import get_epoch_milliseconds
-from switcheo.neo.utils import to_neo_asset_amount
-from switcheo.neo.signatures import sign_create_deposit as sign_create_deposit_neo,\
-    sign_execute_deposit as sign_execute_deposit_neo, sign_create_order as sign_create_order_neo,\
-    sign_execute_order as sign_execute_order_neo, sign_create_withdrawal as sign_create_withdrawal_neo,\
-    sign_execute_withdrawal as sign_execute_withdrawal_neo, sign_create_cancellation as sign_create_cancellation_neo,\
-    sign_execute_cancellation as sign_execute_cancellation_neo
-from switcheo.ethereum.signatures import sign_create_deposit as sign_create_deposit_eth,\
-    sign_execute_deposit as sign_execute_deposit_eth, sign_create_order as sign_create_order_eth,\
-    sign_execute_order as sign_execute_order_eth, sign_create_withdrawal as sign_create_withdrawal_eth,\
-    sign_execute_withdrawal as sign_execute_withdrawal_eth, sign_create_cancellation as sign_create_cancellation_eth,\
-    sign_execute_cancellation as sign_execute_cancellation_eth
-from eth_utils import to_wei
+from switcheo.tracing import Tracer
+from switcheo.utils import get_epoch_milliseconds, lazy_function
+
+# The signing stacks (neocore for NEO, web3, eth_account and eth_utils for Ethereum) are imported on first use.
+neo_signatures = 'switcheo.neo.signatures'
+eth_signatures = 'switcheo.ethereum.signatures'
 
 
 class AuthenticatedClient(PublicClient):
@@ -32,7 +26,8 @@ class AuthenticatedClient(PublicClient):
                  blockchain='neo',
                  contract_version='V3',
                  api_url='https://test-api.switcheo.network/',
-                 api_version='/v2'):
+                 api_version='/v2',
+                 tracer=None):
         PublicClient.__init__(self,
                               blockchain=blockchain,
                               contract_version=contract_version,
@@ -49,43 +44,75 @@ class AuthenticatedClient(PublicClient):
             'test-api.switcheo.network/': 'https://ropsten.infura.io/'
         }
         self.infura_url = self.infura_dict[api_url]
+        self.tracer = tracer or Tracer(enabled=False)
         self.blockchain_amount = {
-            'eth': partial(to_wei, unit='ether'),
-            'neo': to_neo_asset_amount
+            'eth': partial(lazy_function('eth_utils', 'to_wei'), unit='ether'),
+            'neo': lazy_function('switcheo.neo.utils', 'to_neo_asset_amount')
         }
         self.sign_create_cancellation_function = {
-            'eth': sign_create_cancellation_eth,
-            'neo': sign_create_cancellation_neo
+            'eth': lazy_function(eth_signatures, 'sign_create_cancellation'),
+            'neo': lazy_function(neo_signatures, 'sign_create_cancellation')
         }
         self.sign_execute_cancellation_function = {
-            'eth': sign_execute_cancellation_eth,
-            'neo': sign_execute_cancellation_neo
+            'eth': lazy_function(eth_signatures, 'sign_execute_cancellation'),
+            'neo': lazy_function(neo_signatures, 'sign_execute_cancellation')
         }
         self.sign_create_deposit_function = {
-            'eth': sign_create_deposit_eth,
-            'neo': sign_create_deposit_neo
+            'eth': lazy_function(eth_signatures, 'sign_create_deposit'),
+            'neo': lazy_function(neo_signatures, 'sign_create_deposit')
         }
         self.sign_execute_deposit_function = {
-            'eth': partial(sign_execute_deposit_eth, infura_url=self.infura_url),
-            'neo': sign_execute_deposit_neo
+            'eth': partial(lazy_function(eth_signatures, 'sign_execute_deposit'), infura_url=self.infura_url),
+            'neo': lazy_function(neo_signatures, 'sign_execute_deposit')
         }
         self.sign_create_order_function = {
-            'eth': sign_create_order_eth,
-            'neo': sign_create_order_neo
+            'eth': lazy_function(eth_signatures, 'sign_create_order'),
+            'neo': lazy_function(neo_signatures, 'sign_create_order')
         }
         self.sign_execute_order_function = {
-            'eth': sign_execute_order_eth,
-            'neo': sign_execute_order_neo
+            'eth': lazy_function(eth_signatures, 'sign_execute_order'),
+            'neo': lazy_function(neo_signatures, 'sign_execute_order')
         }
         self.sign_create_withdrawal_function = {
-            'eth': sign_create_withdrawal_eth,
-            'neo': sign_create_withdrawal_neo
+            'eth': lazy_function(eth_signatures, 'sign_create_withdrawal'),
+            'neo': lazy_function(neo_signatures, 'sign_create_withdrawal')
         }
         self.sign_execute_withdrawal_function = {
-            'eth': sign_execute_withdrawal_eth,
-            'neo': sign_execute_withdrawal_neo
+            'eth': lazy_function(eth_signatures, 'sign_execute_withdrawal'),
+            'neo': lazy_function(neo_signatures, 'sign_execute_withdrawal')
         }
 
+    def signed_post(self, span_name, sign_function, params, private_key, path):
+        """
+        Sign the parameters of a create or execute step and POST them to the API, tracing the signing and the request
+        as the span_name.sign and span_name.post spans. The POST span is tagged with the id of the returned order,
+        deposit, withdrawal or cancellation and the number of fills and makes when the result has them.
+
+        :param span_name: The name of the step, such as create_order.
+        :type span_name: str
+        :param sign_function: The signing function of the step for the blockchain of the client.
+        :type sign_function: function
+        :param params: The parameters to sign.
+        :type params: dict
+        :param private_key: The Private Key (ETH) or KeyPair (NEO) for the wallet being used to sign the message.
+        :type private_key: KeyPair or str
+        :param path: The API path to POST the signed parameters to.
+        :type path: str
+        :return: Dictionary of the API response.
+        """
+        with self.tracer.span(span_name + '.sign'):
+            api_params = sign_function(params, private_key)
+        with self.tracer.span(span_name + '.post', tags={'path': path}) as span:
+            result = self.request.post(path=path, json_data=api_params)
+            if isinstance(result, dict):
+                if 'id' in result:
+                    span.tag('id', result['id'])
+                for key in ['fills', 'makes']:
+                    if isinstance(result.get(key), list):
+                        span.tag(key, len(result[key]))
+                        self.tracer.tag_trace(key, len(result[key]))
+        return result
+
     def cancel_order(self, order_id, private_key):
         """
         This function is a wrapper function around the create and execute cancellation functions to help make this
@@ -142,8 +169,10 @@ class AuthenticatedClient(PublicClient):
         :type private_key: KeyPair
         :return: Dictionary of the transaction details and state after sending the signed transaction to the blockchain.
         """
-        create_cancellation = self.create_cancellation(order_id=order_id, private_key=private_key)
-        return self.execute_cancellation(cancellation_params=create_cancellation, private_key=private_key)
+        with self.tracer.span('cancel_order', tags={'blockchain': self.blockchain, 'order_id': order_id}):
+            create_cancellation = self.create_cancellation(order_id=order_id, private_key=private_key)
+            self.tracer.tag_trace('cancellation_id', create_cancellation['id'])
+            return self.execute_cancellation(cancellation_params=create_cancellation, private_key=private_key)
 
     def create_cancellation(self, order_id, private_key):
         """
@@ -206,8 +235,10 @@ class AuthenticatedClient(PublicClient):
             "order_id": order_id,
             "timestamp": get_epoch_milliseconds()
         }
-        api_params = self.sign_create_cancellation_function[self.blockchain](cancellation_params, private_key)
-        return self.request.post(path='/cancellations', json_data=api_params)
+        return self.signed_post(span_name='create_cancellation',
+                                sign_function=self.sign_create_cancellation_function[self.blockchain],
+                                params=cancellation_params, private_key=private_key,
+                                path='/cancellations')
 
     def execute_cancellation(self, cancellation_params, private_key):
         """
@@ -264,8 +295,10 @@ class AuthenticatedClient(PublicClient):
         :return: Dictionary of the transaction details and state after sending the signed transaction to the blockchain.
         """
         cancellation_id = cancellation_params['id']
-        api_params = self.sign_execute_cancellation_function[self.blockchain](cancellation_params, private_key)
-        return self.request.post(path='/cancellations/{}/broadcast'.format(cancellation_id), json_data=api_params)
+        return self.signed_post(span_name='execute_cancellation',
+                                sign_function=self.sign_execute_cancellation_function[self.blockchain],
+                                params=cancellation_params, private_key=private_key,
+                                path='/cancellations/{}/broadcast'.format(cancellation_id))
 
     def deposit(self, asset, amount, private_key):
         """
@@ -290,8 +323,10 @@ class AuthenticatedClient(PublicClient):
         :type private_key: KeyPair or str
         :return: Dictionary with the result status of the deposit attempt.
         """
-        create_deposit = self.create_deposit(asset=asset, amount=amount, private_key=private_key)
-        return self.execute_deposit(deposit_params=create_deposit, private_key=private_key)
+        with self.tracer.span('deposit', tags={'blockchain': self.blockchain, 'asset': asset}):
+            create_deposit = self.create_deposit(asset=asset, amount=amount, private_key=private_key)
+            self.tracer.tag_trace('deposit_id', create_deposit['id'])
+            return self.execute_deposit(deposit_params=create_deposit, private_key=private_key)
 
     def create_deposit(self, asset, amount, private_key):
         """
@@ -362,8 +397,10 @@ class AuthenticatedClient(PublicClient):
             'timestamp': get_epoch_milliseconds(),
             'contract_hash': self.contract_hash
         }
-        api_params = self.sign_create_deposit_function[self.blockchain](signable_params, private_key)
-        return self.request.post(path='/deposits', json_data=api_params)
+        return self.signed_post(span_name='create_deposit',
+                                sign_function=self.sign_create_deposit_function[self.blockchain],
+                                params=signable_params, private_key=private_key,
+                                path='/deposits')
 
     def execute_deposit(self, deposit_params, private_key):
         """
@@ -386,8 +423,10 @@ class AuthenticatedClient(PublicClient):
         :return: Dictionary with the result status of the deposit attempt.
         """
         deposit_id = deposit_params['id']
-        api_params = self.sign_execute_deposit_function[self.blockchain](deposit_params, private_key)
-        return self.request.post(path='/deposits/{}/broadcast'.format(deposit_id), json_data=api_params)
+        return self.signed_post(span_name='execute_deposit',
+                                sign_function=self.sign_execute_deposit_function[self.blockchain],
+                                params=deposit_params, private_key=private_key,
+                                path='/deposits/{}/broadcast'.format(deposit_id))
 
 
     def order(self, pair, side, private_key, price=None, quantity=None, use_native_token=True, 
@@ -469,11 +508,14 @@ class AuthenticatedClient(PublicClient):
         :type worst_acceptable_price:
         :return: The lower or upper price limit for which the trade will be performed
         """
-        create_order = self.create_order(private_key=private_key, pair=pair, side=side, price=price,
-                                         quantity=quantity, use_native_token=use_native_token,
-                                         order_type=order_type, offer_amount=offer_amount, 
-                                         receiving_address=receiving_address, worst_acceptable_price=worst_acceptable_price)
-        return self.execute_order(order_params=create_order, private_key=private_key)
+        with self.tracer.span('order', tags={'blockchain': self.blockchain, 'pair': pair, 'side': side}):
+            create_order = self.create_order(private_key=private_key, pair=pair, side=side, price=price,
+                                             quantity=quantity, use_native_token=use_native_token,
+                                             order_type=order_type, offer_amount=offer_amount,
+                                             receiving_address=receiving_address,
+                                             worst_acceptable_price=worst_acceptable_price)
+            self.tracer.tag_trace('order_id', create_order['id'])
+            return self.execute_order(order_params=create_order, private_key=private_key)
 
     def create_order(self, pair, side, private_key, price=None, quantity=None, use_native_token=True, 
                      order_type="limit", otc_address=None, offer_amount=None, receiving_address=None, 
@@ -621,8 +663,37 @@ class AuthenticatedClient(PublicClient):
             order_params["quantity"] = str(self.blockchain_amount[self.blockchain](quantity))
             order_params["order_type"] = order_type
 
-        api_params = self.sign_create_order_function[self.blockchain](order_params, private_key)
-        return self.request.post(path='/orders', json_data=api_params)
+        return self.signed_post(span_name='create_order',
+                                sign_function=self.sign_create_order_function[self.blockchain],
+                                params=order_params, private_key=private_key,
+                                path='/orders')
+
+    def order_template(self, pair, side, private_key, use_native_token=True, order_type="limit"):
+        """
+        This function returns a template for quoting limit orders of one pair and side repeatedly, the parameters,
+        message layout and wallet address are computed once and each quote only fills in and signs the price, quantity
+        and timestamp.
+        Execution of this function is as follows::
+
+            template = order_template(pair="SWTH_NEO", side="buy", private_key=kp)
+            template.order(price=0.0002, quantity=100)
+
+        The expected return result of template.order is the same as the order function.
+
+        :param pair: The trading pair of the orders.
+        :type pair: str
+        :param side: The side of the orders i.e. buy or sell
+        :type side: str
+        :param private_key: The Private Key (ETH) or KeyPair (NEO) for the wallet being used to sign the orders.
+        :type private_key: KeyPair or str
+        :param use_native_token: Flag to indicate whether or not to pay fees with the Switcheo native token.
+        :type use_native_token: bool
+        :param order_type: The type of the orders, templates only support limit orders.
+        :type order_type: str
+        :return: OrderTemplate of the pair and side.
+        """
+        return OrderTemplate(client=self, pair=pair, side=side, private_key=private_key,
+                             use_native_token=use_native_token, order_type=order_type)
 
     def execute_order(self, order_params, private_key):
         """
@@ -679,8 +750,10 @@ class AuthenticatedClient(PublicClient):
         :return: Dictionary of the transaction on the order book.
         """
         order_id = order_params['id']
-        api_params = self.sign_execute_order_function[self.blockchain](order_params, private_key)
-        return self.request.post(path='/orders/{}/broadcast'.format(order_id), json_data=api_params)
+        return self.signed_post(span_name='execute_order',
+                                sign_function=self.sign_execute_order_function[self.blockchain],
+                                params=order_params, private_key=private_key,
+                                path='/orders/{}/broadcast'.format(order_id))
 
     def withdrawal(self, asset, amount, private_key):
         """
@@ -715,8 +788,10 @@ class AuthenticatedClient(PublicClient):
         :type private_key: KeyPair or str
         :return: Dictionary with the status of the withdrawal request and blockchain details.
         """
-        create_withdrawal = self.create_withdrawal(asset=asset, amount=amount, private_key=private_key)
-        return self.execute_withdrawal(withdrawal_params=create_withdrawal, private_key=private_key)
+        with self.tracer.span('withdrawal', tags={'blockchain': self.blockchain, 'asset': asset}):
+            create_withdrawal = self.create_withdrawal(asset=asset, amount=amount, private_key=private_key)
+            self.tracer.tag_trace('withdrawal_id', create_withdrawal['id'])
+            return self.execute_withdrawal(withdrawal_params=create_withdrawal, private_key=private_key)
 
     def create_withdrawal(self, asset, amount, private_key):
         """
@@ -746,8 +821,10 @@ class AuthenticatedClient(PublicClient):
             'timestamp': get_epoch_milliseconds(),
             'contract_hash': self.contract_hash
         }
-        api_params = self.sign_create_withdrawal_function[self.blockchain](signable_params, private_key)
-        return self.request.post(path='/withdrawals', json_data=api_params)
+        return self.signed_post(span_name='create_withdrawal',
+                                sign_function=self.sign_create_withdrawal_function[self.blockchain],
+                                params=signable_params, private_key=private_key,
+                                path='/withdrawals')
 
     def execute_withdrawal(self, withdrawal_params, private_key):
         """
@@ -781,5 +858,7 @@ class AuthenticatedClient(PublicClient):
         :return: Dictionary with the status of the withdrawal request and blockchain transaction details.
         """
         withdrawal_id = withdrawal_params['id']
-        api_params = self.sign_execute_withdrawal_function[self.blockchain](withdrawal_params, private_key)
-        return self.request.post(path='/withdrawals/{}/broadcast'.format(withdrawal_id), json_data=api_params)
+        return self.signed_post(span_name='execute_withdrawal',
+                                sign_function=self.sign_execute_withdrawal_function[self.blockchain],
+                                params=withdrawal_params, private_key=private_key,
+                                path='/withdrawals/{}/broadcast'.format(withdrawal_id))
@@ -0,0 +1,251 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Real-time candles built from the streamed trades.
+    The CandleAggregator keeps rolling OHLCV candles for the candlestick intervals of the REST API, seeds them from
+    the get_candlesticks function and updates the open candle of every interval in constant time for each trade.
+Usage:
+    from switcheo.candles import CandleAggregator
+"""
+
+import threading
+import time
+from collections import deque
+from switcheo.columnar import trade_price
+from switcheo.history import candlestick_intervals
+from switcheo.utils import iso8601_to_epoch
+
+
+def trade_time(trade):
+    """
+    Time (in epoch seconds) of a trade, from an ISO 8601 or epoch seconds event_time.
+    """
+    event_time = trade['event_time']
+    if isinstance(event_time, str):
+        return iso8601_to_epoch(event_time)
+    return float(event_time)
+
+
+class RecentTradeIds(object):
+    """
+    Bounded set of the most recent trade ids, to skip trades received twice, for example in a snapshot after a resync.
+    """
+
+    def __init__(self, max_ids=10000):
+        self.max_ids = max_ids
+        self.queue = deque()
+        self.ids = set()
+
+    def add(self, trade_id):
+        """
+        :return: True if the trade id is new, False if it has been added before.
+        """
+        if trade_id is None:
+            return True
+        if trade_id in self.ids:
+            return False
+        self.queue.append(trade_id)
+        self.ids.add(trade_id)
+        if len(self.queue) > self.max_ids:
+            self.ids.discard(self.queue.popleft())
+        return True
+
+
+def seed_candle(candle):
+    return {
+        'time': int(candle['time']),
+        'open': float(candle['open']),
+        'close': float(candle['close']),
+        'high': float(candle['high']),
+        'low': float(candle['low']),
+        'volume': float(candle['volume']),
+        'quote_volume': float(candle['quote_volume'])
+    }
+
+
+class CandleAggregator(object):
+    """
+    Rolling candles per pair and interval, in the format of the get_candlesticks function with numeric values.
+    The volume is the sum of the fill amounts (quote asset) and the quote_volume the sum of the take amounts (base
+    asset) of the trades, as in the candles of the REST API::
+
+        candle_aggregator = CandleAggregator(intervals=[1, 5])
+        candle_aggregator.seed(client=public_client, pair="SWTH_NEO")
+        candle_aggregator.attach(trade_events)
+        ....
+        candle_aggregator.current(pair="SWTH_NEO", interval=1)
+    """
+
+    def __init__(self, intervals=None, max_candles=1000, max_trade_ids=10000):
+        """
+
+        :param intervals: The time intervals (in minutes) of the candles, every interval of the REST API by default.
+        :type intervals: list
+        :param max_candles: The number of candles kept per pair and interval.
+        :type max_candles: int
+        :param max_trade_ids: The number of recent trade ids kept to skip trades received twice.
+        :type max_trade_ids: int
+        """
+        self.intervals = list(intervals or candlestick_intervals)
+        for interval in self.intervals:
+            if interval not in candlestick_intervals:
+                raise ValueError("Candle interval {} is not one of {}.".format(interval, candlestick_intervals))
+        self.max_candles = max_candles
+        self.max_trade_ids = max_trade_ids
+        self.candles = {}
+        self.seeded_until = {}
+        self.trade_ids = {}
+        self.trades = 0
+        self.seeding = {}
+        self.lock = threading.Lock()
+
+    def _pair_candles(self, pair):
+        if pair not in self.candles:
+            self.candles[pair] = dict((interval, deque(maxlen=self.max_candles)) for interval in self.intervals)
+            self.trade_ids[pair] = RecentTradeIds(max_ids=self.max_trade_ids)
+        return self.candles[pair]
+
+    def attach(self, trade_events):
+        """
+        Feed the aggregator from the trades of a TradeEventsNamespace.
+        """
+        trade_events.add_listener(self.on_trades)
+        return trade_events
+
+    def seed(self, client, pair, end_time=None, candles=None):
+        """
+        Load the most recent candles of every interval from the REST API, trades up to end_time are then skipped.
+        Trades received while the candles are requested are added on top of the seeded candles.
+
+        :param client: The client used to request the candles, a PublicClient.
+        :type client: PublicClient
+        :param pair: The trading pair of the candles.
+        :type pair: str
+        :param end_time: The end time (in epoch seconds) of the seeded candles, now by default.
+        :type end_time: int
+        :param candles: The number of candles requested per interval, max_candles by default.
+        :type candles: int
+        """
+        end_time = int(end_time or time.time())
+        candle_count = min(candles or self.max_candles, self.max_candles)
+        seeded = {}
+        with self.lock:
+            self.seeding[pair] = []
+        try:
+            for interval in self.intervals:
+                start_time = end_time - interval * 60 * candle_count
+                interval_candles = client.get_candlesticks(pair=pair, start_time=start_time, end_time=end_time,
+                                                           interval=interval)
+                seeded[interval] = [seed_candle(candle)
+                                    for candle in sorted(interval_candles, key=lambda candle: int(candle['time']))]
+        finally:
+            with self.lock:
+                live_trades = self.seeding.pop(pair)
+                if len(seeded) == len(self.intervals):
+                    pair_candles = self._pair_candles(pair)
+                    for interval in self.intervals:
+                        pair_candles[interval].clear()
+                        pair_candles[interval].extend(seeded[interval])
+                    self.seeded_until[pair] = end_time
+                for trade in live_trades:
+                    self._add_trade(pair, trade)
+
+    def on_trades(self, pair, trades):
+        for trade in reversed(trades):
+            self.add_trade(pair, trade)
+
+    def add_trade(self, pair, trade):
+        """
+        Update the candles of every interval with one trade.
+
+        :param pair: The trading pair of the trade.
+        :type pair: str
+        :param trade: Trade dictionary with id, event_time, fill_amount and take_amount.
+        :type trade: dict
+        :return: True if the trade was added, False if it was a duplicate or older than the seeded candles.
+        """
+        with self.lock:
+            return self._add_trade(pair, trade)
+
+    def _add_trade(self, pair, trade):
+        if pair in self.seeding:
+            self.seeding[pair].append(trade)
+            return True
+        pair_candles = self._pair_candles(pair)
+        if not self.trade_ids[pair].add(trade.get('id')):
+            return False
+        event_time = trade_time(trade)
+        if event_time <= self.seeded_until.get(pair, 0):
+            return False
+        price = trade_price(trade)
+        volume = float(trade['fill_amount'])
+        quote_volume = float(trade['take_amount'])
+        for interval in self.intervals:
+            interval_seconds = interval * 60
+            candle_time = int(event_time) - int(event_time) % interval_seconds
+            candles = pair_candles[interval]
+            candle = candles[-1] if candles else None
+            if candle is None or candle['time'] < candle_time:
+                candles.append({
+                    'time': candle_time,
+                    'open': price,
+                    'close': price,
+                    'high': price,
+                    'low': price,
+                    'volume': volume,
+                    'quote_volume': quote_volume
+                })
+                continue
+            if candle['time'] > candle_time:
+                candle = next((late for late in reversed(candles) if late['time'] == candle_time), None)
+                if candle is None:
+                    continue
+            else:
+                candle['close'] = price
+            candle['high'] = max(candle['high'], price)
+            candle['low'] = min(candle['low'], price)
+            candle['volume'] += volume
+            candle['quote_volume'] += quote_volume
+        self.trades += 1
+        return True
+
+    def current(self, pair, interval):
+        """
+        The open candle of the pair and interval, None before the first candle.
+        """
+        with self.lock:
+            candles = self.candles.get(pair, {}).get(interval)
+            if not candles:
+                return None
+            return dict(candles[-1])
+
+    def get_candles(self, pair, interval):
+        """
+        The candles of the pair and interval.
+        Execution of this function is as follows::
+
+            get_candles(pair="SWTH_NEO", interval=1)
+
+        The expected return result for this function is as follows::
+
+            [{
+                'time': 1533168000,
+                'open': 0.00046835,
+                'close': 0.00046835,
+                'high': 0.00046835,
+                'low': 0.00046835,
+                'volume': 240315335.0,
+                'quote_volume': 513110569018.0
+            },
+            ...
+            ]
+
+        :param pair: The trading pair of the candles.
+        :type pair: str
+        :param interval: The time interval (in minutes) of the candles.
+        :type interval: int
+        :return: List of candles, oldest first, the last candle is still open.
+        """
+        with self.lock:
+            candles = list(self.candles.get(pair, {}).get(interval, []))
+            return [dict(candle) for candle in candles]
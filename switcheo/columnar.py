@@ -0,0 +1,198 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Columnar (struct of arrays) containers for the market data endpoints of the Public Client.
+    Each column is a typed array.array with prices and amounts already converted to numbers, which can be handed to
+    NumPy without copying when it is installed. The list endpoints are converted element by element while the
+    response is decoded, so the rows are never held as a list of dictionaries next to the columns.
+Usage:
+    from switcheo.columnar import ColumnarTable, candlesticks_to_columns
+"""
+
+from array import array
+from collections import OrderedDict
+from operator import itemgetter
+from switcheo.utils import iso8601_to_epoch
+
+
+class ColumnarTable(object):
+    """
+    Struct of arrays holding one typed column per field, in the order the columns were given.
+
+    Numeric columns are array.array instances (or memoryviews for tables read from a MarketDataStore) and text
+    columns are lists::
+
+        table = pc.get_candlesticks(pair="SWTH_NEO", start_time=start, end_time=end, interval=60, columnar=True)
+        table['close']       # array('d', [0.00046835, ...])
+        table.to_numpy()     # {'time': numpy.ndarray, 'open': numpy.ndarray, ...}
+    """
+
+    def __init__(self, columns):
+        """
+
+        :param columns: Dictionary of column names and typed arrays, all of the same length.
+        :type columns: OrderedDict
+        """
+        self.columns = columns
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def nbytes(self):
+        """
+        Number of bytes used by the numeric columns.
+        """
+        return sum(len(column) * column.itemsize for column in self.columns.values()
+                   if isinstance(column, (array, memoryview)))
+
+    def to_numpy(self):
+        """
+        Convert the table to a dictionary of NumPy arrays, numeric columns share memory with the table.
+
+        :return: Dictionary of column names and NumPy arrays.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('NumPy is required to convert a ColumnarTable, install it with "pip install numpy".')
+        converted = OrderedDict()
+        for name, column in self.columns.items():
+            if isinstance(column, array):
+                converted[name] = numpy.frombuffer(column, dtype=numpy.dtype(column.typecode))
+            elif isinstance(column, memoryview):
+                converted[name] = numpy.frombuffer(column, dtype=numpy.dtype(column.format))
+            else:
+                converted[name] = numpy.array(column)
+        return converted
+
+
+def to_float(value):
+    if value is None:
+        return float('nan')
+    return float(value)
+
+
+def float_column(rows, key):
+    return array('d', map(to_float, map(itemgetter(key), rows)))
+
+
+candle_keys = ['open', 'close', 'high', 'low', 'volume', 'quote_volume']
+
+
+def candlesticks_to_columns(candles):
+    """
+    Convert the result of the get_candlesticks function to a ColumnarTable.
+
+    :param candles: Iterable of candle dictionaries, such as a list or the generator of a streamed response.
+    :type candles: iterable
+    :return: ColumnarTable with an int64 time column (epoch seconds) and float64 price and volume columns.
+    """
+    columns = OrderedDict([('time', array('q'))] + [(key, array('d')) for key in candle_keys])
+    time_column = columns['time']
+    value_columns = [(key, columns[key].append) for key in candle_keys]
+    for candle in candles:
+        time_column.append(int(candle['time']))
+        for key, append in value_columns:
+            append(to_float(candle[key]))
+    return ColumnarTable(columns)
+
+
+def amount_scale(decimals, key):
+    if not decimals or not decimals[key]:
+        return 1.0
+    return 10.0 ** decimals[key]
+
+
+def trade_price(trade, decimals=None):
+    """
+    Price of a filled trade, the fill amount (quote asset) divided by the take amount (base asset).
+    The amounts are in the base units of their tokens, without decimals both tokens are taken to have the same.
+
+    :param trade: Trade dictionary as returned by the get_trades function.
+    :type trade: dict
+    :param decimals: The token decimals of the fill_amount and take_amount, as returned by the pair_decimals function
+                     of the Public Client.
+    :type decimals: dict
+    :return: The price of the trade.
+    """
+    if 'price' in trade:
+        return float(trade['price'])
+    if not decimals:
+        return float(trade['fill_amount']) / float(trade['take_amount'])
+    return (float(trade['fill_amount']) / 10.0 ** decimals['fill_amount']) / \
+        (float(trade['take_amount']) / 10.0 ** decimals['take_amount'])
+
+
+def trades_to_columns(trades, decimals=None):
+    """
+    Convert the result of the get_trades function to a ColumnarTable.
+    With the token decimals of the pair the amounts are scaled from base units to token amounts, and the price is
+    correct for tokens with different decimals, such as an 18 decimal Ethereum token against an 8 decimal NEO asset.
+
+    :param trades: Iterable of trade dictionaries, such as a list or the generator of a streamed response.
+    :type trades: iterable
+    :param decimals: The token decimals of the fill_amount and take_amount, as returned by the pair_decimals function
+                     of the Public Client.
+    :type decimals: dict
+    :return: ColumnarTable with id, event_time (epoch seconds), fill_amount, take_amount, price and is_buy columns.
+    """
+    columns = OrderedDict([('id', []), ('event_time', array('d')), ('fill_amount', array('d')),
+                           ('take_amount', array('d')), ('price', array('d')), ('is_buy', array('b'))])
+    fill_scale = amount_scale(decimals, 'fill_amount')
+    take_scale = amount_scale(decimals, 'take_amount')
+    for trade in trades:
+        columns['id'].append(trade['id'])
+        columns['event_time'].append(iso8601_to_epoch(trade['event_time']))
+        columns['fill_amount'].append(to_float(trade['fill_amount']) / fill_scale)
+        columns['take_amount'].append(to_float(trade['take_amount']) / take_scale)
+        columns['price'].append(trade_price(trade, decimals))
+        columns['is_buy'].append(trade['is_buy'])
+    return ColumnarTable(columns)
+
+
+def offer_book_to_columns(offer_book):
+    """
+    Convert the result of the get_offer_book function to a ColumnarTable per side of the book.
+
+    :param offer_book: Dictionary with the asks and bids of the order book.
+    :type offer_book: dict
+    :return: Dictionary with an asks and bids ColumnarTable, each with price and quantity columns.
+    """
+    book_columns = {}
+    for side in ['asks', 'bids']:
+        columns = OrderedDict()
+        columns['price'] = float_column(offer_book[side], 'price')
+        columns['quantity'] = float_column(offer_book[side], 'quantity')
+        book_columns[side] = ColumnarTable(columns)
+    return book_columns
+
+
+def last_24_hours_to_columns(tickers):
+    """
+    Convert the result of the get_last_24_hours function to a ColumnarTable.
+
+    :param tickers: Iterable of 24 hour statistics dictionaries, such as a list or the generator of a streamed response.
+    :type tickers: iterable
+    :return: ColumnarTable with a pair column and float64 price and volume columns.
+    """
+    columns = OrderedDict([('pair', [])] + [(key, array('d')) for key in candle_keys])
+    value_columns = [(key, columns[key].append) for key in candle_keys]
+    for ticker in tickers:
+        columns['pair'].append(ticker['pair'])
+        for key, append in value_columns:
+            append(to_float(ticker[key]))
+    return ColumnarTable(columns)
@@ -9,9 +9,8 @@ Usage:
 
 import binascii
 from switcheo.utils import stringify_message
-from switcheo.ethereum.utils import sign_txn_array
-from eth_utils import to_checksum_address, to_normalized_address
-from eth_account.messages import defunct_hash_message
+from switcheo.ethereum.utils import sign_txn_array, sign_stringified_message, eth_get_address_from_private_key
+from eth_utils import to_checksum_address
 from eth_account.account import Account
 from web3 import Web3, HTTPProvider
 
@@ -38,12 +37,10 @@ def sign_create_cancellation(cancellation_params, private_key):
     :type private_key: str
     :return: Dictionary of signed message to send to the Switcheo API.
     """
-    hash_message = defunct_hash_message(text=stringify_message(cancellation_params))
-    hex_message = binascii.hexlify(hash_message).decode()
-    signed_message = binascii.hexlify(Account.signHash(hex_message, private_key=private_key)['signature']).decode()
     create_params = cancellation_params.copy()
-    create_params['address'] = to_normalized_address(Account.privateKeyToAccount(private_key=private_key).address)
-    create_params['signature'] = signed_message
+    create_params['address'] = eth_get_address_from_private_key(private_key=private_key)
+    create_params['signature'] = sign_stringified_message(message=stringify_message(cancellation_params),
+                                                          private_key=private_key)
     return create_params
 
 
@@ -97,12 +94,10 @@ def sign_create_deposit(deposit_params, private_key):
     :type private_key: str
     :return: Dictionary of signed message to send to the Switcheo API.
     """
-    hash_message = defunct_hash_message(text=stringify_message(deposit_params))
-    hex_message = binascii.hexlify(hash_message).decode()
-    signed_message = binascii.hexlify(Account.signHash(hex_message, private_key=private_key)['signature']).decode()
     create_params = deposit_params.copy()
-    create_params['address'] = to_normalized_address(Account.privateKeyToAccount(private_key=private_key).address)
-    create_params['signature'] = signed_message
+    create_params['address'] = eth_get_address_from_private_key(private_key=private_key)
+    create_params['signature'] = sign_stringified_message(message=stringify_message(deposit_params),
+                                                          private_key=private_key)
     return create_params
 
 
@@ -169,12 +164,10 @@ def sign_create_order(order_params, private_key):
     :type private_key: str
     :return: Dictionary of signed message to send to the Switcheo API.
     """
-    hash_message = defunct_hash_message(text=stringify_message(order_params))
-    hex_message = binascii.hexlify(hash_message).decode()
     create_params = order_params.copy()
-    signed_message = binascii.hexlify(Account.signHash(hex_message, private_key=private_key)['signature']).decode()
-    create_params['signature'] = signed_message
-    create_params['address'] = to_normalized_address(Account.privateKeyToAccount(private_key=private_key).address)
+    create_params['signature'] = sign_stringified_message(message=stringify_message(order_params),
+                                                          private_key=private_key)
+    create_params['address'] = eth_get_address_from_private_key(private_key=private_key)
     return create_params
 
 
@@ -238,12 +231,10 @@ def sign_create_withdrawal(withdrawal_params, private_key):
     :type private_key: str
     :return: Dictionary of the signed transaction to initiate the withdrawal of ETH via the Switcheo API.
     """
-    hash_message = defunct_hash_message(text=stringify_message(withdrawal_params))
-    hex_message = binascii.hexlify(hash_message).decode()
-    signed_message = binascii.hexlify(Account.signHash(hex_message, private_key=private_key)['signature']).decode()
     create_params = withdrawal_params.copy()
-    create_params['address'] = to_normalized_address(Account.privateKeyToAccount(private_key=private_key).address)
-    create_params['signature'] = signed_message
+    create_params['address'] = eth_get_address_from_private_key(private_key=private_key)
+    create_params['signature'] = sign_stringified_message(message=stringify_message(withdrawal_params),
+                                                          private_key=private_key)
     return create_params
 
 
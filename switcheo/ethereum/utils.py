@@ -1,5 +1,7 @@
 import binascii
 from eth_account.account import Account
+from eth_account.messages import defunct_hash_message
+from eth_utils import to_normalized_address
 
 
 def sign_txn_array(messages, private_key):
@@ -9,3 +11,13 @@ def sign_txn_array(messages, private_key):
             binascii.hexlify(Account.signHash(message['txn']['sha256'], private_key=private_key)['signature']).decode()
         message_dict[message['id']] = '0x' + signed_message
     return message_dict
+
+
+def sign_stringified_message(message, private_key):
+    hash_message = defunct_hash_message(text=message)
+    hex_message = binascii.hexlify(hash_message).decode()
+    return binascii.hexlify(Account.signHash(hex_message, private_key=private_key)['signature']).decode()
+
+
+def eth_get_address_from_private_key(private_key):
+    return to_normalized_address(Account.privateKeyToAccount(private_key=private_key).address)
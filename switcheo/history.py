@@ -0,0 +1,277 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Bulk historical market data downloads built on top of the Public Client.
+    Long time ranges are split into windows that fit inside a single API request, fetched concurrently and
+    streamed back to the caller in time order.
+Usage:
+    from switcheo.history import TradeHistory, get_candlestick_history
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+candlestick_intervals = [1, 5, 30, 60, 360, 1440]
+
+max_trade_limit = 10000
+
+
+def candlestick_chunks(start_time, end_time, interval, max_candles=1000):
+    """
+    Split a time range into (start_time, end_time) windows aligned to the candle interval that each contain at most
+    max_candles candles.
+
+    :param start_time: The start time (in epoch seconds) of the range.
+    :type start_time: int
+    :param end_time: The end time (in epoch seconds) of the range.
+    :type end_time: int
+    :param interval: The time interval (in minutes) of the candles.
+    :type interval: int
+    :param max_candles: The maximum number of candles requested in a single window.
+    :type max_candles: int
+    :return: List of (start_time, end_time) tuples covering the range.
+    """
+    if interval not in candlestick_intervals:
+        raise ValueError('Candlestick interval {} is not one of {}.'.format(interval, candlestick_intervals))
+    if max_candles < 1:
+        raise ValueError('At least 1 candle must be requested per window, you entered {}.'.format(max_candles))
+    interval_seconds = interval * 60
+    chunk_seconds = interval_seconds * max_candles
+    chunk_start = int(start_time) - int(start_time) % interval_seconds
+    chunks = []
+    while chunk_start <= end_time:
+        chunk_end = min(chunk_start + chunk_seconds - interval_seconds, int(end_time))
+        chunks.append((max(chunk_start, int(start_time)), chunk_end))
+        chunk_start += chunk_seconds
+    return chunks
+
+
+def fill_candlestick_gaps(candles, interval):
+    """
+    Insert flat, zero volume candles for every interval missing between the first and last candle.
+    The filled candles open, close, high and low at the close of the previous candle.
+
+    :param candles: List of candles sorted by time, oldest first.
+    :type candles: list
+    :param interval: The time interval (in minutes) of the candles.
+    :type interval: int
+    :return: List of candles with one candle per interval, oldest first.
+    """
+    interval_seconds = interval * 60
+    filled = []
+    for candle in candles:
+        if filled:
+            previous = filled[-1]
+            gap_time = int(previous['time']) + interval_seconds
+            while gap_time < int(candle['time']):
+                filled.append({
+                    'time': str(gap_time),
+                    'open': previous['close'],
+                    'close': previous['close'],
+                    'high': previous['close'],
+                    'low': previous['close'],
+                    'volume': '0.0',
+                    'quote_volume': '0.0'
+                })
+                gap_time += interval_seconds
+        filled.append(candle)
+    return filled
+
+
+def get_candlestick_history(client, pairs, start_time, end_time, interval, max_candles=1000, max_workers=4,
+                            fill_gaps=False):
+    """
+    Function to fetch candlesticks for one or more trading pairs over a time range of any length.
+    The range is split into windows of at most max_candles candles, every window of every pair is requested
+    concurrently with the get_candlesticks function and the results are merged, deduplicated by candle time and
+    sorted oldest first.
+    Execution of this function is as follows::
+
+        get_candlestick_history(client=pc,
+                                pairs=["SWTH_NEO", "GAS_NEO"],
+                                start_time=round(time.time()) - 2419200,
+                                end_time=round(time.time()),
+                                interval=1,
+                                fill_gaps=True)
+
+    The expected return result for this function is as follows::
+
+        {
+            'SWTH_NEO': [{
+                'time': '1533081600',
+                'open': '0.00046835',
+                'close': '0.00046835',
+                'high': '0.00046835',
+                'low': '0.00046835',
+                'volume': '1170875.0',
+                'quote_volume': '2500000000.0'
+            }, {
+            ....
+            }],
+            'GAS_NEO': [....]
+        }
+
+    :param client: The Public Client used to request candlesticks.
+    :type client: PublicClient
+    :param pairs: The trading pair or list of trading pairs to request candle statistics for.
+    :type pairs: str or list
+    :param start_time: The start time (in epoch seconds) range for collecting candle statistics.
+    :type start_time: int
+    :param end_time: The end time (in epoch seconds) range for collecting candle statistics.
+    :type end_time: int
+    :param interval: The time interval (in minutes) for candle statistics.  Allowed values: 1, 5, 30, 60, 360, 1440
+    :type interval: int
+    :param max_candles: The maximum number of candles requested in a single window.
+    :type max_candles: int
+    :param max_workers: The number of windows requested concurrently.
+    :type max_workers: int
+    :param fill_gaps: Flag to insert flat, zero volume candles for intervals without trades.
+    :type fill_gaps: bool
+    :return: Dictionary of trading pairs with the list of candles for each pair, oldest first.
+    """
+    if isinstance(pairs, str):
+        pairs = [pairs]
+    chunks = candlestick_chunks(start_time=start_time, end_time=end_time, interval=interval,
+                                max_candles=max_candles)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(pair, executor.submit(client.get_candlesticks, pair=pair, start_time=chunk_start,
+                                          end_time=chunk_end, interval=interval))
+                   for pair in pairs for chunk_start, chunk_end in chunks]
+        merged = dict((pair, {}) for pair in pairs)
+        for pair, future in futures:
+            for candle in future.result():
+                merged[pair][int(candle['time'])] = candle
+    candlestick_history = {}
+    for pair in pairs:
+        candles = [merged[pair][candle_time] for candle_time in sorted(merged[pair])]
+        if fill_gaps:
+            candles = fill_candlestick_gaps(candles=candles, interval=interval)
+        candlestick_history[pair] = candles
+    return candlestick_history
+
+
+class TradeHistory(object):
+    """
+    Iterable over every filled trade for a trading pair between two epoch times, oldest first.
+
+    The [start_time, end_time] range is split into windows that are requested with the get_trades function of the
+    Public Client on a thread pool. Any window that returns the maximum number of trades is split in half and
+    requested again, and the window size adapts to the trade density as the download progresses. Trades that fall
+    on the edge of two windows are only yielded once. A window that can not be split further is requested again with
+    the maximum limit of the API, and a ValueError naming the window is raised if even that returns the maximum,
+    rather than skipping trades the API did not return.
+
+    The download can be resumed by passing the checkpoint of a previous run back in::
+
+        history = TradeHistory(client=pc, pair="SWTH_NEO", start_time=1533081600, end_time=1535760000)
+        for trade in history:
+            save(trade)
+            save_checkpoint(history.checkpoint)
+
+        history = TradeHistory(client=pc, pair="SWTH_NEO", start_time=1533081600, end_time=1535760000,
+                               checkpoint=load_checkpoint())
+    """
+
+    def __init__(self, client, pair, start_time, end_time, window=86400, limit=5000, max_workers=4,
+                 checkpoint=None):
+        """
+
+        :param client: The Public Client used to request trades.
+        :type client: PublicClient
+        :param pair: The trading pair that will be used to request filled trades.
+        :type pair: str
+        :param start_time: Only return trades after this time (in epoch seconds).
+        :type start_time: int
+        :param end_time: Only return trades before this time (in epoch seconds).
+        :type end_time: int
+        :param window: The initial window size (in seconds) of each request.
+        :type window: int
+        :param limit: The number of trades requested per window. Min: 1, Max: 10000, Default: 5000
+        :type limit: int
+        :param max_workers: The number of windows requested concurrently.
+        :type max_workers: int
+        :param checkpoint: The checkpoint of a previous download to resume from.
+        :type checkpoint: dict
+        """
+        if limit > max_trade_limit or limit < 1:
+            raise ValueError("Attempting to request more trades than allowed by the API.")
+        if window < 1:
+            raise ValueError("Window size {} must be at least 1 second.".format(window))
+        self.client = client
+        self.pair = pair
+        self.start_time = int(start_time)
+        self.end_time = int(end_time)
+        self.window = int(window)
+        self.max_window = int(window)
+        self.limit = limit
+        self.max_workers = max_workers
+        self.requests = 0
+        self.splits = 0
+        self._position = self.start_time
+        self._seen_ids = set()
+        if checkpoint is not None:
+            if checkpoint['pair'] != pair:
+                raise ValueError(
+                    'Checkpoint pair {} does not match requested pair {}.'.format(checkpoint['pair'], pair))
+            self._position = max(self.start_time, int(checkpoint['start_time']))
+            self._seen_ids = set(checkpoint['seen_ids'])
+
+    @property
+    def checkpoint(self):
+        """
+        JSON serializable state of the download, every trade yielded so far is covered by the checkpoint.
+        """
+        return {
+            'pair': self.pair,
+            'start_time': self._position,
+            'end_time': self.end_time,
+            'seen_ids': sorted(self._seen_ids)
+        }
+
+    def _fetch(self, start_time, end_time, limit=None):
+        return self.client.get_trades(pair=self.pair, start_time=start_time, end_time=end_time,
+                                      limit=limit or self.limit)
+
+    def _adapt_window(self, trade_count):
+        if trade_count >= self.limit:
+            self.window = max(1, self.window // 2)
+        elif trade_count < self.limit // 4:
+            self.window = min(self.max_window * 16, self.window * 2)
+
+    def __iter__(self):
+        pending = deque()
+        next_start = self._position
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def submit(start_time, end_time):
+                self.requests += 1
+                return start_time, end_time, executor.submit(self._fetch, start_time, end_time)
+
+            while pending or next_start < self.end_time:
+                while len(pending) < self.max_workers * 2 and next_start < self.end_time:
+                    window_end = min(next_start + self.window, self.end_time)
+                    pending.append(submit(next_start, window_end))
+                    next_start = window_end
+                window_start, window_end, future = pending.popleft()
+                trades = future.result()
+                self._adapt_window(len(trades))
+                if len(trades) >= self.limit and window_end - window_start > 1:
+                    self.splits += 1
+                    middle = (window_start + window_end) // 2
+                    pending.appendleft(submit(middle, window_end))
+                    pending.appendleft(submit(window_start, middle))
+                    continue
+                if len(trades) >= self.limit and self.limit < max_trade_limit:
+                    self.requests += 1
+                    trades = self._fetch(window_start, window_end, limit=max_trade_limit)
+                if len(trades) >= max_trade_limit:
+                    raise ValueError('More than {} trades between {} and {}, the API can not return all of them.'
+                                     .format(max_trade_limit, window_start, window_end))
+                for trade in sorted(trades, key=lambda t: (t['event_time'], t['id'])):
+                    if trade['id'] in self._seen_ids:
+                        continue
+                    self._seen_ids.add(trade['id'])
+                    yield trade
+                self._position = window_end
+                self._seen_ids = set(trade['id'] for trade in trades)
@@ -0,0 +1,215 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Latency and size metrics of the requests made to the Switcheo REST API.
+    A RequestMetrics collector is attached as a hook to the Request of a client and keeps histograms of the request
+    duration and of every phase per endpoint, together with request, byte, retry and error counters, and exports them
+    in the Prometheus text exposition format. Clients without hooks take the uninstrumented code path.
+Usage:
+    from switcheo.instrumentation import RequestMetrics
+"""
+
+import re
+import threading
+
+
+default_buckets = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+endpoint_id_pattern = re.compile(r'/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|'
+                                 r'(?:0x)?[0-9a-fA-F]{32,})(?=/|$)')
+
+
+def endpoint_label(path):
+    """
+    The endpoint of a request path with order, deposit, withdrawal and cancellation ids replaced by {id}.
+    Execution of this function is as follows::
+
+        endpoint_label(path='/orders/7cbdf481-6acf-4bf3-a1ed-4773f31e6931/broadcast')
+
+    The expected return result for this function is as follows::
+
+        '/orders/{id}/broadcast'
+
+    :param path: The request path.
+    :type path: str
+    :return: The endpoint label of the path.
+    """
+    return endpoint_id_pattern.sub('/{id}', path)
+
+
+def percentile(values, percent):
+    """
+    The value below which percent percent of the values fall, by nearest rank.
+    Execution of this function is as follows::
+
+        percentile(values=[0.012, 0.004, 0.009, 0.031], percent=50)
+
+    The expected return result for this function is as follows::
+
+        0.009
+
+    :param values: The observed values, in any order.
+    :type values: list
+    :param percent: The percentile, from 0 to 100.
+    :type percent: float
+    :return: The percentile of the values, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100.0 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return '{' + ','.join('{}="{}"'.format(key, escape_label(value)) for key, value in labels) + '}'
+
+
+class Histogram(object):
+    """
+    Cumulative histogram of observations with the Prometheus bucket semantics.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def exposition(self, name, labels):
+        lines = []
+        for bucket, count in zip(self.buckets, self.counts):
+            lines.append('{}_bucket{} {}'.format(name, format_labels(labels + [('le', repr(float(bucket)))]), count))
+        lines.append('{}_bucket{} {}'.format(name, format_labels(labels + [('le', '+Inf')]), self.count))
+        lines.append('{}_sum{} {}'.format(name, format_labels(labels), repr(self.sum)))
+        lines.append('{}_count{} {}'.format(name, format_labels(labels), self.count))
+        return lines
+
+
+class RequestMetrics(object):
+    """
+    Collects the request events of one or more clients::
+
+        metrics = RequestMetrics()
+        metrics.attach(public_client)
+        ....
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets=None, prefix='switcheo'):
+        """
+
+        :param buckets: The upper bounds (in seconds) of the histogram buckets.
+        :type buckets: list
+        :param prefix: The prefix of the metric names.
+        :type prefix: str
+        """
+        self.buckets = sorted(buckets or default_buckets)
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.phases = {}
+        self.requests = {}
+        self.bytes = {}
+        self.retries = {}
+        self.errors = {}
+
+    def attach(self, client):
+        """
+        Record the requests of a PublicClient or AuthenticatedClient, or of a Request.
+        """
+        request = getattr(client, 'request', client)
+        request.add_hook(self)
+        return client
+
+    def __call__(self, event):
+        self.record(event)
+
+    def record(self, event):
+        """
+        Record the event of one request, as passed to the hooks of Request.
+
+        :param event: Dictionary with method, path, status, request_bytes, response_bytes, retries, error and timings.
+        :type event: dict
+        """
+        endpoint = (event['method'], endpoint_label(event['path']))
+        status = event['status'] if event['status'] is not None else 'none'
+        with self.lock:
+            if endpoint not in self.durations:
+                self.durations[endpoint] = Histogram(self.buckets)
+            self.durations[endpoint].observe(event['timings']['total'])
+            for phase, seconds in event['timings'].items():
+                if phase == 'total':
+                    continue
+                if (endpoint, phase) not in self.phases:
+                    self.phases[(endpoint, phase)] = Histogram(self.buckets)
+                self.phases[(endpoint, phase)].observe(seconds)
+            self.requests[(endpoint, status)] = self.requests.get((endpoint, status), 0) + 1
+            for direction, key in [('sent', 'request_bytes'), ('received', 'response_bytes')]:
+                self.bytes[(endpoint, direction)] = self.bytes.get((endpoint, direction), 0) + event[key]
+            if event['retries']:
+                self.retries[endpoint] = self.retries.get(endpoint, 0) + event['retries']
+            if event['error']:
+                self.errors[(endpoint, event['error'])] = self.errors.get((endpoint, event['error']), 0) + 1
+
+    def to_prometheus(self):
+        """
+        The metrics in the Prometheus text exposition format.
+        Execution of this function is as follows::
+
+            to_prometheus()
+
+        The expected return result for this function is as follows::
+
+            # HELP switcheo_request_duration_seconds Duration of Switcheo API requests.
+            # TYPE switcheo_request_duration_seconds histogram
+            switcheo_request_duration_seconds_bucket{method="GET",endpoint="/offers/book",le="0.005"} 0
+            ....
+            switcheo_requests_total{method="GET",endpoint="/offers/book",status="200"} 12
+
+        :return: String of the exposition, one metric family after the other.
+        """
+        prefix = self.prefix
+        lines = []
+        with self.lock:
+            lines.append('# HELP {}_request_duration_seconds Duration of Switcheo API requests.'.format(prefix))
+            lines.append('# TYPE {}_request_duration_seconds histogram'.format(prefix))
+            for (method, endpoint), histogram in sorted(self.durations.items()):
+                lines.extend(histogram.exposition('{}_request_duration_seconds'.format(prefix),
+                                                  [('method', method), ('endpoint', endpoint)]))
+            lines.append('# HELP {}_request_phase_seconds Duration of the phases of Switcheo API requests.'.format(
+                prefix))
+            lines.append('# TYPE {}_request_phase_seconds histogram'.format(prefix))
+            for ((method, endpoint), phase), histogram in sorted(self.phases.items()):
+                lines.extend(histogram.exposition('{}_request_phase_seconds'.format(prefix),
+                                                  [('method', method), ('endpoint', endpoint), ('phase', phase)]))
+            counters = [
+                ('requests_total', 'Switcheo API requests by status.', self.requests, 'status'),
+                ('request_bytes_total', 'Bytes sent and received by Switcheo API requests.', self.bytes, 'direction'),
+                ('request_errors_total', 'Failed Switcheo API requests by error.', self.errors, 'error')
+            ]
+            for name, help_text, values, label in counters:
+                lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+                lines.append('# TYPE {}_{} counter'.format(prefix, name))
+                for ((method, endpoint), value), count in sorted(values.items(), key=lambda item: str(item[0])):
+                    lines.append('{}_{}{} {}'.format(prefix, name, format_labels(
+                        [('method', method), ('endpoint', endpoint), (label, value)]), count))
+            lines.append('# HELP {}_request_retries_total Retries of Switcheo API requests.'.format(prefix))
+            lines.append('# TYPE {}_request_retries_total counter'.format(prefix))
+            for (method, endpoint), count in sorted(self.retries.items()):
+                lines.append('{}_request_retries_total{} {}'.format(prefix, format_labels(
+                    [('method', method), ('endpoint', endpoint)]), count))
+        return '\n'.join(lines) + '\n'
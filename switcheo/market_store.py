@@ -0,0 +1,318 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Local, append-only, columnar store for candlesticks and trades.
+    Every pair and interval is kept in its own directory with one binary file per column and a small JSON index of
+    the row count, the time ranges already downloaded and the time sorted rows appended for each range. Only the
+    time ranges missing from the store are requested from the Switcheo API, and readers in any process memory map
+    the column files instead of copying them.
+Usage:
+    from switcheo.market_store import MarketDataStore
+"""
+
+import json
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from switcheo.columnar import ColumnarTable, candlesticks_to_columns, trades_to_columns
+from switcheo.history import TradeHistory, get_candlestick_history
+try:
+    import fcntl
+except ImportError:  # Windows, writers in separate processes are not serialized.
+    fcntl = None
+
+
+candlestick_schema = OrderedDict([
+    ('time', 'q'),
+    ('open', 'd'),
+    ('close', 'd'),
+    ('high', 'd'),
+    ('low', 'd'),
+    ('volume', 'd'),
+    ('quote_volume', 'd')
+])
+
+trade_schema = OrderedDict([
+    ('event_time', 'd'),
+    ('fill_amount', 'd'),
+    ('take_amount', 'd'),
+    ('price', 'd'),
+    ('is_buy', 'b')
+])
+
+
+def merge_ranges(ranges):
+    """
+    Merge overlapping or touching [start, end) ranges.
+
+    :param ranges: List of [start, end) ranges.
+    :type ranges: list
+    :return: Sorted list of disjoint [start, end) ranges.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(ranges, start_time, end_time):
+    """
+    The parts of [start_time, end_time) that are not covered by any of the ranges.
+
+    :param ranges: Sorted list of disjoint [start, end) ranges.
+    :type ranges: list
+    :param start_time: The start of the requested range.
+    :type start_time: int
+    :param end_time: The end of the requested range.
+    :type end_time: int
+    :return: List of [start, end) ranges.
+    """
+    missing = []
+    position = start_time
+    for start, end in ranges:
+        if end <= position:
+            continue
+        if start >= end_time:
+            break
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < end_time:
+        missing.append([position, end_time])
+    return missing
+
+
+class ColumnFile(object):
+    """
+    One append-only column of a dataset, stored as raw native-endian values.
+    """
+
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+
+    def append(self, values):
+        with open(self.path, 'ab') as column_file:
+            column_file.write(array(self.typecode, values).tobytes())
+            column_file.flush()
+            os.fsync(column_file.fileno())
+
+    def view(self, rows):
+        """
+        Zero-copy memoryview of the first rows of the column, backed by a read only memory map.
+        """
+        if rows == 0:
+            return memoryview(array(self.typecode))
+        with open(self.path, 'rb') as column_file:
+            column_map = mmap.mmap(column_file.fileno(), rows * self.itemsize, access=mmap.ACCESS_READ)
+        return memoryview(column_map).cast(self.typecode)
+
+
+class Dataset(object):
+    """
+    The column files and index of a single pair and interval.
+    """
+
+    def __init__(self, path, schema, time_column):
+        self.path = path
+        self.schema = schema
+        self.time_column = time_column
+        self.columns = OrderedDict((name, ColumnFile(os.path.join(path, name + '.bin'), typecode))
+                                   for name, typecode in schema.items())
+        self.index_path = os.path.join(path, 'index.json')
+        self.lock_path = os.path.join(path, 'index.lock')
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+
+    def index(self):
+        if not os.path.exists(self.index_path):
+            return {'rows': 0, 'ranges': [], 'chunks': []}
+        with open(self.index_path, 'r') as index_file:
+            return json.load(index_file)
+
+    def write_index(self, index):
+        temporary_path = self.index_path + '.{}.tmp'.format(os.getpid())
+        with open(temporary_path, 'w') as index_file:
+            json.dump(index, index_file)
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(temporary_path, self.index_path)
+
+    def append(self, table, start_time, end_time):
+        """
+        Append the rows of a ColumnarTable and mark [start_time, end_time) as downloaded.
+        The stored ranges are read again once the lock is held and only rows in the parts of the range no other
+        writer has stored in the meantime are appended, sorted by time, as one chunk per part. The index is only
+        updated after every column has been written, so readers never see a partial row.
+        """
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            index = self.index()
+            rows = index['rows']
+            times = table[self.time_column]
+            chunks = []
+            for missing_start, missing_end in missing_ranges(index['ranges'], start_time, end_time):
+                chunk_rows = sorted((row for row in range(len(times)) if missing_start <= times[row] < missing_end),
+                                    key=times.__getitem__)
+                chunks.append((missing_start, missing_end, chunk_rows))
+            if not chunks:
+                return
+            for name, column in self.columns.items():
+                size = os.path.getsize(column.path) if os.path.exists(column.path) else 0
+                if size != rows * column.itemsize:
+                    # Drop rows left behind by a writer that stopped before updating the index.
+                    with open(column.path, 'ab') as column_file:
+                        column_file.truncate(rows * column.itemsize)
+                values = table[name]
+                column.append([values[row] for missing_start, missing_end, chunk_rows in chunks for row in chunk_rows])
+            index.setdefault('chunks', [])
+            for missing_start, missing_end, chunk_rows in chunks:
+                index['chunks'].append([missing_start, missing_end, rows, len(chunk_rows)])
+                index['ranges'] = merge_ranges(index['ranges'] + [[missing_start, missing_end]])
+                rows += len(chunk_rows)
+            index['rows'] = rows
+            self.write_index(index)
+
+    def read(self):
+        rows = self.index()['rows']
+        return ColumnarTable(OrderedDict((name, column.view(rows)) for name, column in self.columns.items()))
+
+    def select(self, start_time, end_time):
+        """
+        Copy the rows with a time in [start_time, end_time) into a new table sorted by time, bisecting the sorted
+        rows of every chunk that overlaps the range.
+        """
+        index = self.index()
+        views = OrderedDict((name, column.view(index['rows'])) for name, column in self.columns.items())
+        times = views[self.time_column]
+        selected = OrderedDict((name, array(typecode)) for name, typecode in self.schema.items())
+        for chunk_start, chunk_end, first_row, chunk_rows in sorted(index.get('chunks', [])):
+            if chunk_end <= start_time or chunk_start >= end_time:
+                continue
+            low = bisect_left(times, start_time, first_row, first_row + chunk_rows)
+            high = bisect_left(times, end_time, low, first_row + chunk_rows)
+            for name, view in views.items():
+                selected[name].frombytes(view[low:high].cast('B'))
+        return ColumnarTable(selected)
+
+
+class MarketDataStore(object):
+    """
+    Local cache of candlesticks and trades downloaded through the Public Client.
+
+    Requests are answered from disk, with only the time ranges that have not been downloaded before sent to the
+    Switcheo API::
+
+        store = MarketDataStore(path='~/.switcheo', client=PublicClient())
+        candles = store.candlesticks(pair="SWTH_NEO", interval=1, start_time=1533081600, end_time=1535760000)
+        candles['close']        # array('d', [...])
+        store.read_candlesticks(pair="SWTH_NEO", interval=1)['close']      # zero-copy memoryview, append order
+
+    Only closed candles are stored, the candle of the current interval is never written to disk.
+    """
+
+    def __init__(self, path, client=None, max_workers=4):
+        """
+
+        :param path: The directory the store is kept in.
+        :type path: str
+        :param client: The Public Client used to download missing time ranges.
+        :type client: PublicClient
+        :param max_workers: The number of requests made concurrently when downloading.
+        :type max_workers: int
+        """
+        self.path = os.path.expanduser(path)
+        self.client = client
+        self.max_workers = max_workers
+        self._datasets = {}
+
+    def _dataset(self, pair, name, schema, time_column):
+        key = (pair, name)
+        if key not in self._datasets:
+            self._datasets[key] = Dataset(path=os.path.join(self.path, pair, name), schema=schema,
+                                          time_column=time_column)
+        return self._datasets[key]
+
+    def candlestick_dataset(self, pair, interval):
+        return self._dataset(pair=pair, name='candles_{}'.format(interval), schema=candlestick_schema,
+                             time_column='time')
+
+    def trade_dataset(self, pair):
+        return self._dataset(pair=pair, name='trades', schema=trade_schema, time_column='event_time')
+
+    def read_candlesticks(self, pair, interval):
+        """
+        Every stored candle for the pair and interval, as memory mapped columns in the order they were written.
+
+        :param pair: The trading pair of the candles.
+        :type pair: str
+        :param interval: The time interval (in minutes) of the candles.
+        :type interval: int
+        :return: ColumnarTable of memoryviews.
+        """
+        return self.candlestick_dataset(pair=pair, interval=interval).read()
+
+    def read_trades(self, pair):
+        """
+        Every stored trade for the pair, as memory mapped columns in the order they were written.
+
+        :param pair: The trading pair of the trades.
+        :type pair: str
+        :return: ColumnarTable of memoryviews.
+        """
+        return self.trade_dataset(pair=pair).read()
+
+    def candlesticks(self, pair, interval, start_time, end_time):
+        """
+        Function to fetch the candles of a pair with a time in [start_time, end_time), downloading any missing ranges.
+
+        :param pair: The trading pair of the candles.
+        :type pair: str
+        :param interval: The time interval (in minutes) for candle statistics.  Allowed values: 1, 5, 30, 60, 360, 1440
+        :type interval: int
+        :param start_time: The start time (in epoch seconds) of the candles.
+        :type start_time: int
+        :param end_time: The end time (in epoch seconds) of the candles.
+        :type end_time: int
+        :return: ColumnarTable of the candles sorted by time.
+        """
+        dataset = self.candlestick_dataset(pair=pair, interval=interval)
+        interval_seconds = interval * 60
+        closed_time = int(time.time()) // interval_seconds * interval_seconds
+        for missing_start, missing_end in missing_ranges(dataset.index()['ranges'], start_time,
+                                                         min(end_time, closed_time)):
+            candles = get_candlestick_history(client=self.client, pairs=pair, start_time=missing_start,
+                                              end_time=missing_end - 1, interval=interval,
+                                              max_workers=self.max_workers)[pair]
+            dataset.append(candlesticks_to_columns(candles), missing_start, missing_end)
+        return dataset.select(start_time, end_time)
+
+    def trades(self, pair, start_time, end_time):
+        """
+        Function to fetch the trades of a pair with an event time in [start_time, end_time), downloading any
+        missing ranges.
+
+        :param pair: The trading pair of the trades.
+        :type pair: str
+        :param start_time: The start time (in epoch seconds) of the trades.
+        :type start_time: int
+        :param end_time: The end time (in epoch seconds) of the trades.
+        :type end_time: int
+        :return: ColumnarTable of the trades sorted by event time.
+        """
+        dataset = self.trade_dataset(pair=pair)
+        for missing_start, missing_end in missing_ranges(dataset.index()['ranges'], start_time,
+                                                         min(end_time, int(time.time()))):
+            history = TradeHistory(client=self.client, pair=pair, start_time=missing_start, end_time=missing_end,
+                                   max_workers=self.max_workers)
+            table = trades_to_columns(history, decimals=self.client.pair_decimals(pair))
+            dataset.append(table, missing_start, missing_end)
+        return dataset.select(start_time, end_time)
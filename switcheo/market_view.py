@@ -0,0 +1,178 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Consolidated view over several streamed order books with the implied prices of every triangle of pairs.
+    The view listens to an OrderBooksNamespace and, when the book of one pair changes, only recomputes the triangles
+    that contain that pair.
+Usage:
+    from switcheo.market_view import MarketView
+"""
+
+from itertools import combinations
+
+
+def pair_assets(pair):
+    base, quote = pair.split('_')
+    return base, quote
+
+
+def find_triangles(pairs):
+    """
+    Every set of three pairs that trade three assets against each other.
+    Execution of this function is as follows::
+
+        find_triangles(pairs=['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH', 'SWTH_GAS'])
+
+    The expected return result for this function is as follows::
+
+        [('NEO_ETH', 'SWTH_ETH', 'SWTH_NEO')]
+
+    :param pairs: The trading pairs to combine.
+    :type pairs: list
+    :return: List of sorted tuples of three pairs.
+    """
+    triangles = []
+    for triangle in combinations(sorted(set(pairs)), 3):
+        assets = [asset for pair in triangle for asset in pair_assets(pair)]
+        if len(set(assets)) == 3 and all(assets.count(asset) == 2 for asset in assets):
+            triangles.append(triangle)
+    return triangles
+
+
+class MarketView(object):
+    """
+    Implied cross rates and available size of every triangle of the streamed pairs.
+
+    A pair BASE_QUOTE is priced in QUOTE per BASE, so converting BASE to QUOTE sells at the best bid and converting
+    QUOTE to BASE buys at the best ask. Book amounts are in the smallest unit of the base asset and are scaled with
+    the decimals of the asset::
+
+        market_view = MarketView(order_books=order_books, pairs=['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH'],
+                                 decimals={'SWTH': 8, 'NEO': 8, 'ETH': 18})
+        market_view.triangle(['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH'])
+    """
+
+    def __init__(self, order_books, pairs, decimals=None, default_decimals=8):
+        """
+
+        :param order_books: The namespace streaming the order books.
+        :type order_books: OrderBooksNamespace
+        :param pairs: The trading pairs of the view.
+        :type pairs: list
+        :param decimals: Dictionary of asset symbols and their decimals.
+        :type decimals: dict
+        :param default_decimals: The decimals of assets missing from the decimals dictionary.
+        :type default_decimals: int
+        """
+        self.order_books = order_books
+        self.pairs = list(pairs)
+        self.decimals = decimals or {}
+        self.default_decimals = default_decimals
+        self.triangles = {}
+        self.pair_triangles = dict((pair, []) for pair in self.pairs)
+        self.recomputed = 0
+        for triangle in find_triangles(self.pairs):
+            self.triangles[triangle] = None
+            for pair in triangle:
+                self.pair_triangles[pair].append(triangle)
+        order_books.add_listener(self.on_book)
+        for pair in self.pairs:
+            if pair in order_books.top_of_book:
+                self.on_book(pair, order_books.top_of_book[pair])
+
+    def subscribe(self, streaming_client, contract_hash):
+        """
+        Subscribe the order book of every pair of the view on an AsyncStreamingClient.
+        """
+        for pair in self.pairs:
+            streaming_client.subscribe_order_book(pair=pair, contract_hash=contract_hash)
+
+    def scale(self, asset):
+        return 10 ** self.decimals.get(asset, self.default_decimals)
+
+    def on_book(self, pair, top_of_book):
+        for triangle in self.pair_triangles.get(pair, []):
+            self.triangles[triangle] = self.compute(triangle)
+            self.recomputed += 1
+
+    def leg(self, from_asset, to_asset):
+        """
+        The top of book conversion between two assets.
+
+        :return: Tuple of the rate (to_asset per from_asset) and the maximum from_asset amount, None without a quote.
+        """
+        for pair in self.pairs:
+            base, quote = pair_assets(pair)
+            if (base, quote) not in [(from_asset, to_asset), (to_asset, from_asset)]:
+                continue
+            top_of_book = self.order_books.top_of_book.get(pair)
+            if top_of_book is None:
+                return None
+            if from_asset == base:
+                best_bid = top_of_book.best_bid()
+                if best_bid is None:
+                    return None
+                price, amount = best_bid
+                return price, float(amount) / self.scale(base)
+            best_ask = top_of_book.best_ask()
+            if best_ask is None or best_ask[0] == 0:
+                return None
+            price, amount = best_ask
+            return 1 / price, float(amount) / self.scale(base) * price
+        return None
+
+    def cycle(self, path):
+        """
+        The implied rate and the maximum starting amount of converting along a path of assets back to the start.
+
+        :param path: The assets of the cycle, for example ['SWTH', 'NEO', 'ETH', 'SWTH'].
+        :type path: list
+        :return: Dictionary with the path, rate and size (in the first asset), None if a leg has no quote.
+        """
+        rate = 1.0
+        size = None
+        for from_asset, to_asset in zip(path, path[1:]):
+            leg = self.leg(from_asset, to_asset)
+            if leg is None:
+                return None
+            leg_rate, leg_size = leg
+            start_size = leg_size / rate
+            size = start_size if size is None else min(size, start_size)
+            rate *= leg_rate
+        return {'path': path, 'rate': rate, 'size': size}
+
+    def compute(self, triangle):
+        assets = sorted(set(asset for pair in triangle for asset in pair_assets(pair)))
+        first, second, third = assets
+        return {
+            'forward': self.cycle([first, second, third, first]),
+            'backward': self.cycle([first, third, second, first])
+        }
+
+    def triangle(self, pairs):
+        """
+        The implied prices of the triangle of three pairs, in both directions of the cycle.
+        Execution of this function is as follows::
+
+            triangle(pairs=['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH'])
+
+        The expected return result for this function is as follows::
+
+            {
+                'forward': {'path': ['ETH', 'NEO', 'SWTH', 'ETH'], 'rate': 0.998, 'size': 0.25},
+                'backward': {'path': ['ETH', 'SWTH', 'NEO', 'ETH'], 'rate': 0.991, 'size': 0.4}
+            }
+
+        :param pairs: The three pairs of the triangle.
+        :type pairs: list
+        :return: Dictionary with the forward and backward cycles, a cycle is None until its legs have quotes.
+        """
+        return self.triangles[tuple(sorted(pairs))]
+
+    def opportunities(self, min_rate=1.0):
+        """
+        The cycles with an implied rate above min_rate, best rate first.
+        """
+        cycles = [cycle for triangle in self.triangles.values() if triangle
+                  for cycle in triangle.values() if cycle and cycle['rate'] > min_rate]
+        return sorted(cycles, key=lambda cycle: cycle['rate'], reverse=True)
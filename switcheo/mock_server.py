@@ -0,0 +1,443 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    In-process stand-in for the Switcheo REST and socket.io APIs, for offline load testing.
+    The server keeps a synthetic market per trading pair, answers the REST routes used by the clients and streams
+    order book and trade updates with valid digests on the /v2/books, /v2/trades and /v2/orders namespaces. Latency,
+    error rate and message rate are configurable.
+Usage:
+    from switcheo.mock_server import MockSwitcheoServer
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+import socketio
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+from switcheo.stream_memory import CompactBook
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+mock_contracts = {
+    'NEO': {
+        'V1': '0ec5712e0f7c63e4b0fea31029a28cea5e9d551f',
+        'V1_5': 'c41d8b0c30252ce7e8b6d95e9ce13fdd68d2a5a8',
+        'V2': 'a195c1549e7da61b8da315765a790ac7e7633b82',
+        'V3': '58efbb3cca7f436a55b1a05c0f36788d2d9a032e'
+    },
+    'ETH': {
+        'V1': '0x4dcf0244742e72309666db20d367f6dd196e884e'
+    }
+}
+
+mock_tokens = {
+    'NEO': {'hash': 'c56f33fc6ecfcd0c225c4ab356fee59390af8560be0e930faebe74a6daff7c9b', 'decimals': 8},
+    'GAS': {'hash': '602c79718b16e442de58778e148d0b1084e3b2dffd5de6b7b16cee7969282de7', 'decimals': 8},
+    'SWTH': {'hash': 'ab38352559b8b203bde5fddfa0b07d8b2525e132', 'decimals': 8},
+    'ETH': {'hash': '0x0000000000000000000000000000000000000000', 'decimals': 18}
+}
+
+mock_pairs = {
+    'SWTH_NEO': 0.0004,
+    'GAS_NEO': 0.3,
+    'SWTH_GAS': 0.0013,
+    'SWTH_ETH': 0.00002,
+    'NEO_ETH': 0.05
+}
+
+
+def iso8601_now(now=None):
+    now = time.time() if now is None else now
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now)) + '.{:03d}Z'.format(int(now * 1000) % 1000)
+
+
+def format_price(price):
+    return '{:.8f}'.format(price)
+
+
+class MockMarket(object):
+    """
+    Synthetic order books and trades of a set of pairs, with update streams whose digests match the books.
+
+    Book updates change levels close to the top of the book more often than deep levels, as in the live market::
+
+        market = MockMarket(pairs={'SWTH_NEO': 0.0004}, levels=100, seed=1)
+        market.book_snapshot('SWTH_NEO')
+        market.book_update('SWTH_NEO')
+    """
+
+    def __init__(self, pairs=None, levels=50, tick=0.001, trade_limit=20, seed=None):
+        """
+
+        :param pairs: Dictionary of trading pairs and their mid price.
+        :type pairs: dict
+        :param levels: The number of price levels per side of each book.
+        :type levels: int
+        :param tick: The distance between price levels relative to the mid price.
+        :type tick: float
+        :param trade_limit: The limit sent with trade updates, the streamed trade lists hold limit - 1 trades.
+        :type trade_limit: int
+        :param seed: The seed of the random generator.
+        """
+        self.pairs = dict(pairs or mock_pairs)
+        self.tick = tick
+        self.trade_limit = trade_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.books = {}
+        self.trades = {}
+        for pair, mid in self.pairs.items():
+            self.books[pair] = CompactBook(book={
+                'buys': [{'price': format_price(mid * (1 - tick * (level + 1))), 'amount': self.amount()}
+                         for level in range(levels)],
+                'sells': [{'price': format_price(mid * (1 + tick * (level + 1))), 'amount': self.amount()}
+                          for level in range(levels)]
+            })
+            self.trades[pair] = []
+            for trade in range(trade_limit - 1):
+                self.trades[pair].insert(0, self.trade(pair))
+
+    def room(self, pair):
+        return {'pair': pair, 'contractHash': mock_contracts['NEO']['V2']}
+
+    def amount(self):
+        return str(self.random.randint(1, 1000) * 100000000)
+
+    def depth_index(self, levels):
+        """
+        Index of a level counted from the best price, geometrically distributed towards the top of the book.
+        """
+        return min(int(self.random.expovariate(0.2)), levels - 1)
+
+    def trade(self, pair):
+        take_amount = self.random.randint(1, 1000) * 100000000
+        price = self.pairs[pair] * (1 + self.random.uniform(-self.tick, self.tick))
+        return {
+            'id': str(uuid.UUID(int=self.random.getrandbits(128))),
+            'fill_amount': int(take_amount * price),
+            'take_amount': take_amount,
+            'event_time': iso8601_now(),
+            'is_buy': self.random.random() < 0.5
+        }
+
+    def book_snapshot(self, pair):
+        with self.lock:
+            book = self.books[pair].to_dict()
+        return {'room': self.room(pair), 'digest': sha1_hash_digest(stringify_message(book)), 'book': book}
+
+    def book_event(self, pair):
+        book = self.books[pair]
+        side = 'buy' if self.random.random() < 0.5 else 'sell'
+        prices, amounts = (book.buy_prices, book.buy_amounts) if side == 'buy' else \
+            (book.sell_prices, book.sell_amounts)
+        if not prices or self.random.random() < 0.2:
+            offset = self.tick * (self.depth_index(len(prices) or 1) + 0.5)
+            mid = self.pairs[pair]
+            price = format_price(mid * (1 - offset) if side == 'buy' else mid * (1 + offset))
+            delta = int(self.amount())
+        else:
+            index = self.depth_index(len(prices))
+            index = len(prices) - 1 - index if side == 'buy' else index
+            price = prices[index]
+            choice = self.random.random()
+            if choice < 0.4:
+                delta = int(self.amount())
+            elif choice < 0.8 and amounts[index] > 1:
+                delta = -self.random.randint(1, amounts[index] - 1)
+            else:
+                delta = -amounts[index]
+        book.apply(side=side, price=price, delta=str(delta))
+        return {'side': side, 'price': price, 'delta': str(delta)}
+
+    def book_update(self, pair, events=None):
+        """
+        Change one to three levels of the book of the pair.
+
+        :return: The update message of the /v2/books namespace.
+        """
+        with self.lock:
+            update_events = [self.book_event(pair) for event in range(events or self.random.randint(1, 3))]
+            book = self.books[pair].to_dict()
+        return {'room': self.room(pair), 'digest': sha1_hash_digest(stringify_message(book)), 'events': update_events}
+
+    def trades_snapshot(self, pair):
+        with self.lock:
+            trades = list(self.trades[pair])
+        return {'room': self.room(pair), 'digest': sha1_hash_digest(stringify_message(trades)), 'trades': trades}
+
+    def trade_update(self, pair):
+        """
+        Add a trade to the pair.
+
+        :return: The update message of the /v2/trades namespace.
+        """
+        with self.lock:
+            events = [self.trade(pair)]
+            self.trades[pair] = (events + self.trades[pair])[0:self.trade_limit - 1]
+            trades = self.trades[pair]
+            digest = sha1_hash_digest(stringify_message(trades))
+        return {'room': self.room(pair), 'digest': digest, 'events': events, 'limit': self.trade_limit}
+
+    def offer_book(self, pair):
+        with self.lock:
+            book = self.books[pair]
+            bids = [{'price': price, 'quantity': str(amount / 100000000)}
+                    for price, amount in zip(reversed(book.buy_prices), reversed(book.buy_amounts))]
+            asks = [{'price': price, 'quantity': str(amount / 100000000)}
+                    for price, amount in zip(book.sell_prices, book.sell_amounts)]
+        return {'asks': asks, 'bids': bids}
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class MockSwitcheoServer(object):
+    """
+    Serves the Switcheo REST routes and socket.io namespaces of a MockMarket on a local port::
+
+        server = MockSwitcheoServer(latency=0.01, error_rate=0.01, message_rate=20).start()
+        public_client = PublicClient(api_url=server.url)
+        ....
+        server.stop()
+
+    Socket.io clients have to connect with the polling transport.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, market=None, latency=0.0, error_rate=0.0, message_rate=10.0,
+                 seed=None):
+        """
+
+        :param host: The interface to listen on.
+        :type host: str
+        :param port: The port to listen on, a free port by default.
+        :type port: int
+        :param market: The synthetic market served, a MockMarket of the default pairs by default.
+        :type market: MockMarket
+        :param latency: The delay (in seconds) of every REST response, or a (minimum, maximum) tuple.
+        :type latency: float
+        :param error_rate: The fraction of REST requests answered with an HTTP 500 error.
+        :type error_rate: float
+        :param message_rate: The number of updates per second streamed to every joined room.
+        :type message_rate: float
+        :param seed: The seed of the random generator of the latency and errors.
+        """
+        self.market = market or MockMarket(seed=seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.message_rate = message_rate
+        self.random = random.Random(seed)
+        self.requests = {}
+        self.errors = 0
+        self.messages = 0
+        self.joined = {'/v2/books': {}, '/v2/trades': {}}
+        self.lock = threading.Lock()
+        self.orders = {}
+        self.stopped = threading.Event()
+        self.socket_io = socketio.Server(async_mode='threading')
+        for namespace in ['/v2/books', '/v2/trades', '/v2/orders']:
+            self.socket_io.on('join', self._join_handler(namespace), namespace=namespace)
+            self.socket_io.on('leave', self._leave_handler(namespace), namespace=namespace)
+        self.app = socketio.WSGIApp(self.socket_io, self.rest_app)
+        self.server = make_server(host, port, self.app, server_class=ThreadingWSGIServer,
+                                  handler_class=QuietRequestHandler)
+        self.url = 'http://{}:{}'.format(host, self.server.server_port)
+        self.threads = []
+
+    def start(self):
+        for target in [self.server.serve_forever, self.stream]:
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _join_handler(self, namespace):
+        def join(sid, room):
+            room_name = room.get('pair') or room.get('address')
+            self.socket_io.enter_room(sid, room_name, namespace=namespace)
+            if namespace == '/v2/books':
+                snapshot = self.market.book_snapshot(room_name)
+            elif namespace == '/v2/trades':
+                snapshot = self.market.trades_snapshot(room_name)
+            else:
+                snapshot = {'room': room, 'orders': list(self.orders.get(room_name, []))}
+            if namespace in self.joined:
+                with self.lock:
+                    self.joined[namespace].setdefault(room_name, set()).add(sid)
+            self.socket_io.emit('all', snapshot, room=sid, namespace=namespace)
+        return join
+
+    def _leave_handler(self, namespace):
+        def leave(sid, room):
+            room_name = room.get('pair') or room.get('address')
+            self.socket_io.leave_room(sid, room_name, namespace=namespace)
+            if namespace in self.joined:
+                with self.lock:
+                    self.joined[namespace].get(room_name, set()).discard(sid)
+                    if not self.joined[namespace].get(room_name, True):
+                        del self.joined[namespace][room_name]
+        return leave
+
+    def stream(self):
+        """
+        Emit an update to every order book and trade room with clients message_rate times per second.
+        """
+        while not self.stopped.wait(1.0 / self.message_rate):
+            with self.lock:
+                book_pairs = list(self.joined['/v2/books'])
+                trade_pairs = list(self.joined['/v2/trades'])
+            for pair in book_pairs:
+                self.socket_io.emit('updates', self.market.book_update(pair), room=pair, namespace='/v2/books')
+                self.messages += 1
+            for pair in trade_pairs:
+                self.socket_io.emit('updates', self.market.trade_update(pair), room=pair, namespace='/v2/trades')
+                self.messages += 1
+
+    def rest_app(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '/')
+        params = dict((key, values[0]) for key, values in parse_qs(environ.get('QUERY_STRING', '')).items())
+        route = '{} {}'.format(method, path)
+        self.requests[route] = self.requests.get(route, 0) + 1
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(latency[0], latency[1])
+        if latency:
+            time.sleep(latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return self.respond(start_response, '500 Internal Server Error', {
+                'error': 'Mock server error.', 'error_code': 500, 'error_message': 'Injected error.'})
+        try:
+            body = self.route(method, path, params, environ)
+        except (KeyError, ValueError):
+            return self.respond(start_response, '400 Bad Request', {
+                'error': 'Bad request.', 'error_code': 400, 'error_message': 'Unknown pair or parameter.'})
+        if body is None:
+            return self.respond(start_response, '404 Not Found', {
+                'error': 'Not found.', 'error_code': 404, 'error_message': path})
+        return self.respond(start_response, '200 OK', body)
+
+    @staticmethod
+    def respond(start_response, status, body):
+        data = stringify_message(body).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'), ('Content-Length', str(len(data)))])
+        return [data]
+
+    def order(self, params):
+        order_id = str(uuid.UUID(int=self.random.getrandbits(128)))
+        order = {
+            'id': order_id,
+            'blockchain': params.get('blockchain', 'neo'),
+            'contract_hash': params.get('contract_hash', mock_contracts['NEO']['V2']),
+            'address': params.get('address', ''),
+            'side': params.get('side', 'buy'),
+            'pair': params.get('pair', 'SWTH_NEO'),
+            'price': params.get('price', '0'),
+            'quantity': params.get('quantity', '0'),
+            'status': 'pending',
+            'created_at': iso8601_now(),
+            'fills': [],
+            'makes': [{'id': str(uuid.UUID(int=self.random.getrandbits(128))), 'txn': None}]
+        }
+        self.orders.setdefault(order['address'], []).append(order)
+        return order
+
+    def route(self, method, path, params, environ):
+        market = self.market
+        if method == 'GET':
+            if path in ['', '/']:
+                return {'status': 'ok'}
+            if path == '/v2/exchange/timestamp':
+                return {'timestamp': int(time.time() * 1000)}
+            if path == '/v2/exchange/contracts':
+                return mock_contracts
+            if path == '/v2/exchange/latest_contracts':
+                return dict((blockchain, versions[sorted(versions)[-1]])
+                            for blockchain, versions in mock_contracts.items())
+            if path == '/v2/exchange/pairs':
+                return sorted(market.pairs)
+            if path == '/v2/exchange/tokens':
+                return mock_tokens
+            if path == '/v2/exchange/announcement_message':
+                return {'message': '', 'message_type': 'info'}
+            if path in ['/v2/exchange/swap_pairs', '/v2/exchange/atomic_swap_contracts']:
+                return []
+            if path == '/v2/exchange/swap_pricing':
+                return {}
+            if path == '/v2/fees':
+                return [{'maker': {'default': 0}, 'taker': {'default': 0.002}}]
+            if path == '/v2/offers/book':
+                return market.offer_book(params['pair'])
+            if path == '/v2/offers':
+                book = market.offer_book(params['pair'])
+                return [{'id': str(uuid.UUID(int=index)), 'price': level['price'], 'quantity': level['quantity']}
+                        for index, level in enumerate(book['bids'] + book['asks'])]
+            if path in ['/v2/trades', '/v2/trades/recent']:
+                limit = int(params.get('limit', 5000))
+                return list(market.trades_snapshot(params['pair'])['trades'])[0:limit]
+            if path == '/v2/tickers/candlesticks':
+                interval = int(params['interval']) * 60
+                mid = format_price(market.pairs[params['pair']])
+                start_time = int(params['start_time']) - int(params['start_time']) % interval
+                return [{'time': str(candle_time), 'open': mid, 'close': mid, 'high': mid, 'low': mid,
+                         'volume': '0.0', 'quote_volume': '0.0'}
+                        for candle_time in range(start_time, int(params['end_time']), interval)][::-1]
+            if path == '/v2/tickers/last_24_hours':
+                return [{'pair': pair, 'open': format_price(mid), 'close': format_price(mid), 'high': format_price(mid),
+                         'low': format_price(mid), 'volume': '0.0', 'quote_volume': '0.0'}
+                        for pair, mid in sorted(market.pairs.items())]
+            if path == '/v2/tickers/last_price':
+                last_price = {}
+                for pair, mid in market.pairs.items():
+                    base, quote = pair.split('_')
+                    last_price.setdefault(base, {})[quote] = format_price(mid)
+                return last_price
+            if path == '/v2/orders':
+                return list(self.orders.get(params.get('address'), []))
+            if path == '/v2/balances':
+                return {'confirming': {}, 'confirmed': dict((token, '100000000000.0') for token in mock_tokens),
+                        'locked': {}}
+            return None
+        if method == 'POST':
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            body = environ['wsgi.input'].read(length) if length else b''
+            data = {}
+            if body:
+                data = json.loads(body.decode('utf-8'))
+            if path == '/v2/orders':
+                return self.order(data)
+            parts = path.strip('/').split('/')
+            if len(parts) == 4 and parts[3] == 'broadcast' and parts[1] in ['orders', 'deposits', 'withdrawals',
+                                                                            'cancellations']:
+                result = {'id': parts[2], 'status': 'processed', 'created_at': iso8601_now()}
+                if parts[1] == 'orders':
+                    for orders in self.orders.values():
+                        for order in orders:
+                            if order['id'] == parts[2]:
+                                order['status'] = 'processed'
+                                self.socket_io.emit('updates', {'events': [order]}, room=order['address'],
+                                                    namespace='/v2/orders')
+                                return order
+                return result
+            if path in ['/v2/deposits', '/v2/withdrawals', '/v2/cancellations']:
+                return {'id': str(uuid.UUID(int=self.random.getrandbits(128))), 'transaction': None,
+                        'created_at': iso8601_now()}
+            return None
+        return None
@@ -32,7 +32,11 @@ def sign_txn_array(messages, private_key_hex):
 
 
 def encode_message(message):
-    message_hex = binascii.hexlify(stringify_message(message).encode('utf-8')).decode()
+    return encode_stringified_message(stringify_message(message))
+
+
+def encode_stringified_message(message):
+    message_hex = binascii.hexlify(message.encode('utf-8')).decode()
     message_hex_length = num2varint(len(message_hex) // 2)
     return '010001f0' + message_hex_length + message_hex + '0000'
 
@@ -0,0 +1,187 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Top of book and depth cache for the streamed order books.
+    The cache keeps the price levels of each side in a dictionary together with a numerically sorted price list, so
+    the best bid and ask, the spread and the mid price are read in constant time and the cumulative depth to N levels
+    without sorting. It is updated level by level as the order book deltas arrive.
+Usage:
+    from switcheo.order_book import OrderBookCache
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+
+class OrderBookCache(object):
+    """
+    Price levels of one order book, prices are floats and amounts the integer amounts streamed by Switcheo.
+
+    Bids and asks are both kept in ascending price order, the best bid is the last bid and the best ask the first ask::
+
+        cache = OrderBookCache(book=order_books.order_book["SWTH_NEO"]["book"])
+        cache.apply(side="buy", price="0.0004", delta="500")
+        cache.best_bid()    # (0.0004, 1500)
+        cache.spread()
+        cache.depth(side="sell", levels=5)
+    """
+
+    def __init__(self, book=None):
+        """
+
+        :param book: The order book snapshot to load, with buys and sells lists of price and amount.
+        :type book: dict
+        """
+        self.lock = threading.RLock()
+        self.bids = {}
+        self.asks = {}
+        self.bid_prices = []
+        self.ask_prices = []
+        if book is not None:
+            self.load(book)
+
+    def _side(self, side):
+        if side in ("buy", "buys"):
+            return self.bids, self.bid_prices
+        if side in ("sell", "sells"):
+            return self.asks, self.ask_prices
+        raise ValueError("Order book side {} is not buy or sell.".format(side))
+
+    def load(self, book):
+        """
+        Replace every price level with the levels of an order book snapshot.
+
+        :param book: The order book snapshot, with buys and sells lists of price and amount.
+        :type book: dict
+        """
+        bids = dict((float(level["price"]), int(level["amount"])) for level in book["buys"])
+        asks = dict((float(level["price"]), int(level["amount"])) for level in book["sells"])
+        with self.lock:
+            self.bids = bids
+            self.asks = asks
+            self.bid_prices = sorted(bids)
+            self.ask_prices = sorted(asks)
+
+    def apply(self, side, price, delta):
+        """
+        Apply the amount change of one price level, levels reaching zero are removed.
+
+        :param side: The side of the level, buy or sell.
+        :type side: str
+        :param price: The price of the level.
+        :type price: str
+        :param delta: The change of the amount at the level.
+        :type delta: str
+        :return: The amount left at the level.
+        """
+        price = float(price)
+        delta = int(delta)
+        with self.lock:
+            levels, prices = self._side(side)
+            amount = levels.get(price, 0) + delta
+            if amount < 0:
+                raise ValueError("Order book level {} {} went below zero.".format(side, price))
+            if amount == 0:
+                if price in levels:
+                    del levels[price]
+                    del prices[bisect_left(prices, price)]
+            else:
+                if price not in levels:
+                    insort(prices, price)
+                levels[price] = amount
+            return amount
+
+    def apply_events(self, events):
+        """
+        Apply the level changes of one order book update, readers see the book before or after the whole update.
+
+        :param events: The events of the update, with side, price and delta.
+        :type events: list
+        """
+        with self.lock:
+            for event in events:
+                self.apply(side=event["side"], price=event["price"], delta=event["delta"])
+
+    def best_bid(self):
+        """
+        The highest bid.
+
+        :return: Tuple of price and amount, None if there are no bids.
+        """
+        with self.lock:
+            if not self.bid_prices:
+                return None
+            price = self.bid_prices[-1]
+            return price, self.bids[price]
+
+    def best_ask(self):
+        """
+        The lowest ask.
+
+        :return: Tuple of price and amount, None if there are no asks.
+        """
+        with self.lock:
+            if not self.ask_prices:
+                return None
+            price = self.ask_prices[0]
+            return price, self.asks[price]
+
+    def spread(self):
+        with self.lock:
+            if not self.bid_prices or not self.ask_prices:
+                return None
+            return self.ask_prices[0] - self.bid_prices[-1]
+
+    def mid(self):
+        with self.lock:
+            if not self.bid_prices or not self.ask_prices:
+                return None
+            return (self.ask_prices[0] + self.bid_prices[-1]) / 2
+
+    def depth(self, side, levels=10):
+        """
+        The best price levels of one side with the cumulative amount up to each level.
+        Execution of this function is as follows::
+
+            depth(side="buy", levels=2)
+
+        The expected return result for this function is as follows::
+
+            [(0.00041, 2000, 2000), (0.0004, 1000, 3000)]
+
+        :param side: The side of the book, buy or sell.
+        :type side: str
+        :param levels: The number of price levels to return.
+        :type levels: int
+        :return: List of price, amount and cumulative amount tuples, best price first.
+        """
+        depth = []
+        cumulative = 0
+        with self.lock:
+            book_levels, prices = self._side(side)
+            if side in ("buy", "buys"):
+                best_prices = prices[:-levels - 1:-1] if levels > 0 else []
+            else:
+                best_prices = prices[:levels]
+            for price in best_prices:
+                cumulative += book_levels[price]
+                depth.append((price, book_levels[price], cumulative))
+        return depth
+
+    def top_of_book(self):
+        """
+        The best bid and ask with the spread and the mid price.
+
+        :return: Dictionary with bid, bid_amount, ask, ask_amount, spread and mid, None where a side is empty.
+        """
+        with self.lock:
+            best_bid = self.best_bid() or (None, None)
+            best_ask = self.best_ask() or (None, None)
+            return {
+                'bid': best_bid[0],
+                'bid_amount': best_bid[1],
+                'ask': best_ask[0],
+                'ask_amount': best_ask[1],
+                'spread': self.spread(),
+                'mid': self.mid()
+            }
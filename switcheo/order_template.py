@@ -0,0 +1,176 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Order templates for quoting the same pair and side repeatedly, such as when market making.
+    Everything that is fixed for a pair, side, contract and wallet is computed once: the order parameters, the
+    canonical JSON of the message around the price, quantity and timestamp and the wallet address. A quote then only
+    formats the price and quantity, joins the message and signs it with the signing functions of the blockchain, and
+    produces the same signed order as the create_order function of the AuthenticatedClient.
+Usage:
+    from switcheo.order_template import OrderTemplate
+"""
+
+from switcheo.utils import get_epoch_milliseconds, stringify_message
+
+
+class OrderTemplate(object):
+    """
+    Limit orders of one pair and side signed with one wallet::
+
+        template = authenticated_client.order_template(pair='SWTH_NEO', side='buy', private_key=kp)
+        template.order(price=0.0004, quantity=1000)
+        signed_orders = template.presign(quotes=[(0.0004, 1000), (0.00039, 2000)])
+        template.create_signed_order(signed_orders[0])
+    """
+
+    def __init__(self, client, pair, side, private_key, use_native_token=True, order_type='limit'):
+        """
+
+        :param client: The client whose blockchain, contract, request and tracer are used.
+        :type client: AuthenticatedClient
+        :param pair: The trading pair of the orders.
+        :type pair: str
+        :param side: The side of the orders i.e. buy or sell
+        :type side: str
+        :param private_key: The Private Key (ETH) or KeyPair (NEO) for the wallet being used to sign the orders.
+        :type private_key: KeyPair or str
+        :param use_native_token: Flag to indicate whether or not to pay fees with the Switcheo native token.
+        :type use_native_token: bool
+        :param order_type: The type of the orders, templates only support limit orders.
+        :type order_type: str
+        """
+        if side.lower() not in ["buy", "sell"]:
+            raise ValueError("Allowed trade types are buy or sell, you entered {}".format(side.lower()))
+        if order_type.lower() != "limit":
+            raise ValueError("Order templates only support limit orders, you entered {}".format(order_type.lower()))
+        self.client = client
+        self.private_key = private_key
+        self.blockchain = client.blockchain
+        self.amount = client.blockchain_amount[self.blockchain]
+        self.base_params = {
+            "blockchain": self.blockchain,
+            "pair": pair,
+            "side": side,
+            "use_native_tokens": use_native_token,
+            "contract_hash": client.contract_hash,
+            "order_type": order_type
+        }
+        markers = {"price": "\0price", "quantity": "\0quantity", "timestamp": "\0timestamp"}
+        message = stringify_message(dict(self.base_params, **markers))
+        self.message_parts = []
+        for key in sorted(markers):
+            head, message = message.split(stringify_message(markers[key]))
+            self.message_parts.append(head)
+        self.message_parts.append(message)
+        if self.blockchain == 'neo':
+            from switcheo.neo.utils import neo_get_scripthash_from_private_key
+            self.address = neo_get_scripthash_from_private_key(private_key=private_key.PrivateKey).ToString()
+            self.sign_message = self.sign_neo_message
+        else:
+            from switcheo.ethereum.utils import eth_get_address_from_private_key
+            self.address = eth_get_address_from_private_key(private_key=private_key)
+            self.sign_message = self.sign_eth_message
+
+    def sign_neo_message(self, message):
+        from switcheo.neo.utils import encode_stringified_message, private_key_to_hex, sign_message
+        return sign_message(encoded_message=encode_stringified_message(message),
+                            private_key_hex=private_key_to_hex(key_pair=self.private_key))
+
+    def sign_eth_message(self, message):
+        from switcheo.ethereum.utils import sign_stringified_message
+        return sign_stringified_message(message=message, private_key=self.private_key)
+
+    def order_params(self, price, quantity, timestamp=None):
+        """
+        The parameters of a limit order, the same as built by the create_order function.
+
+        :param price: The price target for this trade.
+        :type price: float
+        :param quantity: The amount of the asset being exchanged in the trade.
+        :type quantity: float
+        :param timestamp: The order time in epoch milliseconds, now by default.
+        :type timestamp: int
+        :return: Dictionary of the order parameters to sign.
+        """
+        order_params = self.base_params.copy()
+        order_params["price"] = '{:.8f}'.format(price)
+        order_params["quantity"] = str(self.amount(quantity))
+        order_params["timestamp"] = get_epoch_milliseconds() if timestamp is None else timestamp
+        return order_params
+
+    def message(self, order_params):
+        """
+        The canonical JSON of order parameters built by order_params, equal to stringify_message(order_params).
+        """
+        parts = self.message_parts
+        return ''.join([parts[0], '"', order_params["price"], '"', parts[1], '"', order_params["quantity"], '"',
+                        parts[2], str(order_params["timestamp"]), parts[3]])
+
+    def sign_create_order(self, order_params, private_key=None):
+        """
+        Sign order parameters built by order_params, the same signed parameters as the sign_create_order function of
+        the blockchain of the template. The private_key argument is accepted for use as a sign function of the client,
+        the orders are always signed with the wallet of the template.
+
+        :param order_params: Parameters from the order_params function.
+        :type order_params: dict
+        :return: Dictionary of signed message to send to the Switcheo API.
+        """
+        create_params = order_params.copy()
+        create_params['address'] = self.address
+        create_params['signature'] = self.sign_message(self.message(order_params))
+        return create_params
+
+    def presign(self, quotes, timestamp=None):
+        """
+        Sign several quotes ahead of sending them, all with the same timestamp.
+
+        :param quotes: List of price and quantity pairs.
+        :type quotes: list
+        :param timestamp: The order time in epoch milliseconds, now by default.
+        :type timestamp: int
+        :return: List of signed order parameters for the create_signed_order function.
+        """
+        if timestamp is None:
+            timestamp = get_epoch_milliseconds()
+        return [self.sign_create_order(self.order_params(price=price, quantity=quantity, timestamp=timestamp))
+                for price, quantity in quotes]
+
+    def create_signed_order(self, signed_params):
+        """
+        Send order parameters signed by sign_create_order or presign to the Switcheo API.
+
+        :return: Dictionary of order details to specify which parts of the trade will be filled (taker) or open (maker)
+        """
+        with self.client.tracer.span('create_order.post', tags={'path': '/orders'}):
+            return self.client.request.post(path='/orders', json_data=signed_params)
+
+    def create_order(self, price, quantity):
+        """
+        Sign and send a limit order, the same request as the create_order function of the AuthenticatedClient.
+
+        :param price: The price target for this trade.
+        :type price: float
+        :param quantity: The amount of the asset being exchanged in the trade.
+        :type quantity: float
+        :return: Dictionary of order details to specify which parts of the trade will be filled (taker) or open (maker)
+        """
+        return self.client.signed_post(span_name='create_order', sign_function=self.sign_create_order,
+                                       params=self.order_params(price=price, quantity=quantity),
+                                       private_key=self.private_key, path='/orders')
+
+    def order(self, price, quantity):
+        """
+        Create and execute a limit order, the same requests as the order function of the AuthenticatedClient.
+
+        :param price: The price target for this trade.
+        :type price: float
+        :param quantity: The amount of the asset being exchanged in the trade.
+        :type quantity: float
+        :return: Dictionary of the transaction on the order book.
+        """
+        with self.client.tracer.span('order', tags={'blockchain': self.blockchain, 'pair': self.base_params['pair'],
+                                                    'side': self.base_params['side']}):
+            create_order = self.create_order(price=price, quantity=quantity)
+            self.client.tracer.tag_trace('order_id', create_order['id'])
+            return self.client.execute_order(order_params=create_order, private_key=self.private_key)
@@ -8,6 +8,11 @@ Usage:
     from switcheo.public_client import PublicClient
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from switcheo.columnar import candlesticks_to_columns, last_24_hours_to_columns, offer_book_to_columns,\
+    trades_to_columns
+from switcheo.history import TradeHistory, get_candlestick_history
 from switcheo.utils import Request
 
 
@@ -34,6 +39,7 @@ class PublicClient(object):
         self.request = Request(api_url=api_url, api_version=api_version, timeout=30)
         self.blockchain = blockchain
         self.blockchain_key = blockchain.upper()
+        self.token_details = None
         self.contracts = self.get_contracts()
         self.contract_version = contract_version.upper()
         self.contract_hash = self.contracts[self.blockchain_key][self.contract_version]
@@ -117,6 +123,33 @@ class PublicClient(object):
         """
         return self.request.get(path='/exchange/latest_contracts')
     
+    def pair_decimals(self, pair):
+        """
+        Function to look up the token decimals of the amounts of the trades of a pair, the fill_amount is in the quote
+        token and the take_amount in the base token. The token details are requested once and kept by the client.
+        Execution of this function is as follows::
+
+            pair_decimals(pair="SWTH_NEO")
+
+        The expected return result for this function is as follows::
+
+            {
+                'fill_amount': 8,
+                'take_amount': 8
+            }
+
+        :param pair: The trading pair of the trades.
+        :type pair: str
+        :return: Dictionary of the decimals of the fill_amount and take_amount.
+        """
+        if self.token_details is None:
+            self.token_details = self.get_token_details(show_inactive=True)
+        base, quote = pair.split('_')[0:2]
+        return {
+            'fill_amount': self.token_details[quote]['decimals'],
+            'take_amount': self.token_details[base]['decimals']
+        }
+
     def get_pairs(self, base=None, show_details=False, show_inactive=False):
         """
         Function to fetch a list of trading pairs offered on the Switcheo decentralized exchange.
@@ -354,7 +387,7 @@ class PublicClient(object):
         """
         return self.request.get(path='/exchange/atomic_swap_contracts')
 
-    def get_candlesticks(self, pair, start_time, end_time, interval):
+    def get_candlesticks(self, pair, start_time, end_time, interval, columnar=False):
         """
         Function to fetch trading metrics from the past 24 hours for all trading pairs offered on the exchange.
         Execution of this function is as follows::
@@ -394,6 +427,8 @@ class PublicClient(object):
         :type end_time: int
         :param interval: The time interval (in minutes) for candle statistics.  Allowed values: 1, 5, 30, 60, 360, 1440
         :type interval: int
+        :param columnar: Flag to return a ColumnarTable of typed arrays instead of a list of dictionaries.
+        :type columnar: bool
         :return: List of dictionaries containing the candles statistics based on the parameter filters.
         """
         api_params = {
@@ -403,9 +438,44 @@ class PublicClient(object):
             "end_time": end_time,
             "contract_hash": self.contract_hash
         }
+        if columnar:
+            return candlesticks_to_columns(self.request.stream(path='/tickers/candlesticks', params=api_params))
         return self.request.get(path='/tickers/candlesticks', params=api_params)
 
-    def get_last_24_hours(self):
+    def get_candlestick_history(self, pairs, start_time, end_time, interval, max_workers=4, fill_gaps=False):
+        """
+        Function to fetch candlesticks for one or more trading pairs over a time range of any length.
+        The range is split into windows the API accepts and fetched concurrently with the get_candlesticks
+        function, see switcheo.history.get_candlestick_history for the details.
+        Execution of this function is as follows::
+
+            get_candlestick_history(pairs=["SWTH_NEO", "GAS_NEO"],
+                                    start_time=round(time.time()) - 2419200,
+                                    end_time=round(time.time()),
+                                    interval=1,
+                                    fill_gaps=True)
+
+        The expected return result for this function is a dictionary of trading pairs, each with a list of candles
+        in the same form as the get_candlesticks function, oldest first.
+
+        :param pairs: The trading pair or list of trading pairs to request candle statistics for.
+        :type pairs: str or list
+        :param start_time: The start time (in epoch seconds) range for collecting candle statistics.
+        :type start_time: int
+        :param end_time: The end time (in epoch seconds) range for collecting candle statistics.
+        :type end_time: int
+        :param interval: The time interval (in minutes) for candle statistics.  Allowed values: 1, 5, 30, 60, 360, 1440
+        :type interval: int
+        :param max_workers: The number of windows requested concurrently.
+        :type max_workers: int
+        :param fill_gaps: Flag to insert flat, zero volume candles for intervals without trades.
+        :type fill_gaps: bool
+        :return: Dictionary of trading pairs with the list of candles for each pair, oldest first.
+        """
+        return get_candlestick_history(client=self, pairs=pairs, start_time=start_time, end_time=end_time,
+                                       interval=interval, max_workers=max_workers, fill_gaps=fill_gaps)
+
+    def get_last_24_hours(self, columnar=False):
         """
         Function to fetch trading metrics from the past 24 hours for all trading pairs offered on the exchange.
         Execution of this function is as follows::
@@ -434,8 +504,12 @@ class PublicClient(object):
             ....
             }]
 
+        :param columnar: Flag to return a ColumnarTable of typed arrays instead of a list of dictionaries.
+        :type columnar: bool
         :return: List of dictionaries containing the statistics of each trading pair over the last 24 hours.
         """
+        if columnar:
+            return last_24_hours_to_columns(self.request.stream(path='/tickers/last_24_hours'))
         return self.request.get(path='/tickers/last_24_hours')
 
     def get_last_price(self, symbols=None, bases=None):
@@ -474,7 +548,7 @@ class PublicClient(object):
             api_params['bases'] = bases
         return self.request.get(path='/tickers/last_price', params=api_params)
 
-    def get_offers(self, pair="SWTH_NEO"):
+    def get_offers(self, pair="SWTH_NEO", stream=False):
         """
         Function to fetch the open orders on the order book for the trade pair requested.
         Execution of this function is as follows::
@@ -497,15 +571,19 @@ class PublicClient(object):
 
         :param pair: The trading pair that will be used to request open offers on the order book.
         :type pair: str
+        :param stream: Flag to return a generator yielding the offers as the response arrives instead of a list.
+        :type stream: bool
         :return: List of dictionaries consisting of the open offers for the requested trading pair.
         """
         api_params = {
             "pair": pair,
             "contract_hash": self.contract_hash
         }
+        if stream:
+            return self.request.stream(path='/offers', params=api_params)
         return self.request.get(path='/offers', params=api_params)
 
-    def get_offer_book(self, pair="SWTH_NEO"):
+    def get_offer_book(self, pair="SWTH_NEO", columnar=False):
         """
         Function to fetch the open orders formatted on the order book for the trade pair requested.
         Execution of this function is as follows::
@@ -537,15 +615,20 @@ class PublicClient(object):
 
         :param pair: The trading pair that will be used to request open offers on the order book.
         :type pair: str
+        :param columnar: Flag to return a ColumnarTable of typed arrays per side instead of lists of dictionaries.
+        :type columnar: bool
         :return: List of dictionaries consisting of the open offers for the requested trading pair.
         """
         api_params = {
             "pair": pair,
             "contract_hash": self.contract_hash
         }
-        return self.request.get(path='/offers/book', params=api_params)
+        offer_book = self.request.get(path='/offers/book', params=api_params)
+        if columnar:
+            return offer_book_to_columns(offer_book)
+        return offer_book
 
-    def get_trades(self, pair="SWTH_NEO", start_time=None, end_time=None, limit=5000):
+    def get_trades(self, pair="SWTH_NEO", start_time=None, end_time=None, limit=5000, columnar=False, stream=False):
         """
         Function to fetch a list of filled trades for the parameters requested.
         Execution of this function is as follows::
@@ -582,10 +665,17 @@ class PublicClient(object):
         :type end_time: int
         :param limit: The number of filled trades to return. Min: 1, Max: 10000, Default: 5000
         :type limit: int
+        :param columnar: Flag to return a ColumnarTable of typed arrays instead of a list of dictionaries, with the
+                         amounts scaled by the token decimals of the pair.
+        :type columnar: bool
+        :param stream: Flag to return a generator yielding the trades as the response arrives instead of a list.
+        :type stream: bool
         :return: List of dictionaries consisting of filled orders that meet requirements of the parameters passed to it.
         """
         if limit > 10000 or limit < 1:
             raise ValueError("Attempting to request more trades than allowed by the API.")
+        if columnar and stream:
+            raise ValueError("Trades can be returned as a ColumnarTable or streamed, not both.")
         api_params = {
             "blockchain": self.blockchain,
             "pair": pair,
@@ -597,8 +687,45 @@ class PublicClient(object):
             api_params['to'] = end_time
         if limit != 5000:
             api_params['limit'] = limit
+        if stream:
+            return self.request.stream(path='/trades', params=api_params)
+        if columnar:
+            return trades_to_columns(self.request.stream(path='/trades', params=api_params),
+                                     decimals=self.pair_decimals(pair))
         return self.request.get(path='/trades', params=api_params)
 
+    def get_trade_history(self, pair, start_time, end_time, window=86400, max_workers=4, checkpoint=None):
+        """
+        Function to download every filled trade for the trade pair between two times, oldest first.
+        The time range is split into windows that are fetched concurrently with the get_trades function, see
+        switcheo.history.TradeHistory for the details.
+        Execution of this function is as follows::
+
+            history = get_trade_history(pair="SWTH_NEO",
+                                        start_time=round(time.time()) - 2419200,
+                                        end_time=round(time.time()))
+            for trade in history:
+                print(trade['id'], trade['event_time'])
+
+        The trades yielded have the same form as the trades returned by the get_trades function.
+
+        :param pair: The trading pair that will be used to request filled trades.
+        :type pair: str
+        :param start_time: Only return trades after this time (in epoch seconds).
+        :type start_time: int
+        :param end_time: Only return trades before this time (in epoch seconds).
+        :type end_time: int
+        :param window: The initial window size (in seconds) of each request.
+        :type window: int
+        :param max_workers: The number of windows requested concurrently.
+        :type max_workers: int
+        :param checkpoint: The checkpoint of a previous download to resume from.
+        :type checkpoint: dict
+        :return: Iterable of dictionaries consisting of filled trades, with a resumable checkpoint attribute.
+        """
+        return TradeHistory(client=self, pair=pair, start_time=start_time, end_time=end_time, window=window,
+                            max_workers=max_workers, checkpoint=checkpoint)
+
     def get_recent_trades(self, pair="SWTH_NEO"):
         """
         Function to fetch a list of the 20 most recently filled trades for the parameters requested.
@@ -638,7 +765,7 @@ class PublicClient(object):
         return self.request.get(path='/trades/recent', params=api_params)
 
     def get_orders(self, address, chain_name='NEO', contract_version='V3', pair=None, from_epoch_time=None,
-                   order_status=None, before_id=None, limit=50):
+                   order_status=None, before_id=None, limit=50, stream=False):
         """
         Function to fetch the order history of the given address.
         Execution of this function is as follows::
@@ -717,11 +844,15 @@ class PublicClient(object):
         :type before_id: str
         :param limit: Only return up to this number of orders (min: 1, max: 200, default: 50).
         :type limit: int
+        :param stream: Flag to return a generator yielding the orders as the response arrives instead of a list.
+        :type stream: bool
         :return: List of dictionaries containing the orders for the given NEO address and (optional) trading pair.
         """
+        if limit > 200 or limit < 1:
+            raise ValueError("Attempting to request more orders than allowed by the API.")
         api_params = {
             "address": address,
-            "contract_hash": self.get_contracts()[chain_name.upper()][contract_version.upper()],
+            "contract_hash": self.contracts[chain_name.upper()][contract_version.upper()],
             "limit": limit
         }
         if pair is not None:
@@ -732,8 +863,58 @@ class PublicClient(object):
             api_params['order_status'] = order_status
         if before_id is not None:
             api_params['before_id'] = before_id
+        if stream:
+            return self.request.stream(path='/orders', params=api_params)
         return self.request.get(path='/orders', params=api_params)
 
+    def iter_orders(self, address, chain_name='NEO', contract_version='V3', pair=None, from_epoch_time=None,
+                    order_status=None, before_id=None, limit=200):
+        """
+        Generator to walk the full order history of the given address, one order at a time.
+        Pages are requested with the get_orders function and followed with the before_id cursor of the last order
+        on each page. The next page is fetched in the background while the current page is being consumed, so only
+        two pages are ever held in memory.
+        Execution of this function is as follows::
+
+            for order in iter_orders(address=neo_get_scripthash_from_address(address=address)):
+                print(order['id'], order['status'])
+
+        The orders yielded are the same dictionaries returned by the get_orders function, newest first.
+
+        :param address: The ScriptHash of the address to filter orders for.
+        :type address: str
+        :param chain_name: The name of the chain to find orders against.
+        :type chain_name: str
+        :param contract_version: The version of the contract to find orders against.
+        :type contract_version: str
+        :param pair: The trading pair to filter order requests on.
+        :type pair: str
+        :param from_epoch_time: Only return orders that are last updated at or after this time.
+        :type from_epoch_time: int
+        :param order_status: Only return orders have this status. Possible values are open, cancelled, completed.
+        :type order_status: str
+        :param before_id: Only return orders that are created before the order with this id.
+        :type before_id: str
+        :param limit: The page size used for each request (min: 1, max: 200, default: 200).
+        :type limit: int
+        :return: Generator of dictionaries containing the orders for the given address.
+        """
+        if limit > 200 or limit < 1:
+            raise ValueError("Attempting to request more orders than allowed by the API.")
+        get_page = partial(self.get_orders, address=address, chain_name=chain_name,
+                           contract_version=contract_version, pair=pair, from_epoch_time=from_epoch_time,
+                           order_status=order_status, limit=limit)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(get_page, before_id=before_id)
+            while next_page is not None:
+                orders = next_page.result()
+                if len(orders) < limit:
+                    next_page = None
+                else:
+                    next_page = executor.submit(get_page, before_id=orders[-1]['id'])
+                for order in orders:
+                    yield order
+
     def get_balance(self, addresses, contracts):
         """
         Function to fetch the current account balance for the given address in the Switcheo smart contract.
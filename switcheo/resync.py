@@ -0,0 +1,212 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    State tracking and resynchronisation of streamed rooms.
+    Every room is either awaiting its first snapshot, live, or resyncing after a digest mismatch or an update that
+    does not fit the local state. Updates received while a room is not live are buffered until the snapshot arrives.
+    Instead of leaving and joining a room every time a digest fails, the namespaces hand the room to a ResyncManager
+    that drops duplicate requests while a resync is in flight and backs off when a room keeps failing.
+Usage:
+    from switcheo.resync import ResyncManager
+"""
+
+import threading
+from collections import deque
+from functools import partial
+
+
+room_awaiting_snapshot = 'awaiting_snapshot'
+room_live = 'live'
+room_resyncing = 'resyncing'
+
+
+class ResyncManager(object):
+    """
+    Throttled, deduplicated resync of the rooms of a streaming namespace, keyed by trading pair.
+
+    A pair is awaiting_snapshot until its first snapshot arrives, live afterwards and resyncing from a resync
+    request until the next snapshot. The first resync of a pair is sent straight away, every further resync before
+    the pair verifies a digest again waits twice as long as the one before, up to backoff_max seconds::
+
+        resync = ResyncManager(namespace=order_books)
+        resync.buffer(pair, data)   # True unless the pair is live, the update is kept for later
+        resync.complete(pair)       # snapshot received, the pair is live, returns the buffered updates
+        resync.request(room)        # leave and join the room, the pair is resyncing
+        resync.confirm(pair)        # digest verified, resets the backoff
+    """
+
+    def __init__(self, namespace, backoff=0.5, backoff_max=30.0, max_buffered=1000, schedule=None):
+        """
+
+        :param namespace: The streaming namespace used to leave and join rooms.
+        :type namespace: ClientNamespace
+        :param backoff: The delay (in seconds) of the second consecutive resync of a pair.
+        :type backoff: float
+        :param backoff_max: The maximum delay (in seconds) between resyncs of a pair.
+        :type backoff_max: float
+        :param max_buffered: The maximum number of updates buffered per pair, the oldest updates are dropped first.
+        :type max_buffered: int
+        :param schedule: Function called with a delay (in seconds) and a callback, a threading.Timer by default. A
+                         returned object with a cancel method is cancelled when the pair is forgotten.
+        :type schedule: function
+        """
+        self.namespace = namespace
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_buffered = max_buffered
+        self.schedule = schedule or self._schedule_timer
+        self.lock = threading.Lock()
+        self.states = {}
+        self.pending = {}
+        self.timers = {}
+        self.buffers = {}
+        self.attempts = {}
+        self.resyncs = {}
+        self.dropped = {}
+
+    @staticmethod
+    def _schedule_timer(delay, callback):
+        if delay <= 0:
+            callback()
+            return None
+        timer = threading.Timer(delay, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _rejoin(self, room):
+        with self.lock:
+            if self.pending.get(room["pair"]) is not room:
+                return
+            self.timers.pop(room["pair"], None)
+            # updates buffered during the backoff come from the old subscription and are older than the snapshot
+            self.buffers[room["pair"]] = deque(maxlen=self.max_buffered)
+        self.namespace.emit(event="leave", data=room)
+        self.namespace.emit(event="join", data=room)
+
+    def delay(self, pair):
+        """
+        The delay (in seconds) the next resync of the pair would wait before leaving and joining the room.
+        """
+        attempts = self.attempts.get(pair, 0)
+        if attempts == 0:
+            return 0
+        return min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+
+    def request(self, room):
+        """
+        Request a fresh snapshot of the room, ignored if a resync of the pair is already in flight.
+
+        :param room: The room to leave and join again.
+        :type room: dict
+        :return: True if a resync was scheduled, False if the request was a duplicate.
+        """
+        pair = room["pair"]
+        with self.lock:
+            if pair in self.pending:
+                self.dropped[pair] = self.dropped.get(pair, 0) + 1
+                return False
+            delay = self.delay(pair)
+            self.states[pair] = room_resyncing
+            self.pending[pair] = room
+            self.buffers[pair] = deque(maxlen=self.max_buffered)
+            self.attempts[pair] = self.attempts.get(pair, 0) + 1
+            self.resyncs[pair] = self.resyncs.get(pair, 0) + 1
+        timer = self.schedule(delay, partial(self._rejoin, room))
+        if hasattr(timer, 'cancel'):
+            with self.lock:
+                if self.pending.get(pair) is room:
+                    self.timers[pair] = timer
+        return True
+
+    def state(self, pair):
+        """
+        The state of the room of the pair: awaiting_snapshot, live or resyncing.
+        """
+        return self.states.get(pair, room_awaiting_snapshot)
+
+    def is_resyncing(self, pair):
+        return pair in self.pending
+
+    def buffer(self, pair, data):
+        """
+        Keep an update received while the pair is awaiting its snapshot or resyncing.
+
+        :return: True if the update was buffered, False if the pair is live and the update should be applied.
+        """
+        with self.lock:
+            if self.states.get(pair) == room_live:
+                return False
+            if pair not in self.buffers:
+                self.buffers[pair] = deque(maxlen=self.max_buffered)
+            self.buffers[pair].append(data)
+            return True
+
+    def complete(self, pair):
+        """
+        Mark the snapshot of the pair as received, the pair is live again and a resync still waiting on its backoff
+        is cancelled.
+
+        :return: List of the updates buffered before the snapshot arrived, oldest first.
+        """
+        with self.lock:
+            self.states[pair] = room_live
+            self.pending.pop(pair, None)
+            timer = self.timers.pop(pair, None)
+            buffered_updates = list(self.buffers.pop(pair, []))
+        if timer is not None:
+            timer.cancel()
+        return buffered_updates
+
+    def confirm(self, pair):
+        """
+        Reset the backoff of the pair after a digest has been verified.
+        """
+        if self.attempts.get(pair):
+            with self.lock:
+                self.attempts[pair] = 0
+
+    def forget(self, pair):
+        """
+        Drop every piece of state kept for the pair and cancel its scheduled resync, the room is not joined again.
+        """
+        with self.lock:
+            timer = self.timers.pop(pair, None)
+            for state in [self.states, self.pending, self.buffers, self.attempts, self.resyncs, self.dropped]:
+                state.pop(pair, None)
+        if timer is not None:
+            timer.cancel()
+
+    def stats(self):
+        """
+        Resync statistics per pair, for alerting on rooms that keep failing.
+
+        :return: Dictionary of pairs with the room state, total resyncs, duplicate requests dropped, current backoff
+                 attempts and whether a resync is in flight.
+        """
+        with self.lock:
+            return dict((pair, {
+                'state': self.states.get(pair, room_awaiting_snapshot),
+                'resyncs': self.resyncs.get(pair, 0),
+                'dropped': self.dropped.get(pair, 0),
+                'attempts': self.attempts.get(pair, 0),
+                'pending': pair in self.pending
+            }) for pair in set(self.resyncs) | set(self.dropped))
+
+
+def updates_after_snapshot(updates, snapshot_digest):
+    """
+    The buffered updates that are newer than a snapshot.
+    When the digest of a buffered update matches the snapshot, the snapshot already contains that update and all
+    updates before it. Without a match every buffered update was received before the snapshot and is contained in it.
+
+    :param updates: The updates buffered while the snapshot was outstanding, oldest first.
+    :type updates: list
+    :param snapshot_digest: The digest of the snapshot.
+    :type snapshot_digest: str
+    :return: List of the updates to apply on top of the snapshot.
+    """
+    for index, update in enumerate(updates):
+        if update["digest"] == snapshot_digest:
+            return updates[index + 1:]
+    return []
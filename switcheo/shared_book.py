@@ -0,0 +1,351 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Fan-out of the streamed order books to other processes through a shared memory mapped file.
+    One process keeps the socket.io connection and publishes the best price levels of every book into a fixed layout
+    file (for example under /dev/shm), reader processes map the same file and read consistent snapshots without a
+    connection of their own. Every book slot is guarded by a sequence lock: the publisher makes the sequence number
+    odd while it writes and even again when the slot is complete, readers retry when the number was odd or changed
+    while they read. The slot of a pair evicted from the namespace is released and reused for the next pair.
+Usage:
+    from switcheo.shared_book import SharedBookPublisher, SharedBookReader
+"""
+
+import logging
+import mmap
+import os
+import struct
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+shared_book_magic = b'SWBK'
+shared_book_version = 1
+header_format = '<4sIIII'
+header_size = 32
+pair_name_size = 32
+slot_header_format = '<QdII'
+slot_header_size = struct.calcsize(slot_header_format)
+
+
+def slot_size(levels):
+    return slot_header_size + 32 * levels
+
+
+class SharedBookLayout(object):
+    """
+    Offsets of the header, the pair directory and the book slots of a shared book file.
+
+    The file starts with the header (magic, version, max_pairs, levels, slot size) followed by one 32 byte pair name
+    per slot and the slots. A slot holds the sequence number, publish time, bid and ask counts and the bid prices,
+    bid amounts, ask prices and ask amounts, levels values each, as float64 prices and int64 amounts.
+    """
+
+    def __init__(self, max_pairs, levels):
+        self.max_pairs = max_pairs
+        self.levels = levels
+        self.slot_size = slot_size(levels)
+        self.directory_offset = header_size
+        self.slots_offset = header_size + pair_name_size * max_pairs
+        self.size = self.slots_offset + self.slot_size * max_pairs
+
+    def name_offset(self, slot):
+        return self.directory_offset + pair_name_size * slot
+
+    def slot_offset(self, slot):
+        return self.slots_offset + self.slot_size * slot
+
+    def column_offsets(self, slot):
+        """
+        :return: Offsets of the bid prices, bid amounts, ask prices and ask amounts of the slot.
+        """
+        offset = self.slot_offset(slot) + slot_header_size
+        column_size = 8 * self.levels
+        return [offset + column_size * column for column in range(4)]
+
+
+class SharedBookPublisher(object):
+    """
+    Publishes the best price levels of the order books kept by an OrderBooksNamespace into a shared file::
+
+        publisher = SharedBookPublisher(path="/dev/shm/switcheo_books", max_pairs=64, levels=20)
+        publisher.attach(order_books)
+    """
+
+    def __init__(self, path, max_pairs=64, levels=20):
+        """
+
+        :param path: The path of the shared file, a tmpfs path such as /dev/shm keeps it in memory.
+        :type path: str
+        :param max_pairs: The number of order books the file can hold.
+        :type max_pairs: int
+        :param levels: The number of price levels published per side.
+        :type levels: int
+        """
+        self.path = path
+        self.layout = SharedBookLayout(max_pairs=max_pairs, levels=levels)
+        self.slots = {}
+        self.published = 0
+        header = (shared_book_magic, shared_book_version, max_pairs, levels, self.layout.slot_size)
+        if not self.open_existing(header):
+            temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+            with open(temporary_path, 'wb') as shared_file:
+                shared_file.write(struct.pack(header_format, *header))
+                shared_file.truncate(self.layout.size)
+            os.replace(temporary_path, path)
+            self.file = open(path, 'r+b')
+            self.mm = mmap.mmap(self.file.fileno(), self.layout.size)
+
+    def open_existing(self, header):
+        """
+        Take over a file of the same layout left by an earlier publisher, readers may still have it mapped. Its pairs
+        keep their slots and its sequence numbers continue, so readers never see a sequence number go back. A file of
+        another layout is replaced by a new file instead of being resized under the readers.
+
+        :return: True if the existing file is used.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != self.layout.size:
+            return False
+        self.file = open(self.path, 'r+b')
+        self.mm = mmap.mmap(self.file.fileno(), self.layout.size)
+        if struct.unpack_from(header_format, self.mm, 0) != header:
+            self.mm.close()
+            self.file.close()
+            return False
+        for slot in range(self.layout.max_pairs):
+            offset = self.layout.name_offset(slot)
+            name = bytes(self.mm[offset:offset + pair_name_size]).rstrip(b'\0')
+            if name:
+                self.slots[name.decode('utf-8')] = slot
+        return True
+
+    def attach(self, order_books):
+        """
+        Publish every order book of an OrderBooksNamespace when it is verified against its digest, and release the
+        slot of every pair the namespace evicts.
+        """
+        order_books.add_listener(self.on_book)
+        order_books.add_eviction_listener(self.on_eviction)
+        for pair, top_of_book in list(order_books.top_of_book.items()):
+            self.on_book(pair, top_of_book)
+        return order_books
+
+    def on_book(self, pair, top_of_book):
+        try:
+            self.publish(pair, top_of_book)
+        except ValueError:
+            logger.exception("Order book %s was not published.", pair)
+
+    def on_eviction(self, room):
+        self.release(room["pair"])
+
+    def slot(self, pair):
+        if pair not in self.slots:
+            if len(self.slots) >= self.layout.max_pairs:
+                raise ValueError("Shared book file {} is full, it holds {} pairs.".format(
+                    self.path, self.layout.max_pairs))
+            name = pair.encode('utf-8')
+            if len(name) >= pair_name_size:
+                raise ValueError("Pair name {} is longer than {} bytes.".format(pair, pair_name_size - 1))
+            used_slots = set(self.slots.values())
+            slot = next(slot for slot in range(self.layout.max_pairs) if slot not in used_slots)
+            self.mm[self.layout.name_offset(slot):self.layout.name_offset(slot) + pair_name_size] = \
+                name.ljust(pair_name_size, b'\0')
+            self.slots[pair] = slot
+        return self.slots[pair]
+
+    def publish(self, pair, top_of_book):
+        """
+        Write the best levels of an order book into the slot of the pair.
+
+        :param pair: The trading pair of the order book.
+        :type pair: str
+        :param top_of_book: The order book cache of the pair.
+        :type top_of_book: OrderBookCache
+        """
+        slot = self.slot(pair)
+        levels = self.layout.levels
+        offset = self.layout.slot_offset(slot)
+        bids = top_of_book.depth(side='buy', levels=levels)
+        asks = top_of_book.depth(side='sell', levels=levels)
+        sequence = struct.unpack_from('<Q', self.mm, offset)[0]
+        # an odd sequence number is left by a publisher that stopped while writing the slot
+        sequence += sequence % 2
+        struct.pack_into(slot_header_format, self.mm, offset, sequence + 1, time.time(), len(bids), len(asks))
+        bid_prices, bid_amounts, ask_prices, ask_amounts = self.layout.column_offsets(slot)
+        struct.pack_into('<{}d'.format(len(bids)), self.mm, bid_prices, *[level[0] for level in bids])
+        struct.pack_into('<{}q'.format(len(bids)), self.mm, bid_amounts, *[level[1] for level in bids])
+        struct.pack_into('<{}d'.format(len(asks)), self.mm, ask_prices, *[level[0] for level in asks])
+        struct.pack_into('<{}q'.format(len(asks)), self.mm, ask_amounts, *[level[1] for level in asks])
+        struct.pack_into('<Q', self.mm, offset, sequence + 2)
+        self.published += 1
+
+    def release(self, pair):
+        """
+        Free the slot of a pair for other pairs, readers of the pair see it as not published.
+
+        :param pair: The trading pair of the order book.
+        :type pair: str
+        """
+        slot = self.slots.pop(pair, None)
+        if slot is None:
+            return
+        offset = self.layout.slot_offset(slot)
+        sequence = struct.unpack_from('<Q', self.mm, offset)[0]
+        sequence += sequence % 2
+        struct.pack_into(slot_header_format, self.mm, offset, sequence + 1, time.time(), 0, 0)
+        self.mm[self.layout.name_offset(slot):self.layout.name_offset(slot) + pair_name_size] = b'\0' * pair_name_size
+        struct.pack_into('<Q', self.mm, offset, sequence + 2)
+
+    def close(self, remove=False):
+        self.mm.close()
+        self.file.close()
+        if remove:
+            os.remove(self.path)
+
+
+class SharedBookReader(object):
+    """
+    Reads the order books published by a SharedBookPublisher, in any process::
+
+        reader = SharedBookReader(path="/dev/shm/switcheo_books")
+        reader.read("SWTH_NEO")
+
+    Readers that want to avoid the copy of read can use the memory views of a slot between begin and validate::
+
+        sequence = reader.begin("SWTH_NEO")
+        views = reader.views("SWTH_NEO")
+        best_bid = views['bid_prices'][0]
+        if not reader.validate("SWTH_NEO", sequence):
+            # the publisher wrote the slot meanwhile, read again
+    """
+
+    def __init__(self, path, retries=1000):
+        """
+
+        :param path: The path of the shared file written by the publisher.
+        :type path: str
+        :param retries: The number of attempts of read before giving up on a slot the publisher keeps writing.
+        :type retries: int
+        """
+        self.path = path
+        self.retries = retries
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_pairs, levels, size = struct.unpack_from(header_format, self.mm, 0)
+        if magic != shared_book_magic or version != shared_book_version:
+            raise ValueError("{} is not a shared book file of version {}.".format(path, shared_book_version))
+        self.layout = SharedBookLayout(max_pairs=max_pairs, levels=levels)
+        self.slots = {}
+        self.memory = memoryview(self.mm)
+
+    def pairs(self):
+        """
+        The pairs published so far.
+        """
+        self.slots = {}
+        for slot in range(self.layout.max_pairs):
+            offset = self.layout.name_offset(slot)
+            name = bytes(self.mm[offset:offset + pair_name_size]).rstrip(b'\0')
+            if name:
+                self.slots[name.decode('utf-8')] = slot
+        return list(self.slots)
+
+    def slot_pair(self, slot):
+        offset = self.layout.name_offset(slot)
+        return bytes(self.mm[offset:offset + pair_name_size]).rstrip(b'\0').decode('utf-8')
+
+    def slot(self, pair):
+        if pair not in self.slots or self.slot_pair(self.slots[pair]) != pair:
+            self.pairs()
+            if pair not in self.slots:
+                raise ValueError("Pair {} has not been published.".format(pair))
+        return self.slots[pair]
+
+    def sequence(self, pair):
+        return struct.unpack_from('<Q', self.mm, self.layout.slot_offset(self.slot(pair)))[0]
+
+    def begin(self, pair):
+        """
+        Wait until the publisher is not writing the slot of the pair.
+
+        :return: The sequence number to pass to validate.
+        """
+        for attempt in range(self.retries):
+            sequence = self.sequence(pair)
+            if sequence % 2 == 0:
+                return sequence
+        raise ValueError("Order book {} is being written, gave up after {} attempts.".format(pair, self.retries))
+
+    def validate(self, pair, sequence):
+        """
+        :return: True if the slot of the pair has not been written since begin returned the sequence number.
+        """
+        return self.sequence(pair) == sequence
+
+    def views(self, pair):
+        """
+        Memory views of the slot of the pair, only valid between begin and a successful validate.
+
+        :return: Dictionary with the bid_count, ask_count and the bid_prices, bid_amounts, ask_prices and ask_amounts
+                 views, best level first.
+        """
+        slot = self.slot(pair)
+        offset = self.layout.slot_offset(slot)
+        sequence, publish_time, bid_count, ask_count = struct.unpack_from(slot_header_format, self.mm, offset)
+        column_size = 8 * self.layout.levels
+        views = {'time': publish_time, 'bid_count': bid_count, 'ask_count': ask_count}
+        names = [('bid_prices', 'd', bid_count), ('bid_amounts', 'q', bid_count),
+                 ('ask_prices', 'd', ask_count), ('ask_amounts', 'q', ask_count)]
+        for (name, typecode, count), column_offset in zip(names, self.layout.column_offsets(slot)):
+            views[name] = self.memory[column_offset:column_offset + column_size].cast(typecode)[:count]
+        return views
+
+    def read(self, pair):
+        """
+        A consistent copy of the order book of the pair.
+        Execution of this function is as follows::
+
+            read(pair="SWTH_NEO")
+
+        The expected return result for this function is as follows::
+
+            {
+                'sequence': 42,
+                'time': 1533168000.123,
+                'bids': [(0.00041, 200000000000), (0.0004, 100000000000)],
+                'asks': [(0.00043, 50000000000), (0.00045, 300000000000)]
+            }
+
+        :param pair: The trading pair of the order book.
+        :type pair: str
+        :return: Dictionary with the sequence number, publish time and the bid and ask levels, best level first.
+        """
+        slot = self.slot(pair)
+        offset = self.layout.slot_offset(slot)
+        levels = self.layout.levels
+        for attempt in range(self.retries):
+            data = self.mm[offset:offset + self.layout.slot_size]
+            if struct.unpack_from('<Q', self.mm, offset)[0] != struct.unpack_from('<Q', data, 0)[0]:
+                continue
+            sequence, publish_time, bid_count, ask_count = struct.unpack_from(slot_header_format, data, 0)
+            if sequence % 2 == 1:
+                continue
+            if self.slot_pair(slot) != pair:
+                raise ValueError("Pair {} has not been published.".format(pair))
+            columns = struct.unpack_from('<{0}d{0}q{0}d{0}q'.format(levels), data, slot_header_size)
+            return {
+                'sequence': sequence,
+                'time': publish_time,
+                'bids': list(zip(columns[0:bid_count], columns[levels:levels + bid_count])),
+                'asks': list(zip(columns[2 * levels:2 * levels + ask_count],
+                                 columns[3 * levels:3 * levels + ask_count]))
+            }
+        raise ValueError("Order book {} is being written, gave up after {} attempts.".format(pair, self.retries))
+
+    def close(self):
+        self.memory.release()
+        self.mm.close()
+        self.file.close()
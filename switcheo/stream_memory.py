@@ -0,0 +1,143 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Compact storage and memory accounting for the streamed order books and trades.
+    The socket.io payloads are lists of small dictionaries of strings, which cost a few hundred bytes per price level
+    or trade. The compact records keep the same information in parallel lists and arrays and rebuild the original
+    dictionaries only when a digest has to be verified.
+Usage:
+    from switcheo.stream_memory import CompactBook, CompactTrades, deep_sizeof
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate memory usage (in bytes) of an object and everything it references.
+
+    :param obj: The object to measure.
+    :return: The size in bytes, objects referenced more than once are counted once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+class CompactBook(object):
+    """
+    Order book levels kept as price strings in ascending order with a parallel int64 array of amounts per side.
+    to_dict returns the book in the layout of the socket.io payload, both sides ordered by price string descending,
+    so its digest matches the digest streamed with each update::
+
+        book = CompactBook(book=data["book"])
+        book.apply(side="buy", price="0.0004", delta="500")
+        sha1_hash_digest(stringify_message(book.to_dict()))
+    """
+
+    __slots__ = ('buy_prices', 'buy_amounts', 'sell_prices', 'sell_amounts')
+
+    def __init__(self, book):
+        """
+
+        :param book: The order book snapshot, with buys and sells lists of price and amount.
+        :type book: dict
+        """
+        buys = sorted((level['price'], int(level['amount'])) for level in book['buys'])
+        sells = sorted((level['price'], int(level['amount'])) for level in book['sells'])
+        self.buy_prices = [price for price, amount in buys]
+        self.buy_amounts = array('q', [amount for price, amount in buys])
+        self.sell_prices = [price for price, amount in sells]
+        self.sell_amounts = array('q', [amount for price, amount in sells])
+
+    def __len__(self):
+        return len(self.buy_prices) + len(self.sell_prices)
+
+    def _side(self, side):
+        if side == 'buy':
+            return self.buy_prices, self.buy_amounts
+        if side == 'sell':
+            return self.sell_prices, self.sell_amounts
+        raise ValueError("Order book event side {} is not buy or sell.".format(side))
+
+    def apply(self, side, price, delta):
+        """
+        Apply the amount change of one price level, levels reaching zero are removed.
+        Raises ValueError for deltas that do not fit the book, such as an amount going below zero.
+        """
+        prices, amounts = self._side(side)
+        index = bisect_left(prices, price)
+        if index < len(prices) and prices[index] == price:
+            amount = amounts[index] + int(delta)
+            if amount < 0:
+                raise ValueError("Order book level {} {} went below zero.".format(side, price))
+            if amount == 0:
+                del prices[index]
+                del amounts[index]
+            else:
+                amounts[index] = amount
+        else:
+            if int(delta) <= 0:
+                raise ValueError("Order book level {} {} does not exist.".format(side, price))
+            prices.insert(index, price)
+            amounts.insert(index, int(delta))
+
+    def to_dict(self):
+        return {
+            'buys': [{'amount': str(amount), 'price': price}
+                     for price, amount in zip(reversed(self.buy_prices), reversed(self.buy_amounts))],
+            'sells': [{'amount': str(amount), 'price': price}
+                      for price, amount in zip(reversed(self.sell_prices), reversed(self.sell_amounts))]
+        }
+
+
+class CompactTrades(object):
+    """
+    Trades kept as tuples of values, newest first, sharing one tuple of keys between all trades with the same keys.
+    to_list returns the trades in the layout of the socket.io payload.
+    """
+
+    __slots__ = ('keys', 'rows')
+
+    def __init__(self, trades=None):
+        self.keys = {}
+        self.rows = []
+        if trades:
+            self.rows = [self._row(trade) for trade in trades]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _row(self, trade):
+        keys = tuple(sorted(trade))
+        keys = self.keys.setdefault(keys, keys)
+        return keys, tuple(trade[key] for key in keys)
+
+    def prepend(self, trades, limit):
+        """
+        Add trades in front of the stored trades and keep the first limit trades.
+
+        :param trades: The new trades, newest first.
+        :type trades: list
+        :param limit: The number of trades to keep.
+        :type limit: int
+        """
+        self.rows = [self._row(trade) for trade in trades] + self.rows
+        del self.rows[limit:]
+
+    def to_list(self):
+        return [dict(zip(keys, values)) for keys, values in self.rows]
@@ -0,0 +1,156 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Record and replay of the Switcheo socket.io streams.
+    The recorder writes every frame received by the streaming namespaces, together with its receive time, to a gzip
+    compressed, append-only log. The replayer feeds a log back through the same namespace handlers, either as fast
+    as possible or paced like the original stream, so order book handling can be reproduced and benchmarked offline.
+Usage:
+    from switcheo.stream_recorder import StreamRecorder, StreamReplayer
+"""
+
+import gzip
+import json
+import threading
+import time
+
+
+class StreamRecorder(object):
+    """
+    Append-only log of the frames received by one or more streaming namespaces.
+
+    Each frame is stored as one compact JSON line ``[receive_time, namespace, event, args]``::
+
+        recorder = StreamRecorder(path='books.log.gz')
+        order_books = recorder.attach(OrderBooksNamespace())
+        socket_io.register_namespace(order_books)
+        ....
+        recorder.close()
+    """
+
+    def __init__(self, path, flush_every=100):
+        """
+
+        :param path: The file the frames are appended to.
+        :type path: str
+        :param flush_every: The number of frames buffered before the log is flushed to disk.
+        :type flush_every: int
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.frames = 0
+        self.lock = threading.Lock()
+        self.log = gzip.open(path, 'ab')
+
+    def attach(self, namespace):
+        """
+        Record every event triggered on the namespace before it is handled.
+
+        :param namespace: The streaming namespace to record.
+        :type namespace: ClientNamespace
+        :return: The same namespace, for chaining into register_namespace.
+        """
+        trigger_event = namespace.trigger_event
+
+        def recording_trigger_event(event, *args):
+            self.record(namespace=namespace.namespace, event=event, args=args)
+            return trigger_event(event, *args)
+
+        namespace.trigger_event = recording_trigger_event
+        return namespace
+
+    def record(self, namespace, event, args, receive_time=None):
+        if receive_time is None:
+            receive_time = time.time()
+        frame = json.dumps([receive_time, namespace, event, list(args)], separators=(',', ':'))
+        with self.lock:
+            self.log.write(frame.encode('utf-8') + b'\n')
+            self.frames += 1
+            if self.frames % self.flush_every == 0:
+                self.log.flush()
+
+    def close(self):
+        with self.lock:
+            self.log.close()
+
+
+class ReplayClient(object):
+    """
+    Stand-in for the socket.io client during a replay, emitted events are kept instead of being sent.
+    """
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data=None, namespace=None, callback=None):
+        self.emitted.append((namespace, event, data))
+
+
+class StreamReplayer(object):
+    """
+    Feeds a log written by the StreamRecorder back through streaming namespace handlers::
+
+        replayer = StreamReplayer(path='books.log.gz')
+        order_books = OrderBooksNamespace()
+        replayer.replay(namespaces=[order_books])             # as fast as possible
+        replayer.replay(namespaces=[order_books], speed=1.0)  # paced like the original stream
+
+    Namespaces that are not connected to a socket.io client are given a ReplayClient, so resynchronisation requests
+    made by the handlers can be inspected on replayer.client.emitted.
+    """
+
+    def __init__(self, path):
+        """
+
+        :param path: The log written by the StreamRecorder.
+        :type path: str
+        """
+        self.path = path
+        self.client = ReplayClient()
+
+    def frames(self):
+        """
+        Generator of the recorded (receive_time, namespace, event, args) frames, in the order they were received.
+        A log cut short, such as by a crash of the recorder, ends after its last complete frame.
+        """
+        with gzip.open(self.path, 'rb') as log:
+            while True:
+                try:
+                    line = log.readline()
+                except EOFError:
+                    return
+                if not line.endswith(b'\n'):
+                    return
+                receive_time, namespace, event, args = json.loads(line.decode('utf-8'))
+                yield receive_time, namespace, event, args
+
+    def replay(self, namespaces, speed=None):
+        """
+        Function to replay the log through the handlers of the namespaces, frames of other namespaces are skipped.
+
+        :param namespaces: The streaming namespaces to replay the log into.
+        :type namespaces: list
+        :param speed: Replay speed relative to the original stream, None replays as fast as possible.
+        :type speed: float
+        :return: The number of frames replayed.
+        """
+        handlers = {}
+        for namespace in namespaces:
+            if namespace.client is None:
+                namespace._set_client(self.client)
+            handlers[namespace.namespace] = namespace
+        replayed = 0
+        first_receive_time = None
+        replay_start = time.time()
+        for receive_time, namespace, event, args in self.frames():
+            if namespace not in handlers:
+                continue
+            if speed is not None:
+                if first_receive_time is None:
+                    first_receive_time = receive_time
+                delay = (receive_time - first_receive_time) / speed - (time.time() - replay_start)
+                if delay > 0:
+                    time.sleep(delay)
+            handlers[namespace].trigger_event(event, *args)
+            replayed += 1
+        return replayed
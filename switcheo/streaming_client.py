@@ -1,16 +1,97 @@
 from socketio import ClientNamespace as SocketIOClientNamespace
+from collections import OrderedDict
 from operator import itemgetter
+from switcheo.order_book import OrderBookCache
+from switcheo.resync import ResyncManager, updates_after_snapshot
+from switcheo.stream_memory import CompactBook, CompactTrades, deep_sizeof
 from switcheo.utils import stringify_message, sha1_hash_digest
 import threading
 
 
 class OrderBooksNamespace(SocketIOClientNamespace):
     
-    def __init__(self):
+    def __init__(self, compact=False, max_pairs=None):
+        """
+
+        :param compact: Flag to keep the books as CompactBook records instead of the socket.io payload.
+        :type compact: bool
+        :param max_pairs: The number of order books kept, the least recently updated room is left beyond it.
+        :type max_pairs: int
+        """
         self.lock = threading.Lock()
         self.namespace = '/v2/books'
+        self.compact = compact
+        self.max_pairs = max_pairs
         self.order_book = {}
+        self.top_of_book = {}
+        self.rooms = OrderedDict()
+        self.listeners = []
+        self.eviction_listeners = []
+        self.resync = ResyncManager(namespace=self)
         SocketIOClientNamespace.__init__(self, namespace=self.namespace)
+
+    def add_listener(self, listener):
+        """
+        Call a function with the pair and its OrderBookCache every time an order book is verified against its digest.
+        """
+        self.listeners.append(listener)
+
+    def notify(self, pair):
+        for listener in self.listeners:
+            listener(pair, self.top_of_book[pair])
+
+    def get_book(self, pair):
+        """
+        The order book of the pair as buys and sells lists of price and amount, in compact mode as well.
+        """
+        book = self.order_book[pair]["book"]
+        if isinstance(book, CompactBook):
+            return book.to_dict()
+        return book
+
+    def add_eviction_listener(self, listener):
+        """
+        Call a function with the room of every pair left because more than max_pairs rooms are kept.
+        """
+        self.eviction_listeners.append(listener)
+
+    def touch(self, room):
+        self.rooms[room["pair"]] = room
+        self.rooms.move_to_end(room["pair"])
+        while self.max_pairs is not None and len(self.rooms) > self.max_pairs:
+            evicted_room = self.rooms[next(iter(self.rooms))]
+            self.leave(evicted_room)
+            for listener in self.eviction_listeners:
+                listener(evicted_room)
+
+    def leave(self, room):
+        """
+        Leave the room of a pair and drop everything kept for it.
+        """
+        if self.client is not None:
+            self.emit(event="leave", data=room)
+        self.evict(room["pair"])
+
+    def evict(self, pair):
+        self.lock.acquire()
+        self.order_book.pop(pair, None)
+        self.top_of_book.pop(pair, None)
+        self.rooms.pop(pair, None)
+        self.lock.release()
+        self.resync.forget(pair)
+
+    def memory_report(self):
+        """
+        Approximate memory usage (in bytes) of the state kept per pair.
+
+        :return: Dictionary of pairs with the bytes used by the book, the top of book cache and the total.
+        """
+        report = {}
+        for pair in list(self.order_book):
+            book = deep_sizeof(self.order_book.get(pair))
+            top_of_book = deep_sizeof(self.top_of_book.get(pair))
+            report[pair] = {'book': book, 'top_of_book': top_of_book, 'total': book + top_of_book}
+        return report
     
     def on_connect(self):
         pass
@@ -22,25 +103,69 @@ class OrderBooksNamespace(SocketIOClientNamespace):
         pass
     
     def on_all(self, data):
+        buffered_updates = self.resync.complete(data["room"]["pair"])
         self.lock.acquire()
-        self.order_book[data["room"]["pair"]] = data
+        if self.compact:
+            self.order_book[data["room"]["pair"]] = {
+                "room": data["room"], "digest": data["digest"], "book": CompactBook(book=data["book"])}
+        else:
+            self.order_book[data["room"]["pair"]] = data
+        self.top_of_book[data["room"]["pair"]] = OrderBookCache(book=data["book"])
         self.lock.release()
+        self.touch(data["room"])
         digest_hash = data["digest"]
         book = data["book"]
         book_digest_hash = sha1_hash_digest(stringify_message(book))
         if digest_hash != book_digest_hash:
-            self.emit(event="leave", data=data["room"], namespace='/v2/books')
-            self.emit(event="join", data=data["room"], namespace='/v2/books')
+            self.resync.request(data["room"])
+            return
+        self.notify(data["room"]["pair"])
+        for update in updates_after_snapshot(buffered_updates, digest_hash):
+            self.on_updates(update)
+            if self.resync.is_resyncing(data["room"]["pair"]):
+                break
     
     def on_updates(self, data):
         update_digest = data["digest"]
         update_pair = data["room"]["pair"]
         update_events = data["events"]
+        if self.resync.buffer(update_pair, data):
+            return
+        self.lock.acquire()
+        try:
+            book = self.apply_events(update_pair, update_events)
+        except (KeyError, TypeError, ValueError):
+            book = None
+        finally:
+            self.lock.release()
+        if book is None:
+            self.resync.request(data["room"])
+            return
+        book_digest_hash = sha1_hash_digest(stringify_message(book))
+        if update_digest != book_digest_hash:
+            self.resync.request(data["room"])
+        else:
+            self.resync.confirm(update_pair)
+            self.touch(data["room"])
+            self.notify(update_pair)
+
+    def apply_events(self, update_pair, update_events):
+        """
+        Apply the price level deltas of an update to the order book of the pair, the caller holds the lock.
+        Raises ValueError for deltas that do not fit the book, such as an amount going below zero. The top of book
+        cache is only updated once the whole update fits the book.
+        """
         buy_event = False
         sell_event = False
+        top_of_book = self.top_of_book[update_pair]
+        book = self.order_book[update_pair]["book"]
+        if isinstance(book, CompactBook):
+            for event in update_events:
+                book.apply(side=event["side"], price=event["price"], delta=event["delta"])
+            top_of_book.apply_events(update_events)
+            return book.to_dict()
         if "symbol" in self.order_book[update_pair]["book"]:
             del self.order_book[update_pair]["book"]["symbol"]
-        self.lock.acquire()
         for event in update_events:
             price_match = False
             event_iteration = 0
@@ -50,12 +175,16 @@ class OrderBooksNamespace(SocketIOClientNamespace):
             elif event["side"] == "sell":
                 event_side = "sells"
                 sell_event = True
+            else:
+                raise ValueError("Order book event side {} is not buy or sell.".format(event["side"]))
             event_price = event["price"]
             event_change = event["delta"]
             for side in self.order_book[update_pair]["book"][event_side]:
                 if side["price"] == event_price:
                     price_match = True
                     updated_amount = int(side["amount"]) + int(event_change)
+                    if updated_amount < 0:
+                        raise ValueError("Order book level {} {} went below zero.".format(event_side, event_price))
                     if updated_amount == 0:
                         self.order_book[update_pair]["book"][event_side].remove(side)
                     else:
@@ -66,6 +195,8 @@ class OrderBooksNamespace(SocketIOClientNamespace):
                     break
                 event_iteration += 1
             if not price_match:
+                if int(event_change) <= 0:
+                    raise ValueError("Order book level {} {} does not exist.".format(event_side, event_price))
                 new_book = {}
                 new_book["amount"] = event_change
                 new_book["price"] = event_price
@@ -81,22 +212,93 @@ class OrderBooksNamespace(SocketIOClientNamespace):
         elif sell_event:
             self.order_book[update_pair]["book"]["sells"] = sorted(
                 self.order_book[update_pair]["book"]["sells"], key=itemgetter("price"), reverse=True)
-        book = self.order_book[update_pair]["book"]
-        self.lock.release()
-        book_digest_hash = sha1_hash_digest(stringify_message(book))
-        if update_digest != book_digest_hash:
-            self.emit(event="leave", data=data["room"], namespace='/v2/books')
-            self.emit(event="join", data=data["room"], namespace='/v2/books')
+        top_of_book.apply_events(update_events)
+        return self.order_book[update_pair]["book"]
 
 
 class TradeEventsNamespace(SocketIOClientNamespace):
 
-    def __init__(self):
+    def __init__(self, compact=False, max_pairs=None):
+        """
+
+        :param compact: Flag to keep the trades as CompactTrades records instead of the socket.io payload.
+        :type compact: bool
+        :param max_pairs: The number of trade lists kept, the least recently updated room is left beyond it.
+        :type max_pairs: int
+        """
         self.lock = threading.Lock()
         self.namespace = '/v2/trades'
+        self.compact = compact
+        self.max_pairs = max_pairs
         self.trade_events = {}
+        self.rooms = OrderedDict()
+        self.listeners = []
+        self.eviction_listeners = []
+        self.resync = ResyncManager(namespace=self)
         SocketIOClientNamespace.__init__(self, namespace=self.namespace)
 
+    def add_listener(self, listener):
+        """
+        Call a function with the pair and the list of trades, newest first, of every snapshot and update verified
+        against its digest. Trades of a snapshot can repeat trades the listener has already received.
+        """
+        self.listeners.append(listener)
+
+    def notify(self, pair, trades):
+        for listener in self.listeners:
+            listener(pair, trades)
+
+    def get_trades(self, pair):
+        """
+        The trades of the pair, newest first, in compact mode as well.
+        """
+        trades = self.trade_events[pair]["trades"]
+        if isinstance(trades, CompactTrades):
+            return trades.to_list()
+        return trades
+
+    def add_eviction_listener(self, listener):
+        """
+        Call a function with the room of every pair left because more than max_pairs rooms are kept.
+        """
+        self.eviction_listeners.append(listener)
+
+    def touch(self, room):
+        self.rooms[room["pair"]] = room
+        self.rooms.move_to_end(room["pair"])
+        while self.max_pairs is not None and len(self.rooms) > self.max_pairs:
+            evicted_room = self.rooms[next(iter(self.rooms))]
+            self.leave(evicted_room)
+            for listener in self.eviction_listeners:
+                listener(evicted_room)
+
+    def leave(self, room):
+        """
+        Leave the room of a pair and drop everything kept for it.
+        """
+        if self.client is not None:
+            self.emit(event="leave", data=room)
+        self.evict(room["pair"])
+
+    def evict(self, pair):
+        self.lock.acquire()
+        self.trade_events.pop(pair, None)
+        self.rooms.pop(pair, None)
+        self.lock.release()
+        self.resync.forget(pair)
+
+    def memory_report(self):
+        """
+        Approximate memory usage (in bytes) of the state kept per pair.
+
+        :return: Dictionary of pairs with the bytes used by the trades and the total.
+        """
+        report = {}
+        for pair in list(self.trade_events):
+            trades = deep_sizeof(self.trade_events.get(pair))
+            report[pair] = {'trades': trades, 'total': trades}
+        return report
+
     def on_connect(self):
         pass
 
@@ -107,32 +309,59 @@ class TradeEventsNamespace(SocketIOClientNamespace):
         pass
 
     def on_all(self, data):
+        buffered_updates = self.resync.complete(data["room"]["pair"])
         self.lock.acquire()
-        self.trade_events[data["room"]["pair"]] = data
+        if self.compact:
+            self.trade_events[data["room"]["pair"]] = {
+                "room": data["room"], "digest": data["digest"], "trades": CompactTrades(trades=data["trades"])}
+        else:
+            self.trade_events[data["room"]["pair"]] = data
         self.lock.release()
+        self.touch(data["room"])
         digest_hash = data["digest"]
         trades = data["trades"]
         trade_digest_hash = sha1_hash_digest(stringify_message(trades))
         if digest_hash != trade_digest_hash:
-            self.emit(event="leave", data=data["room"], namespace='/v2/trades')
-            self.emit(event="join", data=data["room"], namespace='/v2/trades')
+            self.resync.request(data["room"])
+            return
+        self.notify(data["room"]["pair"], trades)
+        for update in updates_after_snapshot(buffered_updates, digest_hash):
+            self.on_updates(update)
+            if self.resync.is_resyncing(data["room"]["pair"]):
+                break
 
     def on_updates(self, data):
         update_digest = data["digest"]
         update_pair = data["room"]["pair"]
         update_events = data["events"]
         update_limit = data["limit"]
+        if self.resync.buffer(update_pair, data):
+            return
         self.lock.acquire()
-        self.trade_events[update_pair]["trades"] = update_events + \
-            self.trade_events[update_pair]["trades"]
-        trade_slice = update_limit - 1
-        self.trade_events[update_pair]["trades"] = self.trade_events[update_pair]["trades"][0:trade_slice]
-        trades = self.trade_events[update_pair]["trades"]
-        self.lock.release()
+        try:
+            trade_slice = update_limit - 1
+            if isinstance(self.trade_events[update_pair]["trades"], CompactTrades):
+                self.trade_events[update_pair]["trades"].prepend(update_events, limit=trade_slice)
+                trades = self.trade_events[update_pair]["trades"].to_list()
+            else:
+                self.trade_events[update_pair]["trades"] = update_events + \
+                    self.trade_events[update_pair]["trades"]
+                self.trade_events[update_pair]["trades"] = self.trade_events[update_pair]["trades"][0:trade_slice]
+                trades = self.trade_events[update_pair]["trades"]
+        except (KeyError, TypeError):
+            trades = None
+        finally:
+            self.lock.release()
+        if trades is None:
+            self.resync.request(data["room"])
+            return
         trade_digest_hash = sha1_hash_digest(stringify_message(trades))
         if update_digest != trade_digest_hash:
-            self.emit(event="leave", data=data["room"], namespace='/v2/trades')
-            self.emit(event="join", data=data["room"], namespace='/v2/trades')
+            self.resync.request(data["room"])
+        else:
+            self.resync.confirm(update_pair)
+            self.touch(data["room"])
+            self.notify(update_pair, update_events)
 
 
 class OrderEventsNamespace(SocketIOClientNamespace):
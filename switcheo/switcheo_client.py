@@ -9,10 +9,11 @@ Usage:
     from switcheo.switcheo_client import SwitcheoClient
 """
 
-from switcheo.utils import current_contract_version
+from switcheo.utils import current_contract_version, lazy_function
 from switcheo.authenticated_client import AuthenticatedClient
 from switcheo.public_client import PublicClient
-from switcheo.neo.utils import neo_get_scripthash_from_address
+
+neo_get_scripthash_from_address = lazy_function('switcheo.neo.utils', 'neo_get_scripthash_from_address')
 
 network_dict = {
     "neo": "neo",
@@ -0,0 +1,102 @@
+import unittest
+import asyncio
+from switcheo.async_streaming_client import AsyncStreamingClient
+from switcheo.streaming_client import OrderBooksNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+contract_hash = 'a195c1549e7da61b8da315765a790ac7e7633b82'
+
+
+class FakeAsyncSocketIO(object):
+
+    def __init__(self):
+        self.handlers = {}
+        self.emitted = []
+
+    def on(self, event, handler=None, namespace=None):
+        self.handlers[(namespace, event)] = handler
+
+    async def trigger(self, event, *args):
+        for (namespace, handler_event), handler in list(self.handlers.items()):
+            if handler_event == event:
+                await handler(*args)
+
+    async def connect(self, url, headers={}, transports=None, namespaces=None, socketio_path='socket.io'):
+        self.url = url
+        await self.trigger('connect')
+
+    async def emit(self, event, data=None, namespace=None, callback=None):
+        self.emitted.append((namespace, event, data))
+
+    async def disconnect(self):
+        await self.trigger('disconnect')
+
+
+class TestAsyncStreamingClient(unittest.TestCase):
+
+    def test_resubscribe_on_reconnect(self):
+        socket_io = FakeAsyncSocketIO()
+        streaming_client = AsyncStreamingClient(socket_io=socket_io)
+        streaming_client.subscribe_order_book(pair="SWTH_NEO", contract_hash="a195c1549e7da61b8da315765a790ac7e7633b82")
+        streaming_client.subscribe_trades(pair="SWTH_NEO", contract_hash="a195c1549e7da61b8da315765a790ac7e7633b82")
+        streaming_client.subscribe_trades(pair="SWTH_NEO", contract_hash="a195c1549e7da61b8da315765a790ac7e7633b82")
+
+        async def scenario():
+            await streaming_client.connect()
+            self.assertEqual(socket_io.url, 'https://test-ws.switcheo.io')
+            self.assertEqual(sorted(namespace for namespace, event, data in socket_io.emitted),
+                             ['/v2/books', '/v2/trades'])
+            streaming_client.subscribe_orders(address="fea2b883725ef2d194c9060f606cd0a0468a2c59",
+                                              contract_hash="a195c1549e7da61b8da315765a790ac7e7633b82")
+            await asyncio.sleep(0.01)
+            self.assertEqual(socket_io.emitted[-1][0:2], ('/v2/orders', 'join'))
+            await socket_io.trigger('disconnect')
+            self.assertFalse(streaming_client.connected)
+            socket_io.emitted = []
+            await socket_io.trigger('connect')
+            self.assertEqual(sorted(namespace for namespace, event, data in socket_io.emitted),
+                             ['/v2/books', '/v2/orders', '/v2/trades'])
+            streaming_client.unsubscribe(namespace='/v2/books',
+                                         room={'contractHash': "a195c1549e7da61b8da315765a790ac7e7633b82",
+                                               'pair': "SWTH_NEO"})
+            await asyncio.sleep(0.01)
+            self.assertEqual(socket_io.emitted[-1][0:2], ('/v2/books', 'leave'))
+
+        asyncio.new_event_loop().run_until_complete(scenario())
+        metrics = streaming_client.metrics()
+        self.assertEqual(metrics['reconnects'], 1)
+        self.assertEqual(metrics['subscribed_rooms'], 2)
+        self.assertIsNotNone(metrics['connect_latency'])
+        self.assertTrue(metrics['connected'])
+
+    def test_reconnect_latencies(self):
+        socket_io = FakeAsyncSocketIO()
+        streaming_client = AsyncStreamingClient(socket_io=socket_io, max_reconnect_latencies=2)
+
+        async def scenario():
+            await streaming_client.connect()
+            for reconnect in range(5):
+                await socket_io.trigger('disconnect')
+                await socket_io.trigger('connect')
+
+        asyncio.new_event_loop().run_until_complete(scenario())
+        self.assertEqual(streaming_client.metrics()['reconnects'], 5)
+        self.assertEqual(len(streaming_client.reconnect_latencies), 2)
+
+    def test_evicted_rooms_are_not_rejoined(self):
+        socket_io = FakeAsyncSocketIO()
+        streaming_client = AsyncStreamingClient(socket_io=socket_io, order_books=OrderBooksNamespace(max_pairs=1))
+        book = {'buys': [], 'sells': []}
+        for pair in ['SWTH_NEO', 'SWTH_ETH']:
+            streaming_client.subscribe_order_book(pair=pair, contract_hash=contract_hash)
+            streaming_client.order_books.on_all({'room': {'contractHash': contract_hash, 'pair': pair},
+                                                 'digest': sha1_hash_digest(stringify_message(book)), 'book': book})
+        self.assertEqual(streaming_client.rooms['/v2/books'], [{'contractHash': contract_hash, 'pair': 'SWTH_ETH'}])
+
+        async def scenario():
+            await streaming_client.connect()
+
+        asyncio.new_event_loop().run_until_complete(scenario())
+        self.assertEqual(socket_io.emitted,
+                         [('/v2/books', 'join', {'contractHash': contract_hash, 'pair': 'SWTH_ETH'})])
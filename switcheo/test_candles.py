@@ -0,0 +1,85 @@
+import unittest
+import threading
+from switcheo.candles import CandleAggregator
+from switcheo.streaming_client import TradeEventsNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+
+
+class FakeCandleClient(object):
+
+    def __init__(self):
+        self.requests = []
+
+    def get_candlesticks(self, pair, start_time, end_time, interval):
+        self.requests.append((pair, start_time, end_time, interval))
+        return [{'time': str(end_time - end_time % (interval * 60)), 'open': '0.0004', 'close': '0.0004',
+                 'high': '0.0004', 'low': '0.0004', 'volume': '400.0', 'quote_volume': '1000000.0'}]
+
+
+def trade(trade_id, event_time, fill_amount, take_amount):
+    return {'id': trade_id, 'event_time': event_time, 'fill_amount': fill_amount, 'take_amount': take_amount,
+            'is_buy': True}
+
+
+class TestCandleAggregator(unittest.TestCase):
+
+    def test_aggregate_trades(self):
+        client = FakeCandleClient()
+        candle_aggregator = CandleAggregator(intervals=[1, 5])
+        candle_aggregator.seed(client=client, pair='SWTH_NEO', end_time=1533168030, candles=10)
+        self.assertEqual(client.requests, [('SWTH_NEO', 1533167430, 1533168030, 1),
+                                           ('SWTH_NEO', 1533165030, 1533168030, 5)])
+        trade_events = candle_aggregator.attach(TradeEventsNamespace())
+        trades = [trade('c', '2018-08-02T00:01:10.000Z', 500, 1000000),
+                  trade('b', '2018-08-02T00:00:40.000Z', 450, 1000000),
+                  trade('a', '2018-08-02T00:00:20.000Z', 400, 1000000)]
+        trade_events.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(trades)), 'trades': trades})
+        trade_events.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(trades)), 'trades': trades})
+        self.assertEqual(candle_aggregator.trades, 2)
+        one_minute = candle_aggregator.get_candles(pair='SWTH_NEO', interval=1)
+        self.assertEqual([candle['time'] for candle in one_minute], [1533168000, 1533168060])
+        self.assertEqual(one_minute[0]['high'], 0.00045)
+        self.assertEqual(one_minute[0]['close'], 0.00045)
+        self.assertEqual(one_minute[0]['volume'], 850.0)
+        self.assertEqual(candle_aggregator.current(pair='SWTH_NEO', interval=1)['open'], 0.0005)
+        five_minutes = candle_aggregator.current(pair='SWTH_NEO', interval=5)
+        self.assertEqual(five_minutes['time'], 1533168000)
+        self.assertEqual((five_minutes['low'], five_minutes['high'], five_minutes['close']), (0.0004, 0.0005, 0.0005))
+        self.assertEqual(five_minutes['quote_volume'], 3000000.0)
+        self.assertRaises(ValueError, CandleAggregator, intervals=[2])
+
+    def test_read_while_streaming(self):
+        candle_aggregator = CandleAggregator(intervals=[1], max_candles=100)
+        done = threading.Event()
+
+        def stream():
+            for trade_id in range(20000):
+                candle_aggregator.add_trade('SWTH_NEO', trade(trade_id, 1533168000 + trade_id * 60, 400, 1000000))
+            done.set()
+
+        streamer = threading.Thread(target=stream)
+        streamer.start()
+        while not done.is_set():
+            candles = candle_aggregator.get_candles(pair='SWTH_NEO', interval=1)
+            self.assertEqual([candle['time'] for candle in candles], sorted(candle['time'] for candle in candles))
+        streamer.join()
+        self.assertEqual(len(candle_aggregator.get_candles(pair='SWTH_NEO', interval=1)), 100)
+
+    def test_trades_while_seeding(self):
+        candle_aggregator = CandleAggregator(intervals=[1])
+
+        class StreamingCandleClient(FakeCandleClient):
+            def get_candlesticks(self, pair, start_time, end_time, interval):
+                candle_aggregator.add_trade(pair, trade('a', end_time + 10, 500, 1000000))
+                candle_aggregator.add_trade(pair, trade('b', end_time - 10, 450, 1000000))
+                return FakeCandleClient.get_candlesticks(self, pair, start_time, end_time, interval)
+
+        candle_aggregator.seed(client=StreamingCandleClient(), pair='SWTH_NEO', end_time=1533168030, candles=10)
+        candles = candle_aggregator.get_candles(pair='SWTH_NEO', interval=1)
+        self.assertEqual(len(candles), 1)
+        self.assertEqual((candles[0]['open'], candles[0]['close'], candles[0]['high']), (0.0004, 0.0005, 0.0005))
+        self.assertEqual(candles[0]['volume'], 900.0)
+        self.assertEqual(candle_aggregator.trades, 1)
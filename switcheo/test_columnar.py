@@ -0,0 +1,90 @@
+import unittest
+from switcheo.columnar import ColumnarTable, candlesticks_to_columns, trades_to_columns, offer_book_to_columns,\
+    last_24_hours_to_columns
+from switcheo.utils import iso8601_to_epoch
+
+
+candles = [{
+    'time': '1533168000',
+    'open': '0.00046835',
+    'close': '0.00046835',
+    'high': '0.00046835',
+    'low': '0.00046835',
+    'volume': '240315335.0',
+    'quote_volume': '513110569018.0'
+}, {
+    'time': '1533081600',
+    'open': '0.00046835',
+    'close': '0.00046835',
+    'high': '0.00046835',
+    'low': '0.00046835',
+    'volume': '1170875.0',
+    'quote_volume': '2500000000.0'
+}]
+
+trades = [{
+    'id': '15bb16e2-7a80-4de1-bb59-bcaff877dee0',
+    'fill_amount': 100000000,
+    'take_amount': 100000000,
+    'event_time': '2018-08-04T15:00:12.634Z',
+    'is_buy': True
+}, {
+    'id': 'b6f9e530-60ff-46ff-9a71-362097a2025e',
+    'fill_amount': 47833882,
+    'take_amount': 97950000000,
+    'event_time': '2018-08-03T02:44:47.706Z',
+    'is_buy': False
+}]
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_iso8601_to_epoch(self):
+        self.assertAlmostEqual(iso8601_to_epoch('2018-08-04T15:00:12.634Z'), 1533394812.634, places=3)
+        self.assertEqual(iso8601_to_epoch('2018-08-04T15:00:12Z'), 1533394812.0)
+
+    def test_candlesticks_to_columns(self):
+        table = candlesticks_to_columns(candles)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table.keys()), ['time', 'open', 'close', 'high', 'low', 'volume', 'quote_volume'])
+        self.assertEqual(table['time'].tolist(), [1533168000, 1533081600])
+        self.assertEqual(table['quote_volume'][1], 2500000000.0)
+        self.assertEqual(table.nbytes(), 2 * 8 * 7)
+        self.assertEqual(len(ColumnarTable({})), 0)
+
+    def test_trades_to_columns(self):
+        table = trades_to_columns(trades)
+        self.assertEqual(table['id'], [trade['id'] for trade in trades])
+        self.assertEqual(table['is_buy'].tolist(), [1, 0])
+        self.assertAlmostEqual(table['price'][1], 0.00048835, places=8)
+        self.assertAlmostEqual(table['event_time'][0], 1533394812.634, places=3)
+        table = trades_to_columns(trades, decimals={'fill_amount': 8, 'take_amount': 8})
+        self.assertEqual(table['fill_amount'].tolist(), [1.0, 0.47833882])
+        self.assertEqual(table['take_amount'].tolist(), [1.0, 979.5])
+        self.assertAlmostEqual(table['price'][1], 0.00048835, places=8)
+        table = trades_to_columns([{
+            'id': 'e5ee1a5c-6e85-4ad5-9e4e-e5b4a0ddc0d2',
+            'fill_amount': 50000000,
+            'take_amount': 2000000000000000000,
+            'event_time': '2018-08-04T15:00:12.634Z',
+            'is_buy': True
+        }], decimals={'fill_amount': 8, 'take_amount': 18})
+        self.assertEqual(table['take_amount'].tolist(), [2.0])
+        self.assertAlmostEqual(table['price'][0], 0.25)
+
+    def test_offer_book_to_columns(self):
+        book = offer_book_to_columns({
+            'asks': [{'price': '0.00068499', 'quantity': '43326.8348443'}, {'price': '0.000685', 'quantity': '59886.34'}],
+            'bids': [{'price': '0.00066602', 'quantity': '3255.99999999'}]
+        })
+        self.assertEqual(book['asks']['price'].tolist(), [0.00068499, 0.000685])
+        self.assertEqual(book['bids']['quantity'].tolist(), [3255.99999999])
+
+    def test_last_24_hours_to_columns(self):
+        table = last_24_hours_to_columns([{
+            'pair': 'SWTH_NEO', 'open': '0.000407', 'close': '0.00040911', 'high': '0.00041492', 'low': '0.00036',
+            'volume': '34572662197.0', 'quote_volume': None
+        }])
+        self.assertEqual(table['pair'], ['SWTH_NEO'])
+        self.assertEqual(table['close'][0], 0.00040911)
+        self.assertNotEqual(table['quote_volume'][0], table['quote_volume'][0])
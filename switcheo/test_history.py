@@ -0,0 +1,119 @@
+import unittest
+import threading
+from datetime import datetime, timezone
+from switcheo.history import TradeHistory, candlestick_chunks, fill_candlestick_gaps, get_candlestick_history
+
+
+def event_time(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class FakeTradeClient(object):
+
+    def __init__(self, trade_times):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.trades = [{
+            'id': 'trade-{:05d}'.format(index),
+            'fill_amount': 100000000,
+            'take_amount': 200000000,
+            'event_time': event_time(epoch),
+            'is_buy': index % 2 == 0,
+            'epoch': epoch
+        } for index, epoch in enumerate(trade_times)]
+
+    def get_trades(self, pair="SWTH_NEO", start_time=None, end_time=None, limit=5000):
+        with self.lock:
+            self.calls.append((start_time, end_time))
+        window = [trade for trade in self.trades if start_time <= trade['epoch'] <= end_time]
+        return sorted(window, key=lambda t: t['event_time'], reverse=True)[:limit]
+
+
+class FakeCandlestickClient(object):
+
+    def __init__(self, candle_times):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.candle_times = candle_times
+
+    def get_candlesticks(self, pair, start_time, end_time, interval):
+        with self.lock:
+            self.calls.append((pair, start_time, end_time))
+        return [{
+            'time': str(candle_time),
+            'open': '0.0004',
+            'close': '0.0005',
+            'high': '0.0006',
+            'low': '0.0003',
+            'volume': '100.0',
+            'quote_volume': '200000.0'
+        } for candle_time in reversed(self.candle_times) if start_time <= candle_time <= end_time]
+
+
+class TestCandlestickHistory(unittest.TestCase):
+
+    def test_candlestick_chunks(self):
+        self.assertEqual(candlestick_chunks(start_time=90, end_time=700, interval=1, max_candles=5),
+                         [(90, 300), (360, 600), (660, 700)])
+        with self.assertRaises(ValueError):
+            candlestick_chunks(start_time=0, end_time=100, interval=2)
+
+    def test_fill_candlestick_gaps(self):
+        candles = FakeCandlestickClient([0, 60, 240]).get_candlesticks("SWTH_NEO", 0, 240, 1)[::-1]
+        filled = fill_candlestick_gaps(candles=candles, interval=1)
+        self.assertEqual([candle['time'] for candle in filled], ['0', '60', '120', '180', '240'])
+        self.assertEqual(filled[2]['open'], '0.0005')
+        self.assertEqual(filled[2]['volume'], '0.0')
+
+    def test_get_candlestick_history(self):
+        candle_times = [candle_time for candle_time in range(0, 60 * 1000, 60) if candle_time % 7 != 0]
+        client = FakeCandlestickClient(candle_times)
+        history = get_candlestick_history(client=client, pairs=["SWTH_NEO", "GAS_NEO"], start_time=0,
+                                          end_time=60 * 999, interval=1, max_candles=100)
+        self.assertEqual(len(client.calls), 20)
+        self.assertEqual([int(candle['time']) for candle in history['SWTH_NEO']], candle_times)
+        history = get_candlestick_history(client=client, pairs="SWTH_NEO", start_time=0, end_time=60 * 999,
+                                          interval=1, max_candles=100, fill_gaps=True)
+        self.assertEqual(len(history['SWTH_NEO']), 999)
+
+
+class TestTradeHistory(unittest.TestCase):
+
+    def test_trade_history(self):
+        trade_times = list(range(1000, 2000, 7)) + [1500] * 30 + [1200, 1300, 1400]
+        client = FakeTradeClient(trade_times)
+        history = TradeHistory(client=client, pair="SWTH_NEO", start_time=1000, end_time=2000, window=100,
+                               limit=20, max_workers=3)
+        trades = list(history)
+        self.assertEqual(len(trades), len(client.trades))
+        self.assertEqual(len(set(trade['id'] for trade in trades)), len(trades))
+        self.assertEqual([trade['event_time'] for trade in trades], sorted(trade['event_time'] for trade in trades))
+        self.assertGreater(history.splits, 0)
+        self.assertEqual(history.checkpoint['start_time'], 2000)
+
+    def test_trade_history_full_second(self):
+        client = FakeTradeClient([1500] * 10000)
+        history = TradeHistory(client=client, pair="SWTH_NEO", start_time=1000, end_time=2000, window=100,
+                               limit=10000)
+        with self.assertRaises(ValueError):
+            list(history)
+        self.assertLessEqual(history.checkpoint['start_time'], 1500)
+
+    def test_trade_history_checkpoint(self):
+        client = FakeTradeClient(list(range(1000, 2000, 3)))
+        all_trades = [trade['id'] for trade in TradeHistory(client=client, pair="SWTH_NEO", start_time=1000,
+                                                            end_time=2000, window=50, limit=100)]
+        history = TradeHistory(client=client, pair="SWTH_NEO", start_time=1000, end_time=2000, window=50, limit=100)
+        first_trades = []
+        for trade in history:
+            first_trades.append(trade['id'])
+            if len(first_trades) == 123:
+                break
+        checkpoint = history.checkpoint
+        resumed = TradeHistory(client=client, pair="SWTH_NEO", start_time=1000, end_time=2000, window=50,
+                               limit=100, checkpoint=checkpoint)
+        self.assertEqual(first_trades + [trade['id'] for trade in resumed], all_trades)
+        with self.assertRaises(ValueError):
+            TradeHistory(client=client, pair="GAS_NEO", start_time=1000, end_time=2000, checkpoint=checkpoint)
+        with self.assertRaises(ValueError):
+            TradeHistory(client=client, pair="SWTH_NEO", start_time=1000, end_time=2000, limit=0)
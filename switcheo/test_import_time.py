@@ -0,0 +1,36 @@
+import unittest
+import json
+import subprocess
+import sys
+from switcheo.utils import lazy_function
+
+
+# Seconds allowed for importing the clients in a fresh interpreter, the signing stacks alone take longer than this.
+import_time_budget = 1.0
+
+import_script = """
+import json, sys, time
+start = time.perf_counter()
+import switcheo.authenticated_client, switcheo.switcheo_client
+elapsed = time.perf_counter() - start
+loaded = sorted(module for module in ['web3', 'eth_account', 'eth_utils', 'neocore'] if module in sys.modules)
+from switcheo.switcheo_client import neo_get_scripthash_from_address
+neo_get_scripthash_from_address(address='APuP9GsSCPJKrexPe49afDV8CQYubZGWd8')
+print(json.dumps({'elapsed': elapsed, 'loaded': loaded, 'neocore': 'neocore' in sys.modules}))
+"""
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_client_import_time(self):
+        output = subprocess.check_output([sys.executable, '-c', import_script])
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        self.assertEqual(result['loaded'], [])
+        self.assertTrue(result['neocore'])
+        self.assertLess(result['elapsed'], import_time_budget)
+
+    def test_lazy_function(self):
+        to_neo_asset_amount = lazy_function('switcheo.neo.utils', 'to_neo_asset_amount')
+        self.assertEqual(to_neo_asset_amount.__name__, 'to_neo_asset_amount')
+        self.assertEqual(to_neo_asset_amount(1), '100000000')
+        self.assertRaises(AttributeError, lazy_function('switcheo.neo.utils', 'missing_function'))
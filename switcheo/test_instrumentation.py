@@ -0,0 +1,72 @@
+import unittest
+from switcheo.instrumentation import RequestMetrics, endpoint_label, percentile
+from switcheo.mock_server import MockSwitcheoServer
+from switcheo.public_client import PublicClient
+from switcheo.utils import SwitcheoApiException
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_endpoint_label(self):
+        self.assertEqual(endpoint_label('/orders/7cbdf481-6acf-4bf3-a1ed-4773f31e6931/broadcast'),
+                         '/orders/{id}/broadcast')
+        self.assertEqual(endpoint_label('/cancellations/0x' + 'ab' * 32), '/cancellations/{id}')
+        self.assertEqual(endpoint_label('/offers/book'), '/offers/book')
+
+    def test_percentile(self):
+        latencies = [0.012, 0.004, 0.009, 0.031]
+        self.assertEqual(percentile(latencies, 50), 0.009)
+        self.assertEqual(percentile(latencies, 99), 0.031)
+        self.assertEqual(percentile(latencies, 0), 0.004)
+        self.assertIsNone(percentile([], 50))
+
+    def test_request_metrics(self):
+        server = MockSwitcheoServer(seed=1).start()
+        try:
+            public_client = PublicClient(api_url=server.url)
+            self.assertEqual(public_client.request.hooks, [])
+            events = []
+            metrics = RequestMetrics()
+            metrics.attach(public_client)
+            public_client.request.add_hook(events.append)
+            public_client.get_offer_book(pair='SWTH_NEO')
+            self.assertEqual(len(public_client.get_trades(pair='SWTH_NEO', limit=5)), 5)
+            server.error_rate = 1.0
+            self.assertRaises(SwitcheoApiException, public_client.request.post, path='/orders', json_data={})
+            server.error_rate = 0.0
+            self.assertEqual([(event['method'], event['path'], event['status']) for event in events[:2]],
+                             [('GET', '/offers/book', 200), ('GET', '/trades', 200)])
+            self.assertGreater(events[1]['response_bytes'], 0)
+            self.assertEqual(sorted(events[1]['timings']), ['decode', 'response', 'total', 'transfer'])
+            self.assertEqual(events[2]['error'], 'SwitcheoApiException')
+            self.assertGreater(events[2]['request_bytes'], 0)
+            self.assertGreaterEqual(events[2]['status'], 400)
+            exposition = metrics.to_prometheus()
+            self.assertIn('switcheo_request_duration_seconds_count{method="GET",endpoint="/trades"} 1', exposition)
+            self.assertIn('switcheo_request_phase_seconds_count{method="GET",endpoint="/trades",phase="decode"} 1',
+                          exposition)
+            self.assertIn('switcheo_requests_total{method="GET",endpoint="/offers/book",status="200"} 1',
+                          exposition)
+            self.assertIn('switcheo_request_errors_total{method="POST",endpoint="/orders",'
+                          'error="SwitcheoApiException"} 1', exposition)
+            self.assertIn('switcheo_request_bytes_total{method="GET",endpoint="/trades",direction="received"} ' +
+                          str(events[1]['response_bytes']), exposition)
+        finally:
+            server.stop()
+
+    def test_failing_hook(self):
+        server = MockSwitcheoServer(seed=1).start()
+        try:
+            public_client = PublicClient(api_url=server.url)
+
+            def failing_hook(event):
+                raise RuntimeError('metrics backend unavailable')
+
+            public_client.request.add_hook(failing_hook)
+            with self.assertLogs('switcheo.utils', level='ERROR') as logs:
+                self.assertIn('bids', public_client.get_offer_book(pair='SWTH_NEO'))
+                server.error_rate = 1.0
+                self.assertRaises(SwitcheoApiException, public_client.request.post, path='/orders', json_data={})
+            self.assertEqual(len(logs.records), 2)
+        finally:
+            server.stop()
@@ -0,0 +1,94 @@
+import unittest
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from switcheo.columnar import candlesticks_to_columns
+from switcheo.market_store import MarketDataStore, merge_ranges, missing_ranges
+
+
+class FakeMarketClient(object):
+
+    def __init__(self):
+        self.candle_requests = []
+        self.trade_requests = []
+
+    def get_candlesticks(self, pair, start_time, end_time, interval):
+        self.candle_requests.append((start_time, end_time))
+        return [{
+            'time': str(candle_time),
+            'open': '1.0',
+            'close': str(candle_time / 60.0),
+            'high': '2.0',
+            'low': '0.5',
+            'volume': '100.0',
+            'quote_volume': '200.0'
+        } for candle_time in range(end_time - end_time % 60, start_time - 1, -60)]
+
+    def pair_decimals(self, pair):
+        return {'fill_amount': 8, 'take_amount': 18}
+
+    def get_trades(self, pair="SWTH_NEO", start_time=None, end_time=None, limit=5000):
+        self.trade_requests.append((start_time, end_time))
+        return [{
+            'id': 'trade-{}'.format(epoch),
+            'fill_amount': epoch,
+            'take_amount': 2 * epoch,
+            'event_time': datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'is_buy': True
+        } for epoch in range(end_time - end_time % 10, start_time - 1, -10)][:limit]
+
+
+class TestMarketDataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_ranges(self):
+        self.assertEqual(merge_ranges([[5, 10], [0, 5], [20, 30], [25, 27]]), [[0, 10], [20, 30]])
+        self.assertEqual(missing_ranges([[0, 10], [20, 30]], 5, 40), [[10, 20], [30, 40]])
+        self.assertEqual(missing_ranges([[0, 10], [20, 30]], 0, 10), [])
+
+    def test_candlesticks(self):
+        client = FakeMarketClient()
+        store = MarketDataStore(path=self.path, client=client)
+        candles = store.candlesticks(pair="SWTH_NEO", interval=1, start_time=6000, end_time=12000)
+        self.assertEqual(candles['time'].tolist(), list(range(6000, 12000, 60)))
+        requests = len(client.candle_requests)
+        candles = store.candlesticks(pair="SWTH_NEO", interval=1, start_time=3000, end_time=9000)
+        self.assertEqual(candles['time'].tolist(), list(range(3000, 9000, 60)))
+        self.assertTrue(all(end_time < 6000 for _, end_time in client.candle_requests[requests:]))
+        requests = len(client.candle_requests)
+        store.candlesticks(pair="SWTH_NEO", interval=1, start_time=3000, end_time=12000)
+        self.assertEqual(len(client.candle_requests), requests)
+        stored = MarketDataStore(path=self.path).read_candlesticks(pair="SWTH_NEO", interval=1)
+        self.assertIsInstance(stored['close'], memoryview)
+        self.assertEqual(len(stored), 150)
+        self.assertEqual(sorted(stored['time'].tolist()), list(range(3000, 12000, 60)))
+
+    def test_trades(self):
+        client = FakeMarketClient()
+        store = MarketDataStore(path=self.path, client=client)
+        trades = store.trades(pair="SWTH_NEO", start_time=1000, end_time=2000)
+        self.assertEqual(trades['event_time'].tolist(), [float(epoch) for epoch in range(1000, 2000, 10)])
+        trades = store.trades(pair="SWTH_NEO", start_time=1500, end_time=2500)
+        self.assertEqual(len(trades), 100)
+        self.assertEqual(trades['price'][0], 0.5 * 10 ** 10)
+        self.assertEqual(trades['fill_amount'][0], 1500 / 10.0 ** 8)
+        self.assertEqual(len(store.read_trades(pair="SWTH_NEO")), 150)
+
+    def test_concurrent_fill(self):
+        client = FakeMarketClient()
+        dataset = MarketDataStore(path=self.path, client=client).candlestick_dataset(pair="SWTH_NEO", interval=1)
+        candles = client.get_candlesticks(pair="SWTH_NEO", start_time=0, end_time=5940, interval=1)
+        other_writer = MarketDataStore(path=self.path).candlestick_dataset(pair="SWTH_NEO", interval=1)
+        other_writer.append(candlesticks_to_columns(candles), 3000, 6000)
+        dataset.append(candlesticks_to_columns(candles), 0, 6000)
+        dataset.append(candlesticks_to_columns(candles), 0, 6000)
+        self.assertEqual(dataset.index()['rows'], 100)
+        self.assertEqual(dataset.index()['ranges'], [[0, 6000]])
+        self.assertEqual(dataset.select(0, 6000)['time'].tolist(), list(range(0, 6000, 60)))
+        self.assertEqual(dataset.select(2970, 3090)['time'].tolist(), [3000, 3060])
+        self.assertEqual(len(dataset.select(6000, 7000)), 0)
@@ -0,0 +1,34 @@
+import unittest
+from switcheo.market_view import MarketView, find_triangles
+from switcheo.streaming_client import OrderBooksNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+def book_snapshot(pair, bid, ask, amount):
+    book = {'buys': [{'amount': amount, 'price': bid}], 'sells': [{'amount': amount, 'price': ask}]}
+    return {'room': {'pair': pair, 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'},
+            'digest': sha1_hash_digest(stringify_message(book)), 'book': book}
+
+
+class TestMarketView(unittest.TestCase):
+
+    def test_find_triangles(self):
+        self.assertEqual(find_triangles(pairs=['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH', 'SWTH_GAS', 'GAS_NEO']),
+                         [('GAS_NEO', 'SWTH_GAS', 'SWTH_NEO'), ('NEO_ETH', 'SWTH_ETH', 'SWTH_NEO')])
+
+    def test_triangle(self):
+        order_books = OrderBooksNamespace()
+        order_books.on_all(book_snapshot('SWTH_NEO', '0.0004', '0.00041', '100000000000'))
+        market_view = MarketView(order_books=order_books, pairs=['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH', 'SWTH_GAS'])
+        self.assertIsNone(market_view.triangle(['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH'])['forward'])
+        order_books.on_all(book_snapshot('SWTH_ETH', '0.00002', '0.000021', '100000000000'))
+        order_books.on_all(book_snapshot('NEO_ETH', '0.05', '0.051', '1000000000'))
+        triangle = market_view.triangle(['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH'])
+        self.assertEqual(triangle['forward']['path'], ['ETH', 'NEO', 'SWTH', 'ETH'])
+        self.assertAlmostEqual(triangle['forward']['rate'], 0.00002 / (0.051 * 0.00041))
+        self.assertAlmostEqual(triangle['forward']['size'], 1000 * 0.051 * 0.00041)
+        self.assertAlmostEqual(triangle['backward']['rate'], 0.05 * 0.0004 / 0.000021)
+        self.assertEqual(market_view.recomputed, 3)
+        order_books.on_all(book_snapshot('SWTH_GAS', '0.001', '0.0011', '100000000000'))
+        self.assertEqual(market_view.recomputed, 3)
+        self.assertEqual(market_view.opportunities(min_rate=0.9), [triangle['forward'], triangle['backward']])
@@ -0,0 +1,58 @@
+import unittest
+import time
+import socketio
+from switcheo.mock_server import MockMarket, MockSwitcheoServer
+from switcheo.public_client import PublicClient
+from switcheo.streaming_client import OrderBooksNamespace, TradeEventsNamespace
+from switcheo.utils import SwitcheoApiException
+
+
+class TestMockSwitcheoServer(unittest.TestCase):
+
+    def test_market_updates(self):
+        market = MockMarket(pairs={'SWTH_NEO': 0.0004}, levels=20, seed=1)
+        order_books = OrderBooksNamespace()
+        order_books.on_all(market.book_snapshot('SWTH_NEO'))
+        trade_events = TradeEventsNamespace()
+        trade_events.on_all(market.trades_snapshot('SWTH_NEO'))
+        for update in range(200):
+            order_books.on_updates(market.book_update('SWTH_NEO'))
+            trade_events.on_updates(market.trade_update('SWTH_NEO'))
+        self.assertEqual(order_books.resync.stats(), {})
+        self.assertEqual(trade_events.resync.stats(), {})
+        self.assertEqual(len(trade_events.trade_events['SWTH_NEO']['trades']), 19)
+
+    def test_rest_and_stream(self):
+        server = MockSwitcheoServer(message_rate=50, seed=1).start()
+        try:
+            public_client = PublicClient(api_url=server.url)
+            self.assertEqual(public_client.get_exchange_status(), {'status': 'ok'})
+            offer_book = public_client.get_offer_book(pair='SWTH_NEO')
+            self.assertLess(float(offer_book['bids'][0]['price']), float(offer_book['asks'][0]['price']))
+            self.assertEqual(len(public_client.get_trades(pair='SWTH_NEO', limit=5)), 5)
+            self.assertEqual(server.requests['GET /v2/offers/book'], 1)
+            server.error_rate = 1.0
+            self.assertRaises(Exception, public_client.get_trades, pair='SWTH_NEO')
+            self.assertRaises(SwitcheoApiException, public_client.request.post, path='/orders', json_data={})
+            server.error_rate = 0.0
+
+            socket_io = socketio.Client()
+            order_books = OrderBooksNamespace()
+            socket_io.register_namespace(order_books)
+            socket_io.connect(server.url, transports=['polling'], namespaces=['/v2/books'])
+            order_books.emit('join', {'pair': 'SWTH_NEO', 'contractHash': public_client.contract_hash})
+            deadline = time.time() + 10
+            while server.messages < 10 and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertGreaterEqual(server.messages, 10)
+            order_books.emit('leave', {'pair': 'SWTH_NEO', 'contractHash': public_client.contract_hash})
+            while server.joined['/v2/books'] and time.time() < deadline:
+                time.sleep(0.05)
+            messages = server.messages
+            time.sleep(0.1)
+            socket_io.disconnect()
+            self.assertEqual(server.messages, messages)
+            self.assertIn('SWTH_NEO', order_books.top_of_book)
+            self.assertEqual(order_books.resync.stats(), {})
+        finally:
+            server.stop()
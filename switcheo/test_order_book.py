@@ -0,0 +1,89 @@
+import unittest
+import copy
+import threading
+from switcheo.order_book import OrderBookCache
+from switcheo.stream_recorder import ReplayClient
+from switcheo.streaming_client import OrderBooksNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1000', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}, {'amount': '500', 'price': '0.00043'}]
+}
+updated_book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1500', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}]
+}
+
+
+class TestOrderBookCache(unittest.TestCase):
+
+    def test_top_of_book(self):
+        cache = OrderBookCache(book=book)
+        self.assertEqual(cache.best_bid(), (0.00041, 2000))
+        self.assertEqual(cache.best_ask(), (0.00043, 500))
+        self.assertAlmostEqual(cache.spread(), 0.00002)
+        self.assertAlmostEqual(cache.mid(), 0.00042)
+        self.assertEqual(cache.depth(side='buy', levels=5), [(0.00041, 2000, 2000), (0.0004, 1000, 3000)])
+        self.assertEqual(cache.depth(side='sell', levels=1), [(0.00043, 500, 500)])
+        self.assertEqual(cache.apply(side='sell', price='0.00043', delta='-500'), 0)
+        self.assertEqual(cache.apply(side='sell', price='0.00044', delta='100'), 100)
+        self.assertEqual(cache.best_ask(), (0.00044, 100))
+        self.assertRaises(ValueError, cache.apply, side='buy', price='0.0004', delta='-1001')
+        self.assertRaises(ValueError, cache.apply, side='both', price='0.0004', delta='1')
+        self.assertIsNone(OrderBookCache(book={'buys': [], 'sells': []}).top_of_book()['mid'])
+
+    def test_namespace_top_of_book(self):
+        order_books = OrderBooksNamespace()
+        order_books.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(book)),
+                            'book': copy.deepcopy(book)})
+        order_books.on_updates({
+            'room': room,
+            'digest': sha1_hash_digest(stringify_message(updated_book)),
+            'events': [{'side': 'buy', 'price': '0.0004', 'delta': '500'},
+                       {'side': 'sell', 'price': '0.00043', 'delta': '-500'}]
+        })
+        self.assertEqual(order_books.order_book['SWTH_NEO']['book'], updated_book)
+        top_of_book = order_books.top_of_book['SWTH_NEO']
+        self.assertEqual(top_of_book.best_ask(), (0.00045, 3000))
+        self.assertEqual(top_of_book.depth(side='buy', levels=2), [(0.00041, 2000, 2000), (0.0004, 1500, 3500)])
+        self.assertEqual(top_of_book.top_of_book()['bid'], 0.00041)
+
+    def test_misfitting_update_keeps_cache(self):
+        order_books = OrderBooksNamespace()
+        order_books._set_client(ReplayClient())
+        order_books.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(book)),
+                            'book': copy.deepcopy(book)})
+        order_books.on_updates({
+            'room': room,
+            'digest': sha1_hash_digest(stringify_message(updated_book)),
+            'events': [{'side': 'sell', 'price': '0.00043', 'delta': '-500'},
+                       {'side': 'buy', 'price': '0.0003', 'delta': '-100'}]
+        })
+        self.assertEqual(order_books.top_of_book['SWTH_NEO'].best_ask(), (0.00043, 500))
+
+    def test_concurrent_readers(self):
+        cache = OrderBookCache(book=book)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                try:
+                    cache.top_of_book()
+                    cache.depth(side='sell', levels=3)
+                except Exception as exception:
+                    errors.append(exception)
+                    return
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for update in range(20000):
+            cache.apply_events([{'side': 'sell', 'price': '0.00042', 'delta': '100'},
+                                {'side': 'sell', 'price': '0.00042', 'delta': '-100'}])
+        done.set()
+        reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.best_ask(), (0.00043, 500))
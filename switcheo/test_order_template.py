@@ -0,0 +1,82 @@
+import unittest
+from switcheo.neo.signatures import sign_create_order
+from switcheo.neo.utils import open_wallet, to_neo_asset_amount
+from switcheo.order_template import OrderTemplate
+from switcheo.tracing import Tracer
+from switcheo.utils import stringify_message
+
+
+kp = open_wallet('70f642894bc73dc50013be6d1dbe198f43237eaf9458d193c0b416c5385d9717')
+testnet_scripthash = 'fea2b883725ef2d194c9060f606cd0a0468a2c59'
+
+
+class StubClient(object):
+
+    def __init__(self):
+        self.blockchain = 'neo'
+        self.contract_hash = 'a195c1549e7da61b8da315765a790ac7e7633b82'
+        self.blockchain_amount = {'neo': to_neo_asset_amount}
+        self.tracer = Tracer()
+        self.posted = []
+
+    def signed_post(self, span_name, sign_function, params, private_key, path):
+        with self.tracer.span(span_name + '.sign'):
+            api_params = sign_function(params, private_key)
+        self.posted.append((path, api_params))
+        return dict(api_params, id='order-{}'.format(len(self.posted)))
+
+    def execute_order(self, order_params, private_key):
+        return {'id': order_params['id'], 'status': 'processed'}
+
+
+class TestOrderTemplate(unittest.TestCase):
+
+    def test_sign_create_order(self):
+        template = OrderTemplate(client=StubClient(), pair='SWTH_NEO', side='buy', private_key=kp)
+        self.assertEqual(template.address, testnet_scripthash)
+        for price, quantity, timestamp in [(0.0002, 100, 1542091535839), (0.00001, 0.5, 1), (123.456789, 250000, 0)]:
+            order_params = template.order_params(price=price, quantity=quantity, timestamp=timestamp)
+            self.assertEqual(order_params, {
+                'blockchain': 'neo',
+                'pair': 'SWTH_NEO',
+                'side': 'buy',
+                'price': '{:.8f}'.format(price),
+                'quantity': str(to_neo_asset_amount(quantity)),
+                'use_native_tokens': True,
+                'order_type': 'limit',
+                'timestamp': timestamp,
+                'contract_hash': 'a195c1549e7da61b8da315765a790ac7e7633b82'
+            })
+            self.assertEqual(template.message(order_params), stringify_message(order_params))
+            self.assertEqual(template.sign_create_order(order_params), sign_create_order(order_params, kp))
+
+    def test_presign(self):
+        template = OrderTemplate(client=StubClient(), pair='SWTH_NEO', side='sell', private_key=kp,
+                                 use_native_token=False)
+        signed_orders = template.presign(quotes=[(0.0004, 1000), (0.00041, 2000)], timestamp=1542091535839)
+        self.assertEqual([signed_order['price'] for signed_order in signed_orders], ['0.00040000', '0.00041000'])
+        self.assertEqual({signed_order['timestamp'] for signed_order in signed_orders}, {1542091535839})
+        for signed_order in signed_orders:
+            order_params = {key: value for key, value in signed_order.items() if key not in ['address', 'signature']}
+            self.assertEqual(signed_order, sign_create_order(order_params, kp))
+
+    def test_order(self):
+        client = StubClient()
+        template = OrderTemplate(client=client, pair='SWTH_NEO', side='buy', private_key=kp)
+        self.assertEqual(template.order(price=0.0002, quantity=100), {'id': 'order-1', 'status': 'processed'})
+        path, api_params = client.posted[0]
+        self.assertEqual(path, '/orders')
+        self.assertEqual(api_params['address'], testnet_scripthash)
+        spans = {span['name']: span for span in client.tracer.to_zipkin()}
+        self.assertEqual(sorted(spans), ['create_order.sign', 'order'])
+        self.assertEqual(spans['order']['tags']['order_id'], 'order-1')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            OrderTemplate(client=StubClient(), pair='SWTH_NEO', side='hold', private_key=kp)
+        with self.assertRaises(ValueError):
+            OrderTemplate(client=StubClient(), pair='SWTH_NEO', side='buy', private_key=kp, order_type='market')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -167,6 +167,19 @@ class TestPublicClient(unittest.TestCase):
             switcheo_orders_set.add(order['want_asset_id'])
         self.assertTrue(switcheo_orders_set.issubset(switcheo_orders_list_set))
 
+    def test_iter_orders(self):
+        testnet_scripthash = 'fea2b883725ef2d194c9060f606cd0a0468a2c59'
+        all_orders = pc.get_orders(address=testnet_scripthash, limit=200)
+        iter_orders = list(pc.iter_orders(address=testnet_scripthash, limit=20))
+        self.assertGreaterEqual(len(iter_orders), len(all_orders))
+        iter_order_ids = [order['id'] for order in iter_orders]
+        self.assertEqual(len(iter_order_ids), len(set(iter_order_ids)))
+        self.assertEqual(iter_order_ids[:len(all_orders)], [order['id'] for order in all_orders])
+        with self.assertRaises(ValueError):
+            next(pc.iter_orders(address=testnet_scripthash, limit=0))
+        with self.assertRaises(ValueError):
+            pc.get_orders(address=testnet_scripthash, limit=201)
+
     def test_get_balance(self):
         balance_dict = {
             'confirming': {},
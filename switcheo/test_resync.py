@@ -0,0 +1,174 @@
+import unittest
+import copy
+import time
+from switcheo.resync import ResyncManager, updates_after_snapshot, room_awaiting_snapshot, room_live, room_resyncing
+from switcheo.stream_recorder import ReplayClient
+from switcheo.streaming_client import OrderBooksNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+
+
+def book_digest(book):
+    return sha1_hash_digest(stringify_message(book))
+
+
+book = {
+    'buys': [{'amount': '1000', 'price': '0.0004'}],
+    'sells': [{'amount': '500', 'price': '0.00043'}]
+}
+first_book = {
+    'buys': [{'amount': '1500', 'price': '0.0004'}],
+    'sells': [{'amount': '500', 'price': '0.00043'}]
+}
+second_book = {
+    'buys': [{'amount': '1500', 'price': '0.0004'}],
+    'sells': [{'amount': '700', 'price': '0.00043'}]
+}
+first_update = {'room': room, 'digest': book_digest(first_book),
+                'events': [{'side': 'buy', 'price': '0.0004', 'delta': '500'}]}
+second_update = {'room': room, 'digest': book_digest(second_book),
+                 'events': [{'side': 'sell', 'price': '0.00043', 'delta': '200'}]}
+
+
+class TestResyncManager(unittest.TestCase):
+
+    def test_backoff_and_dedupe(self):
+        scheduled = []
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        resync = ResyncManager(namespace=order_books, backoff=1.0, backoff_max=3.0,
+                               schedule=lambda delay, callback: (scheduled.append(delay), callback()))
+        resync.complete('SWTH_NEO')
+        self.assertTrue(resync.request(room))
+        self.assertFalse(resync.request(room))
+        self.assertTrue(resync.buffer('SWTH_NEO', first_update))
+        self.assertEqual(resync.complete('SWTH_NEO'), [first_update])
+        self.assertFalse(resync.buffer('SWTH_NEO', first_update))
+        for attempt in range(4):
+            resync.request(room)
+            resync.complete('SWTH_NEO')
+        self.assertEqual(scheduled, [0, 1.0, 2.0, 3.0, 3.0])
+        resync.confirm('SWTH_NEO')
+        self.assertEqual(resync.delay('SWTH_NEO'), 0)
+        self.assertEqual(resync.stats()['SWTH_NEO'], {'state': room_live, 'resyncs': 5, 'dropped': 1,
+                                                          'attempts': 0, 'pending': False})
+        self.assertEqual([event for namespace, event, data in client.emitted], ['leave', 'join'] * 5)
+        resync.forget('SWTH_NEO')
+        self.assertEqual(resync.stats(), {})
+
+    def test_updates_after_snapshot(self):
+        self.assertEqual(updates_after_snapshot([first_update, second_update], first_update['digest']),
+                         [second_update])
+        self.assertEqual(updates_after_snapshot([first_update, second_update], book_digest(book)), [])
+        self.assertEqual(updates_after_snapshot([first_update, second_update], second_update['digest']), [])
+
+    def test_room_states(self):
+        resync = ResyncManager(namespace=OrderBooksNamespace(), schedule=lambda delay, callback: None, max_buffered=2)
+        self.assertEqual(resync.state('SWTH_NEO'), room_awaiting_snapshot)
+        for update in [first_update, second_update, second_update]:
+            self.assertTrue(resync.buffer('SWTH_NEO', update))
+        self.assertEqual(resync.complete('SWTH_NEO'), [second_update, second_update])
+        self.assertEqual(resync.state('SWTH_NEO'), room_live)
+        resync.request(room)
+        self.assertEqual(resync.state('SWTH_NEO'), room_resyncing)
+        resync.forget('SWTH_NEO')
+        self.assertEqual(resync.state('SWTH_NEO'), room_awaiting_snapshot)
+
+    def test_updates_before_snapshot(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        order_books.on_updates(copy.deepcopy(first_update))
+        order_books.on_updates(copy.deepcopy(second_update))
+        self.assertNotIn('SWTH_NEO', order_books.order_book)
+        order_books.on_all({'room': room, 'digest': book_digest(first_book), 'book': copy.deepcopy(first_book)})
+        self.assertEqual(order_books.order_book['SWTH_NEO']['book'], second_book)
+        self.assertEqual(client.emitted, [])
+
+    def test_misfitting_update(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        order_books.on_all({'room': room, 'digest': book_digest(book), 'book': copy.deepcopy(book)})
+        order_books.on_updates({'room': room, 'digest': book_digest(book),
+                                'events': [{'side': 'sell', 'price': '0.00043', 'delta': '-800'}]})
+        self.assertEqual([event for namespace, event, data in client.emitted], ['leave', 'join'])
+        self.assertEqual(order_books.resync.state('SWTH_NEO'), room_resyncing)
+        order_books.on_updates({'room': room, 'digest': book_digest(book),
+                                'events': [{'side': 'buy', 'price': '0.0003', 'delta': '-100'}]})
+        self.assertEqual(len(client.emitted), 2)
+
+    def test_namespace_resync(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        order_books.on_all({'room': room, 'digest': book_digest(book), 'book': copy.deepcopy(book)})
+        for mismatch in range(5):
+            order_books.on_updates(dict(first_update, digest='mismatch'))
+        self.assertEqual([event for namespace, event, data in client.emitted], ['leave', 'join'])
+        self.assertEqual(order_books.resync.stats()['SWTH_NEO']['dropped'], 0)
+        self.assertTrue(order_books.resync.is_resyncing('SWTH_NEO'))
+        order_books.on_updates(copy.deepcopy(first_update))
+        order_books.on_updates(copy.deepcopy(second_update))
+        order_books.on_all({'room': room, 'digest': book_digest(first_book), 'book': copy.deepcopy(first_book)})
+        self.assertFalse(order_books.resync.is_resyncing('SWTH_NEO'))
+        self.assertEqual(order_books.order_book['SWTH_NEO']['book'], second_book)
+        self.assertEqual(order_books.resync.stats()['SWTH_NEO']['attempts'], 0)
+
+    def test_stale_updates_after_backoff(self):
+        scheduled = []
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        order_books.resync = ResyncManager(namespace=order_books,
+                                           schedule=lambda delay, callback: scheduled.append(callback))
+        order_books.on_all({'room': room, 'digest': book_digest(book), 'book': copy.deepcopy(book)})
+        order_books.on_updates(dict(first_update, digest='mismatch'))
+        order_books.on_updates(dict(first_update, digest='stale'))
+        order_books.on_updates(dict(second_update, digest='stale'))
+        scheduled.pop()()
+        order_books.on_all({'room': room, 'digest': book_digest(second_book), 'book': copy.deepcopy(second_book)})
+        self.assertEqual(order_books.order_book['SWTH_NEO']['book'], second_book)
+        self.assertEqual(order_books.resync.stats()['SWTH_NEO']['resyncs'], 1)
+        self.assertEqual(order_books.resync.state('SWTH_NEO'), room_live)
+
+        order_books.resync.request(room)
+        for update in [first_update, dict(second_update, digest='stale'), dict(second_update, digest='stale')]:
+            order_books.on_updates(copy.deepcopy(update))
+        order_books.on_all({'room': room, 'digest': book_digest(first_book), 'book': copy.deepcopy(first_book)})
+        self.assertEqual(order_books.resync.stats()['SWTH_NEO']['resyncs'], 3)
+        self.assertEqual(order_books.resync.complete('SWTH_NEO'), [])
+
+    def test_evict_while_resyncing(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace(max_pairs=1)
+        order_books._set_client(client)
+        order_books.resync = ResyncManager(namespace=order_books, backoff=0.05)
+        order_books.on_all({'room': room, 'digest': book_digest(book), 'book': copy.deepcopy(book)})
+        order_books.on_updates(dict(first_update, digest='mismatch'))
+        order_books.resync.complete('SWTH_NEO')
+        order_books.on_updates(dict(first_update, digest='mismatch'))
+        self.assertTrue(order_books.resync.is_resyncing('SWTH_NEO'))
+        other_room = dict(room, pair='SWTH_ETH')
+        order_books.on_all({'room': other_room, 'digest': book_digest(book), 'book': copy.deepcopy(book)})
+        self.assertEqual(client.emitted[-1], ('/v2/books', 'leave', room))
+        time.sleep(0.2)
+        self.assertEqual([event for namespace, event, data in client.emitted], ['leave', 'join', 'leave'])
+        self.assertEqual(order_books.resync.stats(), {})
+
+    def test_forget_before_scheduled_rejoin(self):
+        scheduled = []
+        client = ReplayClient()
+        order_books = OrderBooksNamespace()
+        order_books._set_client(client)
+        resync = ResyncManager(namespace=order_books, schedule=lambda delay, callback: scheduled.append(callback))
+        resync.request(room)
+        resync.forget('SWTH_NEO')
+        scheduled[0]()
+        resync.request(room)
+        resync.complete('SWTH_NEO')
+        scheduled[1]()
+        self.assertEqual(client.emitted, [])
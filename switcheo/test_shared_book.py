@@ -0,0 +1,116 @@
+import unittest
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from switcheo.async_streaming_client import AsyncStreamingClient
+from switcheo.shared_book import SharedBookPublisher, SharedBookReader
+from switcheo.stream_recorder import ReplayClient
+from switcheo.streaming_client import OrderBooksNamespace
+from switcheo.test_async_streaming_client import FakeAsyncSocketIO
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1000', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}, {'amount': '500', 'price': '0.00043'}]
+}
+updated_book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1500', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}]
+}
+
+
+class TestSharedBook(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.book_path = os.path.join(self.path, 'books')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_publish_and_read(self):
+        streaming_client = AsyncStreamingClient(socket_io=FakeAsyncSocketIO())
+        publisher = streaming_client.publish_books(path=self.book_path, max_pairs=2, levels=1)
+        order_books = streaming_client.order_books
+        order_books.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(book)),
+                            'book': copy.deepcopy(book)})
+        reader = SharedBookReader(path=self.book_path)
+        self.assertEqual(reader.pairs(), ['SWTH_NEO'])
+        self.assertEqual(reader.read('SWTH_NEO')['bids'], [(0.00041, 2000)])
+        self.assertEqual(reader.read('SWTH_NEO')['asks'], [(0.00043, 500)])
+        sequence = reader.begin('SWTH_NEO')
+        views = reader.views('SWTH_NEO')
+        self.assertEqual((views['bid_count'], views['ask_prices'][0]), (1, 0.00043))
+        order_books.on_updates({
+            'room': room,
+            'digest': sha1_hash_digest(stringify_message(updated_book)),
+            'events': [{'side': 'buy', 'price': '0.0004', 'delta': '500'},
+                       {'side': 'sell', 'price': '0.00043', 'delta': '-500'}]
+        })
+        self.assertFalse(reader.validate('SWTH_NEO', sequence))
+        self.assertEqual(reader.read('SWTH_NEO')['asks'], [(0.00045, 3000)])
+        self.assertEqual(reader.read('SWTH_NEO')['sequence'], 4)
+        views = None
+        self.assertRaises(ValueError, reader.read, 'SWTH_ETH')
+        output = subprocess.check_output([sys.executable, '-c', (
+            'from switcheo.shared_book import SharedBookReader; '
+            'print(SharedBookReader(path={!r}).read("SWTH_NEO")["bids"])').format(self.book_path)])
+        self.assertEqual(output.strip(), b'[(0.00041, 2000)]')
+        reader.close()
+        publisher.close()
+
+    def test_restart_publisher(self):
+        class TopOfBook(object):
+            def depth(self, side, levels):
+                return [(0.0004, 1000)] if side == 'buy' else [(0.00045, 3000)]
+
+        publisher = SharedBookPublisher(path=self.book_path, max_pairs=2, levels=1)
+        publisher.publish('SWTH_NEO', TopOfBook())
+        publisher.close()
+        reader = SharedBookReader(path=self.book_path)
+        self.assertEqual(reader.read('SWTH_NEO')['sequence'], 2)
+        publisher = SharedBookPublisher(path=self.book_path, max_pairs=2, levels=1)
+        publisher.publish('SWTH_ETH', TopOfBook())
+        publisher.publish('SWTH_NEO', TopOfBook())
+        self.assertEqual(reader.pairs(), ['SWTH_NEO', 'SWTH_ETH'])
+        self.assertEqual(reader.read('SWTH_NEO')['sequence'], 4)
+        publisher.close()
+        publisher = SharedBookPublisher(path=self.book_path, max_pairs=4, levels=1)
+        self.assertEqual(reader.read('SWTH_NEO')['sequence'], 4)
+        new_reader = SharedBookReader(path=self.book_path)
+        self.assertEqual(new_reader.pairs(), [])
+        self.assertEqual(os.listdir(self.path), ['books'])
+        new_reader.close()
+        reader.close()
+        publisher.close()
+
+    def test_evicted_pairs(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace(max_pairs=2)
+        order_books._set_client(client)
+        publisher = SharedBookPublisher(path=self.book_path, max_pairs=2, levels=1)
+        publisher.attach(order_books)
+        reader = SharedBookReader(path=self.book_path)
+        pairs = ['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH', 'GAS_NEO']
+        for pair in pairs:
+            order_books.on_all({'room': dict(room, pair=pair), 'digest': sha1_hash_digest(stringify_message(book)),
+                                'book': copy.deepcopy(book)})
+            self.assertEqual(reader.read(pair)['bids'], [(0.00041, 2000)])
+        self.assertEqual(publisher.published, 4)
+        self.assertEqual(sorted(reader.pairs()), ['GAS_NEO', 'NEO_ETH'])
+        self.assertRaises(ValueError, reader.read, 'SWTH_NEO')
+        self.assertEqual(reader.read('GAS_NEO')['sequence'], 6)
+
+        unbounded_books = OrderBooksNamespace()
+        publisher.attach(unbounded_books)
+        with self.assertLogs('switcheo.shared_book'):
+            unbounded_books.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(book)),
+                                    'book': copy.deepcopy(book)})
+        self.assertIn('SWTH_NEO', unbounded_books.order_book)
+        reader.close()
+        publisher.close()
@@ -0,0 +1,76 @@
+import unittest
+import copy
+from switcheo.stream_memory import CompactBook, CompactTrades, deep_sizeof
+from switcheo.stream_recorder import ReplayClient
+from switcheo.streaming_client import OrderBooksNamespace, TradeEventsNamespace
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+def room(pair):
+    return {'pair': pair, 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+
+
+def digest(message):
+    return sha1_hash_digest(stringify_message(message))
+
+
+book = {
+    'buys': [{'amount': str(1000 + level), 'price': '0.000{}'.format(400 - level)} for level in range(50)],
+    'sells': [{'amount': str(2000 + level), 'price': '0.000{}'.format(500 - level)} for level in range(50)]
+}
+updated_book = copy.deepcopy(book)
+updated_book['buys'][0]['amount'] = '1500'
+del updated_book['sells'][-1]
+updated_book['sells'].insert(0, {'amount': '700', 'price': '0.000501'})
+book_update = {
+    'room': room('SWTH_NEO'),
+    'digest': digest(updated_book),
+    'events': [{'side': 'buy', 'price': '0.000400', 'delta': '500'},
+               {'side': 'sell', 'price': '0.000451', 'delta': '-2049'},
+               {'side': 'sell', 'price': '0.000501', 'delta': '700'}]
+}
+
+
+class TestStreamMemory(unittest.TestCase):
+
+    def test_compact_book(self):
+        compact_book = CompactBook(book=book)
+        self.assertEqual(compact_book.to_dict(), book)
+        self.assertRaises(ValueError, compact_book.apply, side='buy', price='0.000400', delta='-5000')
+        self.assertRaises(ValueError, compact_book.apply, side='buy', price='0.1', delta='-1')
+        self.assertLess(deep_sizeof(compact_book), deep_sizeof(book) / 2)
+
+    def test_compact_namespaces(self):
+        order_books = OrderBooksNamespace(compact=True)
+        order_books.on_all({'room': room('SWTH_NEO'), 'digest': digest(book), 'book': copy.deepcopy(book)})
+        order_books.on_updates(copy.deepcopy(book_update))
+        self.assertEqual(order_books.resync.stats(), {})
+        self.assertEqual(order_books.get_book('SWTH_NEO'), updated_book)
+        self.assertEqual(order_books.top_of_book['SWTH_NEO'].best_ask()[0], 0.000452)
+        raw_books = OrderBooksNamespace()
+        raw_books.on_all({'room': room('SWTH_NEO'), 'digest': digest(book), 'book': copy.deepcopy(book)})
+        self.assertLess(order_books.memory_report()['SWTH_NEO']['book'],
+                        raw_books.memory_report()['SWTH_NEO']['book'] / 2)
+
+        trades = [{'id': str(trade_id), 'fill_amount': 400, 'take_amount': 1000000, 'is_buy': True,
+                   'event_time': '2018-08-02T00:00:20.000Z'} for trade_id in range(3)]
+        trade_events = TradeEventsNamespace(compact=True)
+        trade_events.on_all({'room': room('SWTH_NEO'), 'digest': digest(trades), 'trades': trades})
+        new_trade = dict(trades[0], id='new')
+        trade_events.on_updates({'room': room('SWTH_NEO'), 'digest': digest([new_trade] + trades[0:2]),
+                                 'events': [new_trade], 'limit': 4})
+        self.assertEqual(trade_events.get_trades('SWTH_NEO'), [new_trade] + trades[0:2])
+        self.assertEqual(trade_events.resync.stats(), {})
+        self.assertEqual(len(CompactTrades(trades=trades).keys), 1)
+
+    def test_max_pairs(self):
+        client = ReplayClient()
+        order_books = OrderBooksNamespace(max_pairs=2)
+        order_books._set_client(client)
+        for pair in ['SWTH_NEO', 'SWTH_ETH', 'NEO_ETH']:
+            order_books.on_all({'room': room(pair), 'digest': digest(book), 'book': copy.deepcopy(book)})
+        self.assertEqual(sorted(order_books.order_book), ['NEO_ETH', 'SWTH_ETH'])
+        self.assertEqual(sorted(order_books.memory_report()), ['NEO_ETH', 'SWTH_ETH'])
+        self.assertEqual(client.emitted, [('/v2/books', 'leave', room('SWTH_NEO'))])
+        order_books.leave(room('SWTH_ETH'))
+        self.assertNotIn('SWTH_ETH', order_books.top_of_book)
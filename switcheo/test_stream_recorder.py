@@ -0,0 +1,73 @@
+import unittest
+import copy
+import os
+import shutil
+import tempfile
+from switcheo.streaming_client import OrderBooksNamespace, TradeEventsNamespace
+from switcheo.stream_recorder import StreamRecorder, StreamReplayer
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1000', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}, {'amount': '500', 'price': '0.00043'}]
+}
+updated_book = {
+    'buys': [{'amount': '2000', 'price': '0.00041'}, {'amount': '1500', 'price': '0.0004'}],
+    'sells': [{'amount': '3000', 'price': '0.00045'}]
+}
+book_snapshot = {'room': room, 'digest': sha1_hash_digest(stringify_message(book)), 'book': book}
+book_update = {
+    'room': room,
+    'digest': sha1_hash_digest(stringify_message(updated_book)),
+    'events': [{'side': 'buy', 'price': '0.0004', 'delta': '500'}, {'side': 'sell', 'price': '0.00043', 'delta': '-500'}]
+}
+
+
+class TestStreamRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.path, 'stream.log.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_record_replay(self):
+        recorder = StreamRecorder(path=self.log_path)
+        order_books = recorder.attach(OrderBooksNamespace())
+        order_books.trigger_event('all', copy.deepcopy(book_snapshot))
+        order_books.trigger_event('updates', copy.deepcopy(book_update))
+        recorder.attach(TradeEventsNamespace()).trigger_event('join')
+        recorder.close()
+        self.assertEqual(recorder.frames, 3)
+        self.assertEqual(order_books.order_book['SWTH_NEO']['book'], updated_book)
+
+        replayer = StreamReplayer(path=self.log_path)
+        self.assertEqual([frame[1:3] for frame in replayer.frames()],
+                         [('/v2/books', 'all'), ('/v2/books', 'updates'), ('/v2/trades', 'join')])
+        replayed_books = OrderBooksNamespace()
+        self.assertEqual(replayer.replay(namespaces=[replayed_books]), 2)
+        self.assertEqual(replayed_books.order_book['SWTH_NEO']['book'], updated_book)
+        self.assertEqual(replayer.client.emitted, [])
+
+        recorder = StreamRecorder(path=self.log_path)
+        recorder.record(namespace='/v2/books', event='updates', args=[dict(book_update, digest='mismatch')])
+        recorder.close()
+        replayed_books = OrderBooksNamespace()
+        self.assertEqual(replayer.replay(namespaces=[replayed_books], speed=1000.0), 3)
+        self.assertEqual([event for namespace, event, data in replayer.client.emitted], ['leave', 'join'])
+
+    def test_truncated_log(self):
+        recorder = StreamRecorder(path=self.log_path, flush_every=10)
+        for receive_time in range(100):
+            recorder.record(namespace='/v2/trades', event='join', args=[], receive_time=receive_time)
+        recorder.close()
+        with open(self.log_path, 'rb') as log:
+            data = log.read()
+        with open(self.log_path, 'wb') as log:
+            log.write(data[:len(data) // 2])
+        receive_times = [frame[0] for frame in StreamReplayer(path=self.log_path).frames()]
+        self.assertTrue(0 < len(receive_times) < 100)
+        self.assertEqual(receive_times, list(range(len(receive_times))))
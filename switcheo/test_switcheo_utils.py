@@ -1,6 +1,11 @@
 import unittest
+import json
+import random
+import struct
+from switcheo.mock_server import MockMarket, MockSwitcheoServer
 from switcheo.utils import get_epoch_milliseconds, num2hexstring, num2varint, reverse_hex,\
-    stringify_message, current_contract_hash, Request
+    stringify_message, current_contract_hash, Request, json_stringify_message, orjson_stringify_message,\
+    json_encoders, set_json_encoder, orjson, json_decoders, SwitcheoApiException, iter_json_array
 from switcheo.public_client import PublicClient
 
 
@@ -38,6 +43,132 @@ class TestSwitcheoUtils(unittest.TestCase):
         stringify_msg = '{"age":27,"name":"John Smith","siblings":["Jane","Joe"]}'
         self.assertEqual(stringify_message(json_msg), stringify_msg)
 
+    def json_corpus(self):
+        market = MockMarket(pairs={'SWTH_NEO': 0.0004, 'ETH_WBTC': 0.03}, levels=50, seed=7)
+        corpus = [
+            {'blockchain': 'neo', 'pair': 'SWTH_NEO', 'side': 'buy', 'price': '0.00040000', 'quantity': '100000000',
+             'use_native_tokens': True, 'order_type': 'limit', 'timestamp': 1533476315123,
+             'contract_hash': 'a195c1549e7da61b8da315765a790ac7e7633b82'},
+            {'blockchain': 'eth', 'pair': 'ETH_WBTC', 'side': 'sell', 'price': None, 'offer_amount': '10',
+             'worst_acceptable_price': 0.031, 'order_type': 'market'},
+            {}, [], '', 0, -1, True, False, None, 2 ** 63 - 1, -2 ** 63, 2 ** 64, 10 ** 30,
+            0.0, -0.0, 5.0, 0.1 + 0.2, 1e-05, 0.00001234, 1e15, 1e16, 123456789012345.6, 1e22, 1.5e300, 5e-324,
+            float('nan'), float('inf'), float('-inf'), [1e-07, {'a': 0.0001, 'b': [1e+16, 3.0]}],
+            'caf\u00e9', {'\u00e9': 1, 'e': 2}, '\u4e2d\u6587', '\U0001f600', '\x7f', '\x00\x01\x1f"\\/\b\f\n\r\t',
+            'null', {'text': 'a,1.50]'}, {'z': 1, 'a': {'y': [1, 2, {'c': 'd', 'b': 'e'}]}}, (1, 'two', 3.5),
+            {'key with spaces': 'value', 'KEY': 'upper', 'key': 'lower', '_': 'underscore', '1': 'digit'}
+        ]
+        for pair in ['SWTH_NEO', 'ETH_WBTC']:
+            corpus.append(market.book_snapshot(pair)['book'])
+            corpus.append(market.trades_snapshot(pair)['trades'])
+            for update in range(20):
+                corpus.append(market.book_update(pair)['events'])
+                corpus.append(market.trade_update(pair)['events'])
+        generator = random.Random(7)
+        for number in range(2000):
+            value = struct.unpack('<d', struct.pack('<Q', generator.getrandbits(64)))[0]
+            corpus.append({'value': value, 'scaled': generator.random() * 10 ** generator.randint(-12, 20)})
+        return corpus
+
+    def test_json_encoders(self):
+        for message in self.json_corpus():
+            self.assertEqual(stringify_message(message), json_stringify_message(message))
+            if orjson is not None:
+                self.assertEqual(orjson_stringify_message(message), json_stringify_message(message))
+        self.assertRaises(TypeError, stringify_message, {1: 'a', 'b': 2})
+        self.assertRaises(TypeError, stringify_message, {'a': object()})
+        self.assertRaises(ValueError, set_json_encoder, 'simplejson')
+        encoder = set_json_encoder('json')
+        try:
+            self.assertIs(encoder, json_encoders['json'])
+            self.assertEqual(stringify_message({'b': 1, 'a': 0.00001}), '{"a":1e-05,"b":1}')
+        finally:
+            set_json_encoder(json_encoders.get('orjson', json_stringify_message))
+
+    def test_json_decoders(self):
+        documents = [json_stringify_message(message).encode() for message in self.json_corpus()
+                     if message == message and message not in [float('inf'), float('-inf')]]
+        documents += [b'NaN', b'[Infinity,-Infinity]', b'1e400', b'"\\ud800"', b' {"a": [1, 2.5, "\\u00e9"]} ',
+                      b'{"amount":123456789012345678901234567890}', b'{"amount":-9223372036854775809}',
+                      b'{"a":1,"a":2}']
+        for document in documents:
+            expected = json.loads(document)
+            for decoder in json_decoders.values():
+                decoded = decoder(document)
+                self.assertEqual(repr(decoded), repr(expected))
+        for decoder in json_decoders.values():
+            self.assertRaises(ValueError, decoder, b'{"a":')
+        self.assertEqual(type(json_decoders.get('orjson', json.loads)(b'{"a":18446744073709551616}')['a']), int)
+
+    def test_request_decoding(self):
+        server = MockSwitcheoServer(seed=1).start()
+        try:
+            request = Request(api_url=server.url, json_decoder='json')
+            self.assertIs(request.json_decoder, json.loads)
+            self.assertRaises(ValueError, Request, api_url=server.url, json_decoder='simplejson')
+            content = request.get(path='/trades', params={'pair': 'SWTH_NEO', 'limit': 5}, raw=True)
+            self.assertIsInstance(content, bytes)
+            self.assertEqual(json.loads(content), request.get(path='/trades', params={'pair': 'SWTH_NEO', 'limit': 5}))
+            decoded = []
+
+            def json_decoder(content):
+                decoded.append(content)
+                return json.loads(content)
+            request.set_json_decoder(json_decoder)
+            server.error_rate = 1.0
+            with self.assertRaises(SwitcheoApiException) as context:
+                request.post(path='/orders', json_data={})
+            self.assertEqual(len(decoded), 1)
+            self.assertEqual(str(context.exception), json.loads(decoded[0]).get('error_message'))
+        finally:
+            server.stop()
+
+    def test_iter_json_array(self):
+        elements = [{'id': 'caf\u00e9', 'amount': 12345, 'nested': [1.5, None, True]}, 7, -0.25, 'text ] , [', [],
+                    {}, 10 ** 20]
+        document = json.dumps(elements, indent=1, ensure_ascii=False).encode('utf-8')
+        for size in [1, 2, 3, 7, 64, len(document)]:
+            chunks = [document[index:index + size] for index in range(0, len(document), size)]
+            self.assertEqual(list(iter_json_array(chunks)), elements)
+        self.assertEqual(list(iter_json_array([b' [ ', b'12', b'34 ]'])), [1234])
+        self.assertEqual(list(iter_json_array([b'[]'])), [])
+        self.assertEqual(list(iter_json_array([b'[1]', b' \n'])), [1])
+        for document in [b'{"a": 1}', b'[1, 2', b'[1 2]', b'[{"a": ]', b'', b'[1,]', b'[1] 2', b'[,]']:
+            with self.assertRaises(ValueError):
+                list(iter_json_array([document]))
+        large_element = {'text': 'x' * 500000}
+        document = json.dumps([large_element, 1]).encode('utf-8')
+        chunks = [document[index:index + 64] for index in range(0, len(document), 64)]
+        self.assertEqual(list(iter_json_array(chunks)), [large_element, 1])
+
+    def test_request_stream(self):
+        server = MockSwitcheoServer(market=MockMarket(pairs={'SWTH_NEO': 0.0004}, trade_limit=2000, seed=1),
+                                    seed=1).start()
+        try:
+            public_client = PublicClient(api_url=server.url)
+            events = []
+            public_client.request.add_hook(events.append)
+            trades = public_client.get_trades(pair='SWTH_NEO', limit=2000, stream=True)
+            self.assertEqual(events, [])
+            self.assertEqual([next(trades)] + list(trades), public_client.get_trades(pair='SWTH_NEO', limit=2000))
+            self.assertEqual(events[0]['path'], '/trades')
+            self.assertEqual(events[0]['response_bytes'], events[1]['response_bytes'])
+            self.assertIsNone(events[0]['error'])
+            offers = public_client.get_offers(pair='SWTH_NEO', stream=True)
+            self.assertEqual(next(offers), public_client.get_offers(pair='SWTH_NEO')[0])
+            offers.close()
+            self.assertIsNone(events[-1]['error'])
+            self.assertRaises(ValueError, public_client.get_trades, pair='SWTH_NEO', columnar=True, stream=True)
+            table = public_client.get_trades(pair='SWTH_NEO', limit=2000, columnar=True)
+            trades = public_client.get_trades(pair='SWTH_NEO', limit=2000)
+            self.assertEqual(table['id'], [trade['id'] for trade in trades])
+            self.assertEqual(events[-1]['path'], '/trades')
+            server.error_rate = 1.0
+            self.assertRaises(Exception, list, public_client.get_trades(pair='SWTH_NEO', stream=True))
+            self.assertIsNotNone(events[-1]['error'])
+        finally:
+            server.stop()
+
     def test_current_contract_hash(self):
         pc = PublicClient()
         expected_current_contract_dict = {
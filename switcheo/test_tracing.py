@@ -0,0 +1,115 @@
+import unittest
+import json
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from switcheo.tracing import Tracer, noop_span
+
+
+class TestTracing(unittest.TestCase):
+
+    def test_order_trace(self):
+        tracer = Tracer()
+        with tracer.span('order', tags={'pair': 'SWTH_NEO'}):
+            with tracer.span('create_order.sign'):
+                pass
+            with tracer.span('create_order.post') as span:
+                span.tag('id', 'order-1')
+            tracer.tag_trace('order_id', 'order-1')
+            with tracer.span('execute_order.sign'):
+                pass
+            with tracer.span('execute_order.post'):
+                tracer.tag_trace('fills', 2)
+        spans = {span['name']: span for span in tracer.to_zipkin()}
+        self.assertEqual(sorted(spans), ['create_order.post', 'create_order.sign', 'execute_order.post',
+                                         'execute_order.sign', 'order'])
+        root = spans['order']
+        self.assertNotIn('parentId', root)
+        self.assertEqual(root['tags'], {'pair': 'SWTH_NEO', 'order_id': 'order-1', 'fills': '2'})
+        self.assertEqual(root['localEndpoint'], {'serviceName': 'switcheo-python'})
+        for name in ['create_order.sign', 'create_order.post', 'execute_order.sign', 'execute_order.post']:
+            self.assertEqual(spans[name]['traceId'], root['traceId'])
+            self.assertEqual(spans[name]['parentId'], root['id'])
+            self.assertGreaterEqual(spans[name]['timestamp'], root['timestamp'])
+            self.assertLessEqual(spans[name]['duration'], root['duration'])
+        self.assertEqual(spans['create_order.post']['tags'], {'id': 'order-1'})
+        self.assertEqual(list(tracer.traces()), [root['traceId']])
+        self.assertEqual(len(tracer.to_zipkin(clear=True)), 5)
+        self.assertEqual(tracer.to_zipkin(), [])
+
+    def test_error_and_threads(self):
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span('withdrawal'):
+                raise ValueError('rejected')
+        self.assertEqual(tracer.to_zipkin()[0]['tags'], {'error': 'ValueError'})
+        with tracer.span('order'):
+            thread = threading.Thread(target=lambda: tracer.span('deposit').__enter__().__exit__(None, None, None))
+            thread.start()
+            thread.join()
+        traces = tracer.traces()
+        self.assertEqual(len(traces), 3)
+        self.assertIsNone(tracer.active())
+
+    def test_out_of_order_exit(self):
+        tracer = Tracer()
+        outer = tracer.span('order').__enter__()
+        inner = tracer.span('create_order.sign').__enter__()
+        outer.__exit__(None, None, None)
+        self.assertIs(tracer.active(), inner)
+        inner.__exit__(None, None, None)
+        self.assertIsNone(tracer.active())
+        with tracer.span('deposit') as span:
+            tracer.tag_trace('deposit_id', 'deposit-1')
+        self.assertIsNone(span.parent_id)
+        self.assertNotIn('deposit_id', outer.tags)
+
+    def test_disabled(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span('order') as span:
+            self.assertIs(span, noop_span)
+            span.tag('order_id', 'order-1')
+            tracer.tag_trace('fills', 1)
+        self.assertEqual(tracer.to_zipkin(), [])
+        self.assertEqual(tracer.report(url='http://127.0.0.1:1/api/v2/spans'), 0)
+
+    def test_report(self):
+        received = []
+
+        class CollectorHandler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                status = 202 if self.server.accepting else 500
+                if self.server.accepting:
+                    received.extend(json.loads(body.decode('utf-8')))
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        collector = HTTPServer(('127.0.0.1', 0), CollectorHandler)
+        collector.accepting = False
+        thread = threading.Thread(target=collector.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = 'http://127.0.0.1:{}/api/v2/spans'.format(collector.server_address[1])
+        try:
+            tracer = Tracer()
+            for name in ['order', 'deposit']:
+                with tracer.span(name):
+                    pass
+            with self.assertRaises(requests.exceptions.HTTPError):
+                tracer.report(url=url)
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                tracer.report(url='http://127.0.0.1:1/api/v2/spans')
+            self.assertEqual(len(tracer.to_zipkin()), 2)
+            collector.accepting = True
+            self.assertEqual(tracer.report(url=url), 2)
+            self.assertEqual(sorted(span['name'] for span in received), ['deposit', 'order'])
+            self.assertEqual(tracer.to_zipkin(), [])
+        finally:
+            collector.shutdown()
+            collector.server_close()
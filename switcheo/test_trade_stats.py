@@ -0,0 +1,70 @@
+import unittest
+import math
+import threading
+from switcheo.streaming_client import TradeEventsNamespace
+from switcheo.trade_stats import RollingWindow, TradeStats
+from switcheo.utils import stringify_message, sha1_hash_digest
+
+
+room = {'pair': 'SWTH_NEO', 'contractHash': 'a195c1549e7da61b8da315765a790ac7e7633b82'}
+
+
+class FakeTradeClient(object):
+
+    def get_trades(self, pair, start_time=None, end_time=None, limit=5000):
+        self.params = (pair, start_time, end_time, limit)
+        return [{'id': 'b', 'event_time': '2018-08-02T00:00:40.000Z', 'fill_amount': 450, 'take_amount': 1000000},
+                {'id': 'a', 'event_time': '2018-08-02T00:00:20.000Z', 'fill_amount': 400, 'take_amount': 1000000}]
+
+
+class TestTradeStats(unittest.TestCase):
+
+    def test_rolling_window(self):
+        window = RollingWindow(window_seconds=60, window_trades=3)
+        for event_time, price in [(0, 1.0), (10, 1.1), (20, 1.0), (30, 1.2)]:
+            window.add(event_time=event_time, price=price, volume=2.0 * price, quote_volume=2.0)
+        self.assertEqual(len(window), 3)
+        self.assertAlmostEqual(window.vwap(), 1.1)
+        returns = [math.log(1.1 / 1.0), math.log(1.0 / 1.1), math.log(1.2 / 1.0)]
+        mean = sum(returns) / 3
+        self.assertAlmostEqual(window.volatility(), math.sqrt(sum((r - mean) ** 2 for r in returns) / 2))
+        window.expire(now=85)
+        self.assertEqual(window.stats()['trades'], 1)
+        self.assertIsNone(window.volatility())
+        window.expire(now=200)
+        self.assertEqual((window.vwap(), window.volume), (None, 0.0))
+        self.assertRaises(ValueError, RollingWindow)
+
+    def test_backfill_and_stream(self):
+        client = FakeTradeClient()
+        trade_stats = TradeStats(window_seconds=300)
+        trade_stats.backfill(client=client, pair='SWTH_NEO', now=1533168060)
+        self.assertEqual(client.params, ('SWTH_NEO', 1533167760, 1533168060, 5000))
+        trade_events = trade_stats.attach(TradeEventsNamespace())
+        trades = [{'id': 'c', 'event_time': '2018-08-02T00:01:10.000Z', 'fill_amount': 500, 'take_amount': 1000000},
+                  {'id': 'b', 'event_time': '2018-08-02T00:00:40.000Z', 'fill_amount': 450, 'take_amount': 1000000}]
+        trade_events.on_all({'room': room, 'digest': sha1_hash_digest(stringify_message(trades)), 'trades': trades})
+        stats = trade_stats.stats(pair='SWTH_NEO')
+        self.assertEqual((stats['trades'], stats['volume'], stats['quote_volume']), (3, 1350.0, 3000000.0))
+        self.assertAlmostEqual(stats['vwap'], 0.00045)
+        self.assertEqual(stats['last_price'], 0.0005)
+        self.assertEqual(trade_stats.stats(pair='SWTH_NEO', now=1533168000 + 345)['trades'], 1)
+
+    def test_stats_while_streaming(self):
+        trade_stats = TradeStats(window_seconds=100, window_trades=50)
+        done = threading.Event()
+
+        def stream():
+            for trade_id in range(20000):
+                trade_stats.add_trade('SWTH_NEO', {'id': trade_id, 'event_time': 1533168000 + trade_id,
+                                                   'fill_amount': 400 + trade_id % 7, 'take_amount': 1000000})
+            done.set()
+
+        streamer = threading.Thread(target=stream)
+        streamer.start()
+        while not done.is_set():
+            trade_stats.stats(pair='SWTH_NEO', now=1533168000 + 20000)
+        streamer.join()
+        window = trade_stats.window('SWTH_NEO')
+        self.assertEqual(len(window), 50)
+        self.assertEqual(window.volume, sum(trade[1] for trade in window.trades))
@@ -0,0 +1,233 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Span based tracing of the order, deposit, withdrawal and cancellation lifecycles of the AuthenticatedClient.
+    Each lifecycle is a trace with a root span tagged with the order (or deposit, withdrawal, cancellation) id and
+    child spans for the create and execute signing and POST phases, so slowness can be attributed to the local
+    signing or to the exchange. Finished spans are exported in the Zipkin v2 JSON format.
+    A disabled Tracer hands out one shared no-op span and records nothing.
+Usage:
+    from switcheo.tracing import Tracer
+"""
+
+import random
+import threading
+import time
+from collections import deque
+import requests
+
+
+class Span(object):
+    """
+    One timed operation of a trace, used as a context manager::
+
+        with tracer.span('create_order.sign') as span:
+            span.tag('pair', 'SWTH_NEO')
+    """
+
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'tags', 'timestamp', 'start', 'duration')
+
+    def __init__(self, tracer, trace_id, span_id, parent_id, name, tags=None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.tags = dict(tags or {})
+        self.timestamp = None
+        self.start = None
+        self.duration = None
+
+    def tag(self, key, value):
+        self.tags[key] = value
+        return self
+
+    def __enter__(self):
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.tracer.push(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        self.tracer.pop(self)
+        return False
+
+    def to_zipkin(self):
+        span = {
+            'traceId': self.trace_id,
+            'id': self.span_id,
+            'name': self.name,
+            'timestamp': int(self.timestamp * 1000000),
+            'duration': max(int(self.duration * 1000000), 1),
+            'localEndpoint': {'serviceName': self.tracer.service_name},
+            'tags': {str(key): str(value) for key, value in self.tags.items()}
+        }
+        if self.parent_id is not None:
+            span['parentId'] = self.parent_id
+        return span
+
+
+class NoopSpan(object):
+
+    __slots__ = ()
+
+    def tag(self, key, value):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+noop_span = NoopSpan()
+
+
+class Tracer(object):
+    """
+    Creates spans, nests them per thread and keeps the finished spans::
+
+        tracer = Tracer()
+        authenticated_client = AuthenticatedClient(blockchain='neo', tracer=tracer)
+        authenticated_client.order(...)
+        tracer.to_zipkin()
+    """
+
+    def __init__(self, enabled=True, service_name='switcheo-python', max_spans=10000):
+        """
+
+        :param enabled: Record spans, a disabled tracer returns a no-op span.
+        :type enabled: bool
+        :param service_name: The service name of the local endpoint of the exported spans.
+        :type service_name: str
+        :param max_spans: The number of finished spans to keep, oldest are dropped first.
+        :type max_spans: int
+        """
+        self.enabled = enabled
+        self.service_name = service_name
+        self.finished = deque(maxlen=max_spans)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def new_id():
+        return '{:016x}'.format(random.getrandbits(64))
+
+    def stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def active(self):
+        """
+        The innermost open span of the calling thread, None outside of a span.
+        """
+        stack = self.stack()
+        return stack[-1] if stack else None
+
+    def push(self, span):
+        self.stack().append(span)
+
+    def pop(self, span):
+        stack = self.stack()
+        if span in stack:
+            stack.remove(span)
+        with self.lock:
+            self.finished.append(span)
+
+    def span(self, name, tags=None):
+        """
+        A span that is a child of the active span of the calling thread, or the root span of a new trace.
+
+        :param name: The operation name, such as order or create_order.sign.
+        :type name: str
+        :param tags: Tags of the span.
+        :type tags: dict
+        :return: Span (or the no-op span when disabled) to use as a context manager.
+        """
+        if not self.enabled:
+            return noop_span
+        parent = self.active()
+        if parent is None:
+            return Span(self, self.new_id(), self.new_id(), None, name, tags)
+        return Span(self, parent.trace_id, self.new_id(), parent.span_id, name, tags)
+
+    def tag_trace(self, key, value):
+        """
+        Tag the active span of the calling thread and the root span of its trace, such as with the order id.
+        """
+        if not self.enabled:
+            return
+        stack = self.stack()
+        if stack:
+            stack[0].tag(key, value)
+            stack[-1].tag(key, value)
+
+    def traces(self):
+        """
+        The finished spans grouped by trace id, each in the order they started.
+        """
+        traces = {}
+        with self.lock:
+            spans = list(self.finished)
+        for span in sorted(spans, key=lambda span: span.start):
+            traces.setdefault(span.trace_id, []).append(span)
+        return traces
+
+    def to_zipkin(self, clear=False):
+        """
+        The finished spans in the Zipkin v2 JSON format.
+        Execution of this function is as follows::
+
+            to_zipkin()
+
+        The expected return result for this function is as follows::
+
+            [
+                {
+                    'traceId': '5af7183fb1d4cf5f',
+                    'id': '352bff9a74ca9ad2',
+                    'parentId': '6b221d5bc9e6496c',
+                    'name': 'create_order.sign',
+                    'timestamp': 1533476315123456,
+                    'duration': 4012,
+                    'localEndpoint': {'serviceName': 'switcheo-python'},
+                    'tags': {'order_id': '4e6a59fd-d750-4332-aaf0-f2babfa8ad67'}
+                },
+                ....
+            ]
+
+        :param clear: Remove the exported spans from the tracer.
+        :type clear: bool
+        :return: List of span dictionaries.
+        """
+        with self.lock:
+            spans = list(self.finished)
+            if clear:
+                self.finished.clear()
+        return [span.to_zipkin() for span in spans]
+
+    def report(self, url, timeout=10):
+        """
+        Send the finished spans to a Zipkin compatible collector (Zipkin, Jaeger, OpenTelemetry Collector) and clear
+        them once the collector has accepted them, spans are kept when the request fails.
+
+        :param url: The collector URL, such as http://localhost:9411/api/v2/spans
+        :type url: str
+        :return: The number of spans sent.
+        """
+        with self.lock:
+            spans = list(self.finished)
+        if spans:
+            r = requests.post(url=url, json=[span.to_zipkin() for span in spans], timeout=timeout)
+            r.raise_for_status()
+            sent = set(map(id, spans))
+            with self.lock:
+                remaining = [span for span in self.finished if id(span) not in sent]
+                self.finished.clear()
+                self.finished.extend(remaining)
+        return len(spans)
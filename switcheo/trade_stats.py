@@ -0,0 +1,256 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    Rolling VWAP, volume and realized volatility over the streamed trades.
+    Each window keeps its trades in a deque together with running sums, so adding a trade and expiring the oldest
+    ones is constant time amortized instead of a pass over the trade list.
+Usage:
+    from switcheo.trade_stats import TradeStats
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from switcheo.candles import RecentTradeIds, trade_time
+from switcheo.columnar import trade_price
+
+
+class RollingWindow(object):
+    """
+    Trades of a time based window (the last window_seconds) and/or count based window (the last window_trades).
+
+    Volumes follow the candles, the volume is the fill amount and the quote volume the take amount of the trades.
+    The VWAP is the volume traded divided by the quote volume traded, the volatility the standard deviation of the
+    log returns between consecutive trades of the window::
+
+        window = RollingWindow(window_seconds=300)
+        window.add(event_time=1533168000.0, price=0.0004, volume=400, quote_volume=1000000)
+        window.vwap()
+    """
+
+    def __init__(self, window_seconds=None, window_trades=None):
+        """
+
+        :param window_seconds: The length (in seconds) of a time based window.
+        :type window_seconds: float
+        :param window_trades: The number of trades of a count based window.
+        :type window_trades: int
+        """
+        if window_seconds is None and window_trades is None:
+            raise ValueError("A rolling window needs window_seconds, window_trades or both.")
+        self.window_seconds = window_seconds
+        self.window_trades = window_trades
+        self.trades = deque()
+        self.last_price = None
+        self.last_time = None
+        self.volume = 0.0
+        self.quote_volume = 0.0
+        self.returns = 0
+        self.return_sum = 0.0
+        self.return_square_sum = 0.0
+
+    def __len__(self):
+        return len(self.trades)
+
+    def add(self, event_time, price, volume, quote_volume):
+        """
+        Add a trade, trades are expected in time order.
+
+        :param event_time: The time (in epoch seconds) of the trade.
+        :type event_time: float
+        :param price: The price of the trade.
+        :type price: float
+        :param volume: The fill amount of the trade.
+        :type volume: float
+        :param quote_volume: The take amount of the trade.
+        :type quote_volume: float
+        """
+        log_return = None
+        if self.last_price and price > 0:
+            log_return = math.log(price / self.last_price)
+            self.returns += 1
+            self.return_sum += log_return
+            self.return_square_sum += log_return * log_return
+        self.trades.append((event_time, volume, quote_volume, log_return))
+        self.volume += volume
+        self.quote_volume += quote_volume
+        self.last_price = price
+        self.last_time = event_time
+        self.expire(now=event_time)
+
+    def _pop(self):
+        event_time, volume, quote_volume, log_return = self.trades.popleft()
+        self.volume -= volume
+        self.quote_volume -= quote_volume
+        if log_return is not None:
+            self.returns -= 1
+            self.return_sum -= log_return
+            self.return_square_sum -= log_return * log_return
+        if not self.trades:
+            self.volume = self.quote_volume = self.return_sum = self.return_square_sum = 0.0
+
+    def expire(self, now=None):
+        """
+        Drop the trades that fell out of the window.
+
+        :param now: The current time (in epoch seconds), the time of the last trade by default.
+        :type now: float
+        """
+        if self.window_trades is not None:
+            while len(self.trades) > self.window_trades:
+                self._pop()
+        if self.window_seconds is not None:
+            if now is None:
+                now = self.last_time
+            while self.trades and self.trades[0][0] <= now - self.window_seconds:
+                self._pop()
+
+    def vwap(self):
+        if self.quote_volume <= 0:
+            return None
+        return self.volume / self.quote_volume
+
+    def volatility(self):
+        """
+        Standard deviation of the log returns between consecutive trades, None with fewer than two returns.
+        """
+        if self.returns < 2:
+            return None
+        mean = self.return_sum / self.returns
+        variance = (self.return_square_sum - self.returns * mean * mean) / (self.returns - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def stats(self):
+        return {
+            'trades': len(self.trades),
+            'vwap': self.vwap(),
+            'volume': self.volume,
+            'quote_volume': self.quote_volume,
+            'volatility': self.volatility(),
+            'last_price': self.last_price
+        }
+
+
+class TradeStats(object):
+    """
+    Rolling statistics per pair fed by a TradeEventsNamespace and backfilled from the get_trades function::
+
+        trade_stats = TradeStats(window_seconds=300)
+        trade_stats.backfill(client=public_client, pair="SWTH_NEO")
+        trade_stats.attach(trade_events)
+        ....
+        trade_stats.stats(pair="SWTH_NEO")
+    """
+
+    def __init__(self, window_seconds=None, window_trades=None, max_trade_ids=10000):
+        """
+
+        :param window_seconds: The length (in seconds) of a time based window.
+        :type window_seconds: float
+        :param window_trades: The number of trades of a count based window.
+        :type window_trades: int
+        :param max_trade_ids: The number of recent trade ids kept to skip trades received twice.
+        :type max_trade_ids: int
+        """
+        if window_seconds is None and window_trades is None:
+            raise ValueError("Trade statistics need window_seconds, window_trades or both.")
+        self.window_seconds = window_seconds
+        self.window_trades = window_trades
+        self.max_trade_ids = max_trade_ids
+        self.windows = {}
+        self.trade_ids = {}
+        self.lock = threading.Lock()
+
+    def window(self, pair):
+        with self.lock:
+            return self._window(pair)
+
+    def _window(self, pair):
+        if pair not in self.windows:
+            self.windows[pair] = RollingWindow(window_seconds=self.window_seconds, window_trades=self.window_trades)
+            self.trade_ids[pair] = RecentTradeIds(max_ids=self.max_trade_ids)
+        return self.windows[pair]
+
+    def attach(self, trade_events):
+        """
+        Feed the statistics from the trades of a TradeEventsNamespace.
+        """
+        trade_events.add_listener(self.on_trades)
+        return trade_events
+
+    def backfill(self, client, pair, now=None, limit=5000):
+        """
+        Fill the window of the pair with the trades of the REST API.
+
+        :param client: The client used to request the trades, a PublicClient.
+        :type client: PublicClient
+        :param pair: The trading pair of the trades.
+        :type pair: str
+        :param now: The current time (in epoch seconds), now by default.
+        :type now: int
+        :param limit: The maximum number of trades requested.
+        :type limit: int
+        """
+        now = int(now or time.time())
+        if self.window_trades is not None:
+            limit = min(limit, self.window_trades)
+        start_time = now - int(self.window_seconds) if self.window_seconds is not None else None
+        trades = client.get_trades(pair=pair, start_time=start_time, end_time=now, limit=limit)
+        for trade in sorted(trades, key=trade_time):
+            self.add_trade(pair, trade)
+
+    def on_trades(self, pair, trades):
+        for trade in reversed(trades):
+            self.add_trade(pair, trade)
+
+    def add_trade(self, pair, trade):
+        """
+        Add one trade to the window of the pair.
+
+        :return: True if the trade was added, False if it was a duplicate or older than the last trade.
+        """
+        with self.lock:
+            return self._add_trade(pair, trade)
+
+    def _add_trade(self, pair, trade):
+        window = self._window(pair)
+        if not self.trade_ids[pair].add(trade.get('id')):
+            return False
+        event_time = trade_time(trade)
+        if window.last_time is not None and event_time < window.last_time:
+            return False
+        window.add(event_time=event_time, price=trade_price(trade), volume=float(trade['fill_amount']),
+                   quote_volume=float(trade['take_amount']))
+        return True
+
+    def stats(self, pair, now=None):
+        """
+        The rolling statistics of the pair.
+        Execution of this function is as follows::
+
+            stats(pair="SWTH_NEO")
+
+        The expected return result for this function is as follows::
+
+            {
+                'trades': 3,
+                'vwap': 0.00045,
+                'volume': 1350.0,
+                'quote_volume': 3000000.0,
+                'volatility': 0.0762,
+                'last_price': 0.0005
+            }
+
+        :param pair: The trading pair of the statistics.
+        :type pair: str
+        :param now: Expire the trades of a time based window up to this time (in epoch seconds).
+        :type now: float
+        :return: Dictionary with the trade count, VWAP, volume (fill amount), quote volume (take amount), volatility
+                 and last price.
+        """
+        with self.lock:
+            window = self._window(pair)
+            if now is not None:
+                window.expire(now=now)
+            return window.stats()
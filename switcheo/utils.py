@@ -4,23 +4,259 @@
 #
 # For testnet requests to the Switcheo exchange
 
+import calendar
+import codecs
 import json
+import logging
+import re
 import requests
 import time
 import hashlib
+import importlib
+try:
+    import orjson
+except ImportError:  # The standard library encoder is used.
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_function(module_name, function_name):
+    """
+    A function that imports module_name on its first call and then calls its function_name, so modules with heavy
+    dependencies, such as the NEO and Ethereum signing stacks, are only imported once they are used.
+    Execution of this function is as follows::
+
+        to_wei = lazy_function(module_name='eth_utils', function_name='to_wei')
+        to_wei(1, unit='ether')
+
+    :param module_name: The module of the function.
+    :type module_name: str
+    :param function_name: The name of the function in the module.
+    :type function_name: str
+    :return: Function with the same arguments and return value as the imported function.
+    """
+    def call_function(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), function_name)(*args, **kwargs)
+    call_function.__name__ = function_name
+    call_function.__qualname__ = function_name
+    call_function.__module__ = module_name
+    return call_function
 
 
 def get_epoch_milliseconds():
     return int(round(time.time() * 1000))
 
 
+def iso8601_to_epoch(timestamp):
+    """
+    Converts an ISO 8601 UTC timestamp as returned by the Switcheo API (2018-08-04T15:00:12.634Z) to epoch seconds.
+
+    Args:
+        timestamp
+    """
+    seconds = calendar.timegm((int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                               int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19]), 0, 0, 0))
+    fraction = timestamp[19:].rstrip('Z')
+    if fraction:
+        return seconds + float(fraction)
+    return float(seconds)
+
+
+def json_stringify_message(message):
+    """Canonical JSON of a message with the standard library encoder, the reference output of stringify_message"""
+    return json.dumps(message, sort_keys=True, separators=(',', ':'))
+
+
+orjson_exponent_pattern = re.compile(rb'e-?\d+[,\]}]')
+orjson_small_float_pattern = re.compile(rb'\.0000\d*[,\]}]')
+
+
+def orjson_stringify_message(message):
+    """
+    Canonical JSON of a message with orjson, byte-identical to json_stringify_message.
+    orjson does not escape non-ASCII text or 0x7f, writes NaN and Infinity as null and writes floats below 1e-04 or
+    with an exponent differently (0.00001 and 1e16 instead of 1e-05 and 1e+16), so messages with such text, null or
+    floats fall back to the standard library encoder, as do bare values and messages orjson cannot encode, such as
+    integers above 64 bits. The remaining floats are the shortest repr in both encoders.
+    """
+    try:
+        data = orjson.dumps(message, option=orjson.OPT_SORT_KEYS)
+        text = data.decode('ascii')
+    except (TypeError, UnicodeDecodeError):
+        return json_stringify_message(message)
+    if data[:1] not in b'{["' or b'null' in data or b'\x7f' in data or orjson_exponent_pattern.search(data) or \
+            orjson_small_float_pattern.search(data):
+        return json_stringify_message(message)
+    return text
+
+
+json_encoders = {'json': json_stringify_message}
+if orjson is not None:
+    json_encoders['orjson'] = orjson_stringify_message
+json_encoder = json_encoders.get('orjson', json_stringify_message)
+
+
+def set_json_encoder(encoder):
+    """
+    Select the canonical JSON encoder used by stringify_message for signatures and digests.
+    Execution of this function is as follows::
+
+        set_json_encoder(encoder='json')
+
+    :param encoder: The name of an encoder of json_encoders (json, or orjson when installed) or a function of a
+                    message that returns the same string as json_stringify_message.
+    :type encoder: str or function
+    :return: The encoder function.
+    """
+    global json_encoder
+    if not callable(encoder):
+        if encoder not in json_encoders:
+            raise ValueError("JSON encoder {} is not one of {}.".format(encoder, ', '.join(sorted(json_encoders))))
+        encoder = json_encoders[encoder]
+    json_encoder = encoder
+    return json_encoder
+
+
 def stringify_message(message):
     """Return a JSON message that is alphabetically sorted by the key name
 
     Args:
         message
     """
-    return json.dumps(message, sort_keys=True, separators=(',', ':'))
+    return json_encoder(message)
+
+
+orjson_loads_digits = bytes.maketrans(b'123456789', b'000000000')
+
+
+def orjson_loads(content):
+    """
+    Decode a JSON document with orjson, returning the same objects as json.loads.
+    orjson decodes integers above 64 bits as floats and rejects NaN, Infinity and lone surrogates, so documents with
+    19 or more consecutive digits or that orjson rejects are decoded by json.loads.
+
+    :param content: The JSON document, such as the body of a response.
+    :type content: bytes
+    :return: The decoded document.
+    """
+    if b'0' * 19 in content.translate(orjson_loads_digits):
+        return json.loads(content)
+    try:
+        return orjson.loads(content)
+    except ValueError:
+        return json.loads(content)
+
+
+json_decoders = {'json': json.loads}
+if orjson is not None:
+    json_decoders['orjson'] = orjson_loads
+default_json_decoder = json_decoders.get('orjson', json.loads)
+
+
+def iter_json_array(chunks):
+    """
+    Generator decoding the elements of a JSON array one at a time from an iterable of byte chunks, such as a streamed
+    HTTP body, so only the element being decoded and a few chunks are held in memory. An element that does not
+    decode yet is only tried again once the buffered text has doubled, so elements spanning many chunks are not
+    decoded from their start for every chunk.
+    Execution of this function is as follows::
+
+        list(iter_json_array(chunks=[b'[{"id": 1}, {"i', b'd": 2}]']))
+
+    The expected return result for this function is as follows::
+
+        [{'id': 1}, {'id': 2}]
+
+    :param chunks: The UTF-8 encoded JSON array in chunks of any size.
+    :type chunks: iterable
+    :return: Generator of the decoded elements, raises ValueError when the document is not a well formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    pending = []
+    pending_length = 0
+    finished = False
+
+    def read_chunk():
+        nonlocal pending_length, finished
+        chunk = next(chunks, None)
+        if chunk is None:
+            finished = True
+            text = text_decoder.decode(b'', final=True)
+        else:
+            text = text_decoder.decode(chunk)
+        pending.append(text)
+        pending_length += len(text)
+
+    def merge_chunks():
+        nonlocal buffer, position, pending_length
+        buffer = ''.join([buffer[position:]] + pending)
+        position = 0
+        pending_length = 0
+        del pending[:]
+
+    def next_character():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\n\r':
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if pending:
+                merge_chunks()
+            elif finished:
+                return None
+            else:
+                read_chunk()
+
+    if next_character() != '[':
+        raise ValueError("JSON document is not an array.")
+    position += 1
+    expect_value = True
+    elements = 0
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\n\r':
+            position += 1
+        character = buffer[position] if position < len(buffer) else next_character()
+        if character is None:
+            raise ValueError("JSON array ended before its closing bracket.")
+        if character == ']':
+            if expect_value and elements:
+                raise ValueError("JSON array has a trailing comma.")
+            position += 1
+            break
+        if not expect_value:
+            if character != ',':
+                raise ValueError("JSON array elements are not separated by a comma at {}.".format(position))
+            position += 1
+            expect_value = True
+            continue
+        wanted = 0
+        while True:
+            if finished or len(buffer) - position + pending_length >= wanted:
+                if pending:
+                    merge_chunks()
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    end = None
+                if end is not None and (finished or (end < len(buffer) and buffer[end] in ' \t\n\r,]')):
+                    break
+                if finished:
+                    raise ValueError("JSON array element is incomplete.")
+                wanted = 2 * (len(buffer) - position)
+            read_chunk()
+        position = end
+        expect_value = False
+        elements += 1
+        yield element
+    if next_character() is not None:
+        raise ValueError("JSON document continues after the end of the array.")
 
 
 def sha1_hash_digest(message):
@@ -112,27 +348,133 @@ class SwitcheoApiException(Exception):
 
 class Request(object):
 
-    def __init__(self, api_url='https://test-api.switcheo.network/', api_version="/v2", timeout=30):
+    def __init__(self, api_url='https://test-api.switcheo.network/', api_version="/v2", timeout=30, hooks=None,
+                 json_decoder=None):
         self.base_url = api_url.rstrip('/')
         self.url = self.base_url + api_version
         self.timeout = timeout
+        self.hooks = list(hooks or [])
+        self.json_decoder = default_json_decoder
+        if json_decoder is not None:
+            self.set_json_decoder(json_decoder)
 
-    def get(self, path, params=None):
-        """Perform GET request"""
-        r = requests.get(url=self.url + path, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
+    def add_hook(self, hook):
+        """Call a function with a dictionary describing every GET and POST request, see switcheo.instrumentation"""
+        self.hooks.append(hook)
+
+    def set_json_decoder(self, json_decoder):
+        """
+        Select the function decoding the response bodies, the name of a decoder of json_decoders (json, or orjson
+        when installed, the default) or a function of the body bytes.
+        """
+        if not callable(json_decoder):
+            if json_decoder not in json_decoders:
+                raise ValueError("JSON decoder {} is not one of {}.".format(
+                    json_decoder, ', '.join(sorted(json_decoders))))
+            json_decoder = json_decoders[json_decoder]
+        self.json_decoder = json_decoder
+        return json_decoder
+
+    def get(self, path, params=None, raw=False):
+        """Perform GET request, raw returns the undecoded response body bytes"""
+        return self.send(method='GET', path=path, params=params, raw=raw)
 
-    def post(self, path, data=None, json_data=None, params=None):
-        """Perform POST request"""
-        r = requests.post(url=self.url + path, data=data, json=json_data, params=params, timeout=self.timeout)
+    def post(self, path, data=None, json_data=None, params=None, raw=False):
+        """Perform POST request, raw returns the undecoded response body bytes"""
+        return self.send(method='POST', path=path, data=data, json_data=json_data, params=params, raw=raw)
+
+    def stream(self, path, params=None, chunk_size=65536):
+        """
+        Perform GET request of a list endpoint and yield its elements as the response body arrives, instead of
+        buffering and decoding the whole list. The hooks are called once the body is consumed or the generator closed.
+
+        :param path: The API path, such as /trades.
+        :type path: str
+        :param params: The query parameters.
+        :type params: dict
+        :param chunk_size: The number of bytes read from the connection at a time.
+        :type chunk_size: int
+        :return: Generator of the decoded list elements.
+        """
+        event = {'method': 'GET', 'path': path, 'status': None, 'request_bytes': 0, 'response_bytes': 0,
+                 'retries': 0, 'error': None, 'timings': {}}
+        start = time.perf_counter()
+        r = None
         try:
+            r = requests.get(url=self.url + path, params=params, timeout=self.timeout, stream=True)
+            event['status'] = r.status_code
+            event['timings']['response'] = r.elapsed.total_seconds()
             r.raise_for_status()
-        except requests.exceptions.HTTPError:
-            raise SwitcheoApiException(r.json().get('error_code'), r.json().get('error_message'), r.json().get('error'))
-        return r.json()
+            for element in iter_json_array(self.counted_chunks(r.iter_content(chunk_size=chunk_size), event)):
+                yield element
+        except Exception as error:
+            event['error'] = type(error).__name__
+            raise
+        finally:
+            if r is not None:
+                r.close()
+            event['timings']['total'] = time.perf_counter() - start
+            self.call_hooks(event)
+
+    @staticmethod
+    def counted_chunks(chunks, event):
+        for chunk in chunks:
+            event['response_bytes'] += len(chunk)
+            yield chunk
+
+    def call_hooks(self, event):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Request hook %r failed for %s %s.", hook, event['method'], event['path'])
+
+    def response_content(self, method, r, raw=False):
+        if r.status_code >= 400 and method == 'POST':
+            error = self.json_decoder(r.content)
+            raise SwitcheoApiException(error.get('error_code'), error.get('error_message'), error.get('error'))
+        r.raise_for_status()
+        if raw:
+            return r.content
+        return self.json_decoder(r.content)
+
+    def send(self, method, path, params=None, data=None, json_data=None, raw=False):
+        """
+        Perform a GET or POST request. With hooks, every hook is called with the endpoint, status, bytes sent and
+        received, retries, error and the timings (in seconds) of the response headers (connect, TLS and server time),
+        the body transfer and the JSON decode. A failing hook is logged and does not change the result of the request.
+        """
+        if not self.hooks:
+            r = requests.request(method, url=self.url + path, params=params, data=data, json=json_data,
+                                 timeout=self.timeout)
+            return self.response_content(method, r, raw)
+        event = {'method': method, 'path': path, 'status': None, 'request_bytes': 0, 'response_bytes': 0,
+                 'retries': 0, 'error': None, 'timings': {}}
+        start = time.perf_counter()
+        try:
+            r = requests.request(method, url=self.url + path, params=params, data=data, json=json_data,
+                                 timeout=self.timeout)
+            received = time.perf_counter()
+            response_time = r.elapsed.total_seconds()
+            retries = getattr(r.raw, 'retries', None)
+            event['status'] = r.status_code
+            event['request_bytes'] = len(r.request.body or b'')
+            event['response_bytes'] = len(r.content)
+            event['retries'] = len(retries.history) if retries is not None and retries.history else 0
+            event['timings'] = {'response': response_time, 'transfer': max(received - start - response_time, 0.0)}
+            decode_start = time.perf_counter()
+            result = self.response_content(method, r, raw)
+            if not raw:
+                event['timings']['decode'] = time.perf_counter() - decode_start
+            return result
+        except Exception as error:
+            event['error'] = type(error).__name__
+            raise
+        finally:
+            event['timings']['total'] = time.perf_counter() - start
+            self.call_hooks(event)
 
     def status(self):
         r = requests.get(url=self.base_url)
         r.raise_for_status()
-        return r.json()
+        return self.json_decoder(r.content)